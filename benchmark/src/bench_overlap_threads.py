@@ -0,0 +1,123 @@
+import json
+import os
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from rich import print
+from rich.box import MARKDOWN
+from rich.table import Table
+
+import polars_bio as pb
+
+BENCH_DATA_ROOT = os.getenv("BENCH_DATA_ROOT")
+
+if BENCH_DATA_ROOT is None:
+    raise ValueError("BENCH_DATA_ROOT is not set")
+
+columns = ("contig", "pos_start", "pos_end")
+
+num_repeats = 3
+num_executions = 1
+# every Python thread runs its own overlap, with a single DataFusion partition
+num_queries = 16
+
+test_threads = [1, 2, 4, 8, 16]
+
+test_cases = [
+    {
+        "df_path_1": f"{BENCH_DATA_ROOT}/fBrain-DS14718/*.parquet",
+        "df_path_2": f"{BENCH_DATA_ROOT}/exons/*.parquet",
+        "name": "1-2",
+    },
+    {
+        "df_path_1": f"{BENCH_DATA_ROOT}/exons/*.parquet",
+        "df_path_2": f"{BENCH_DATA_ROOT}/ex-anno/*.parquet",
+        "name": "2-7",
+    },
+]
+
+
+def polars_bio(df_path_1, df_path_2):
+    len(
+        pb.overlap(
+            df_path_1,
+            df_path_2,
+            cols1=columns,
+            cols2=columns,
+            output_type="polars.DataFrame",
+        )
+    )
+
+
+def polars_bio_threads(df_path_1, df_path_2, thread_num):
+    with ThreadPoolExecutor(max_workers=thread_num) as executor:
+        futures = [
+            executor.submit(polars_bio, df_path_1, df_path_2)
+            for _ in range(num_queries)
+        ]
+        for f in futures:
+            f.result()
+
+
+os.makedirs("results", exist_ok=True)
+
+pb.ctx.set_option("datafusion.execution.target_partitions", "1")
+
+for t in test_cases:
+    results = []
+    for p in test_threads:
+        print(f"Running {t['name']} with {p} Python threads...")
+        times = timeit.repeat(
+            lambda: polars_bio_threads(t["df_path_1"], t["df_path_2"], p),
+            repeat=num_repeats,
+            number=num_executions,
+        )
+        per_run_times = [time / num_executions for time in times]
+        results.append(
+            {
+                "name": f"polars_bio-{p}",
+                "threads": p,
+                "min": min(per_run_times),
+                "max": max(per_run_times),
+                "mean": np.mean(per_run_times),
+                "queries_per_second": num_queries / np.mean(per_run_times),
+            }
+        )
+
+    baseline_mean = results[0]["mean"]
+    for result in results:
+        result["speedup"] = baseline_mean / result["mean"]
+        result["per_core_efficiency"] = result["speedup"] / result["threads"]
+
+    table = Table(title="Benchmark Results", box=MARKDOWN)
+    table.add_column("Library", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Min (s)", justify="right", style="green")
+    table.add_column("Max (s)", justify="right", style="green")
+    table.add_column("Mean (s)", justify="right", style="green")
+    table.add_column("Queries/s", justify="right", style="green")
+    table.add_column("Speedup", justify="right", style="magenta")
+    table.add_column("Per core", justify="right", style="magenta")
+
+    for result in results:
+        table.add_row(
+            result["name"],
+            f"{result['min']:.6f}",
+            f"{result['max']:.6f}",
+            f"{result['mean']:.6f}",
+            f"{result['queries_per_second']:.2f}",
+            f"{result['speedup']:.2f}x",
+            f"{result['per_core_efficiency']:.2f}",
+        )
+
+    benchmark_results = {
+        "inputs": {
+            "df_path_1": t["df_path_1"],
+            "df_path_2": t["df_path_2"],
+            "num_queries": num_queries,
+        },
+        "results": results,
+    }
+    print(t["name"])
+    json.dump(benchmark_results, open(f"results/threads-{t['name']}.json", "w"))
+    print(table)
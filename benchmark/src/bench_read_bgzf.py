@@ -0,0 +1,95 @@
+import json
+import os
+import timeit
+
+import numpy as np
+from rich import print
+from rich.box import MARKDOWN
+from rich.table import Table
+
+import polars_bio as pb
+
+BENCH_DATA_ROOT = os.getenv("BENCH_DATA_ROOT")
+
+if BENCH_DATA_ROOT is None:
+    raise ValueError("BENCH_DATA_ROOT is not set")
+
+num_repeats = 3
+num_executions = 1
+
+test_threads = [1, 2, 4, 8, 16]
+
+test_cases = [
+    {
+        "path": f"{BENCH_DATA_ROOT}/fastq/ERR194146_1.fastq.bgz",
+        "reader": pb.read_fastq,
+        "name": "fastq",
+    },
+    {
+        "path": f"{BENCH_DATA_ROOT}/fasta/GRCh38.fa.bgz",
+        "reader": pb.read_fasta,
+        "name": "fasta",
+    },
+]
+
+
+def polars_bio(reader, path, thread_num):
+    len(reader(path, thread_num=thread_num).collect())
+
+
+os.makedirs("results", exist_ok=True)
+
+for t in test_cases:
+    results = []
+    file_size_mb = os.path.getsize(t["path"]) / 1024**2
+    for p in test_threads:
+        print(f"Running {t['name']} with {p} threads...")
+        times = timeit.repeat(
+            lambda: polars_bio(t["reader"], t["path"], p),
+            repeat=num_repeats,
+            number=num_executions,
+        )
+        per_run_times = [time / num_executions for time in times]
+        results.append(
+            {
+                "name": f"polars_bio-{p}",
+                "threads": p,
+                "min": min(per_run_times),
+                "max": max(per_run_times),
+                "mean": np.mean(per_run_times),
+                "throughput": file_size_mb / np.mean(per_run_times),
+            }
+        )
+
+    baseline_mean = results[0]["mean"]
+    for result in results:
+        result["speedup"] = baseline_mean / result["mean"]
+        result["per_core_efficiency"] = result["speedup"] / result["threads"]
+
+    table = Table(title="Benchmark Results", box=MARKDOWN)
+    table.add_column("Library", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Min (s)", justify="right", style="green")
+    table.add_column("Max (s)", justify="right", style="green")
+    table.add_column("Mean (s)", justify="right", style="green")
+    table.add_column("Throughput (MB/s)", justify="right", style="green")
+    table.add_column("Speedup", justify="right", style="magenta")
+    table.add_column("Per core", justify="right", style="magenta")
+
+    for result in results:
+        table.add_row(
+            result["name"],
+            f"{result['min']:.6f}",
+            f"{result['max']:.6f}",
+            f"{result['mean']:.6f}",
+            f"{result['throughput']:.2f}",
+            f"{result['speedup']:.2f}x",
+            f"{result['per_core_efficiency']:.2f}",
+        )
+
+    benchmark_results = {
+        "inputs": {"path": t["path"], "size_mb": file_size_mb},
+        "results": results,
+    }
+    print(t["name"])
+    json.dump(benchmark_results, open(f"results/read-{t['name']}.json", "w"))
+    print(table)
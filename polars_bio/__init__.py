@@ -1,20 +1,42 @@
-from polars_bio.polars_bio import InputFormat, ReadOptions, VcfReadOptions
+from polars_bio.polars_bio import (
+    BedReadOptions,
+    CsvReadOptions,
+    InputFormat,
+    ReadOptions,
+    VcfReadOptions,
+    WriteOptions,
+)
 
 from .context import ctx, set_option
+from .contigs import contig_enum, read_chromsizes
 from .io import (
     describe_vcf,
     from_polars,
+    materialize,
     read_bam,
+    read_bed,
     read_fasta,
     read_fastq,
+    read_indexed_bam,
     read_table,
     read_vcf,
     register_vcf,
     register_view,
     sql,
+    write_bed,
+    write_vcf,
 )
 from .polars_ext import PolarsRangesOperations as LazyFrame
 from .range_op import FilterOp, count_overlaps, coverage, merge, nearest, overlap
+from .range_op_async import (
+    count_overlaps_async,
+    coverage_async,
+    iter_batches_async,
+    merge_async,
+    nearest_async,
+    overlap_async,
+    sql_async,
+)
 from .range_viz import visualize_intervals
 
 POLARS_BIO_MAX_THREADS = "datafusion.execution.target_partitions"
@@ -27,14 +49,26 @@ __all__ = [
     "merge",
     "count_overlaps",
     "coverage",
+    "overlap_async",
+    "nearest_async",
+    "merge_async",
+    "count_overlaps_async",
+    "coverage_async",
+    "sql_async",
+    "iter_batches_async",
     "ctx",
     "FilterOp",
     "visualize_intervals",
     "read_bam",
+    "read_indexed_bam",
     "read_vcf",
+    "read_bed",
     "read_fasta",
     "read_fastq",
     "read_table",
+    "write_vcf",
+    "write_bed",
+    "materialize",
     "register_vcf",
     "describe_vcf",
     "register_view",
@@ -44,5 +78,10 @@ __all__ = [
     "LazyFrame",
     "ReadOptions",
     "VcfReadOptions",
+    "BedReadOptions",
+    "CsvReadOptions",
+    "WriteOptions",
     "set_option",
+    "read_chromsizes",
+    "contig_enum",
 ]
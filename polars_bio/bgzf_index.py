@@ -0,0 +1,195 @@
+import gzip
+import os
+import struct
+from typing import Union
+
+TBI_MAGIC = b"TBI\x01"
+CSI_MAGIC = b"CSI\x01"
+BAM_MAGIC = b"BAM\x01"
+BAI_MAGIC = b"BAI\x01"
+
+
+def find_index(path: str) -> Union[str, None]:
+    """
+    Find a tabix (`.tbi`) or CSI (`.csi`) index next to a BGZF-compressed file.
+    """
+    for ext in (".tbi", ".csi"):
+        if os.path.exists(path + ext):
+            return path + ext
+    return None
+
+
+def index_contigs(path: str) -> list[str]:
+    """
+    Read the contig names stored in the tabix (`.tbi`) or CSI (`.csi`) index of a file, in the order of the index.
+
+    Parameters:
+        path: The path to the indexed file (not to the index itself).
+    """
+    index_path = find_index(path)
+    if index_path is None:
+        raise ValueError(f"No .tbi or .csi index found for: {path}")
+    with gzip.open(index_path, "rb") as f:
+        data = f.read()
+    magic = data[:4]
+    if magic == TBI_MAGIC:
+        # n_ref, format, col_seq, col_beg, col_end, meta, skip, l_nm
+        l_nm = struct.unpack_from("<i", data, 32)[0]
+        return _split_names(data[36 : 36 + l_nm])
+    elif magic == CSI_MAGIC:
+        # min_shift, depth, l_aux followed by a tabix-like header in aux
+        l_aux = struct.unpack_from("<i", data, 12)[0]
+        if l_aux < 28:
+            raise ValueError(f"CSI index without contig names: {index_path}")
+        l_nm = struct.unpack_from("<i", data, 16 + 24)[0]
+        return _split_names(data[16 + 28 : 16 + 28 + l_nm])
+    raise ValueError(f"Unsupported index format: {index_path}")
+
+
+def index_contig_lengths(path: str) -> dict[str, int]:
+    """
+    Estimate the length of the contigs of a tabix (`.tbi`) or CSI (`.csi`) indexed file, as the end of
+    the last leaf bin (16 kbp with the default tabix binning) holding records. The index does not store
+    the lengths, so records may extend up to a leaf bin beyond the estimate.
+
+    Parameters:
+        path: The path to the indexed file (not to the index itself).
+    """
+    contigs = index_contigs(path)
+    index_path = find_index(path)
+    with gzip.open(index_path, "rb") as f:
+        data = f.read()
+    if data[:4] == TBI_MAGIC:
+        min_shift, depth, bin_extra = 14, 5, 0
+        n_ref = struct.unpack_from("<i", data, 4)[0]
+        offset = 36 + struct.unpack_from("<i", data, 32)[0]
+    else:
+        min_shift, depth, l_aux = struct.unpack_from("<iii", data, 4)
+        # CSI bins carry an additional 8 bytes loffset and there is no linear index
+        bin_extra = 8
+        n_ref = struct.unpack_from("<i", data, 16 + l_aux)[0]
+        offset = 20 + l_aux
+    lengths = {}
+    for i in range(n_ref):
+        ends = []
+        n_bin = struct.unpack_from("<i", data, offset)[0]
+        offset += 4
+        for _ in range(n_bin):
+            bin_id = struct.unpack_from("<I", data, offset)[0]
+            n_chunk = struct.unpack_from("<i", data, offset + 4 + bin_extra)[0]
+            offset += 8 + bin_extra + 16 * n_chunk
+            bin_end = _bin_end(bin_id, min_shift, depth)
+            if bin_end is not None:
+                ends.append(bin_end)
+        if bin_extra == 0:
+            n_intv = struct.unpack_from("<i", data, offset)[0]
+            offset += 4 + 8 * n_intv
+        # records spanning leaf bins are stored in larger bins, which end far beyond the contig
+        leaf_ends = [end for level, end in ends if level == depth]
+        lengths[contigs[i]] = max(leaf_ends or [end for _, end in ends] or [0])
+    return lengths
+
+
+def _bin_end(bin_id: int, min_shift: int, depth: int) -> Union[tuple[int, int], None]:
+    # the level and 0-based, exclusive end of a bin, *None* for the pseudo-bin of the index metadata
+    first = 0
+    for level in range(depth + 1):
+        count = 1 << (3 * level)
+        if bin_id < first + count:
+            size = 1 << (min_shift + 3 * (depth - level))
+            return level, (bin_id - first + 1) * size
+        first += count
+    return None
+
+
+def bam_contigs(path: str) -> list[str]:
+    """
+    Read the reference sequence names from the header of a BAM file.
+
+    Parameters:
+        path: The path to the BAM file.
+    """
+    return list(bam_contig_lengths(path))
+
+
+def bam_contig_lengths(path: str) -> dict[str, int]:
+    """
+    Read the reference sequence names and lengths from the header of a BAM file.
+
+    Parameters:
+        path: The path to the BAM file.
+    """
+    with gzip.open(path, "rb") as f:
+        if f.read(4) != BAM_MAGIC:
+            raise ValueError(f"Not a BAM file: {path}")
+        l_text = struct.unpack("<i", f.read(4))[0]
+        f.seek(l_text, os.SEEK_CUR)
+        n_ref = struct.unpack("<i", f.read(4))[0]
+        lengths = {}
+        for _ in range(n_ref):
+            l_name = struct.unpack("<i", f.read(4))[0]
+            name = f.read(l_name).rstrip(b"\x00").decode()
+            lengths[name] = struct.unpack("<i", f.read(4))[0]
+    return lengths
+
+
+def find_bam_index(path: str) -> Union[str, None]:
+    """
+    Find a BAI (`.bai`) or CSI (`.csi`) index of a BAM file.
+    """
+    for index_path in (
+        path + ".bai",
+        os.path.splitext(path)[0] + ".bai",
+        path + ".csi",
+    ):
+        if os.path.exists(index_path):
+            return index_path
+    return None
+
+
+def bam_unplaced_reads(path: str) -> Union[int, None]:
+    """
+    Read the number of unplaced reads (reads without a reference sequence) from the `.bai` or `.csi`
+    index of a BAM file. Returns *None* if there is no index or it does not record this number.
+
+    Parameters:
+        path: The path to the BAM file (not to the index itself).
+    """
+    index_path = find_bam_index(path)
+    if index_path is None:
+        return None
+    if index_path.endswith(".bai"):
+        with open(index_path, "rb") as f:
+            data = f.read()
+        if data[:4] != BAI_MAGIC:
+            raise ValueError(f"Unsupported index format: {index_path}")
+        return _unplaced_reads(data, 4, 0)
+    with gzip.open(index_path, "rb") as f:
+        data = f.read()
+    if data[:4] != CSI_MAGIC:
+        raise ValueError(f"Unsupported index format: {index_path}")
+    l_aux = struct.unpack_from("<i", data, 12)[0]
+    # CSI bins carry an additional 8 bytes loffset
+    return _unplaced_reads(data, 16 + l_aux, 8)
+
+
+def _unplaced_reads(data: bytes, offset: int, bin_extra: int) -> Union[int, None]:
+    n_ref = struct.unpack_from("<i", data, offset)[0]
+    offset += 4
+    for _ in range(n_ref):
+        n_bin = struct.unpack_from("<i", data, offset)[0]
+        offset += 4
+        for _ in range(n_bin):
+            n_chunk = struct.unpack_from("<i", data, offset + 4 + bin_extra)[0]
+            offset += 8 + bin_extra + 16 * n_chunk
+        if bin_extra == 0:
+            # BAI linear index
+            n_intv = struct.unpack_from("<i", data, offset)[0]
+            offset += 4 + 8 * n_intv
+    if len(data) < offset + 8:
+        return None
+    return struct.unpack_from("<Q", data, offset)[0]
+
+
+def _split_names(names: bytes) -> list[str]:
+    return [n.decode() for n in names.split(b"\x00") if n]
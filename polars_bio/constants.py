@@ -1,3 +1,12 @@
 DEFAULT_INTERVAL_COLUMNS = ["chrom", "start", "end"]
 DEFAULT_BATCH_SIZE = 8192
 TMP_CATALOG_DIR = "./tmp/catalog_pb"
+# Overlaps of Polars DataFrames up to this size (total rows of both inputs) are
+# computed in-process on Arrow buffers instead of being registered in DataFusion
+NATIVE_OVERLAP_MAX_ROWS = 1024 * 1024
+# Target size of the chunks a range operation LazyFrame yields to Polars: the
+# small record batches streamed by DataFusion are coalesced up to either limit
+DEFAULT_OUTPUT_BATCH_SIZE = 65536
+DEFAULT_OUTPUT_BATCH_BYTES = 64 * 1024 * 1024
+# Row group size of the Parquet files written by polars-bio, the default of Polars
+DEFAULT_ROW_GROUP_SIZE = 512 * 512
@@ -0,0 +1,165 @@
+from typing import Iterable, Union
+
+import pandas as pd
+import polars as pl
+
+__all__ = ["read_chromsizes", "contig_enum"]
+
+# sex chromosomes and mitochondrial DNA go after the autosomes
+_SPECIAL_CONTIGS = {"X": 0, "Y": 1, "M": 2, "MT": 2}
+
+
+def read_chromsizes(path: str) -> dict[str, int]:
+    """
+    Read contig names and lengths from a chromsizes (`<contig>\\t<length>`) or a FASTA index (`.fai`) file.
+
+    Parameters:
+        path: The path to the chromsizes or `.fai` file.
+
+    Returns:
+        A dictionary of contig lengths in the order of the file.
+    """
+    chromsizes = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            chromsizes[fields[0]] = int(fields[1])
+    return chromsizes
+
+
+def natural_contig_key(contig: str) -> tuple:
+    """
+    Sort key placing contigs in karyotypic order: chr1, chr2, ..., chr10, ..., chrX, chrY, chrM, followed
+    by the remaining contigs (e.g. unplaced scaffolds) in lexicographic order.
+    """
+    name = contig[3:] if contig.lower().startswith("chr") else contig
+    if name.isdigit():
+        return 0, int(name), contig
+    if name.upper() in _SPECIAL_CONTIGS:
+        return 1, _SPECIAL_CONTIGS[name.upper()], contig
+    return 2, 0, contig
+
+
+def natural_contig_order(contig: pl.Expr) -> list[pl.Expr]:
+    """
+    Sort keys of a contig column expression in karyotypic order, the same as
+    `natural_contig_key`, computed in the query instead of from the contig names up front.
+    """
+    contig = contig.cast(pl.Utf8)
+    name = contig.str.replace(r"^(?i)chr", "")
+    upper = name.str.to_uppercase()
+    is_number = name.str.contains(r"^[0-9]+$")
+    # explicitly typed keys and when/then chains, which the Polars streaming sort supports
+    group = (
+        pl.when(is_number)
+        .then(0)
+        .when(upper.is_in(list(_SPECIAL_CONTIGS)))
+        .then(1)
+        .otherwise(2)
+        .cast(pl.UInt8)
+    )
+    rank = pl.when(is_number).then(name.cast(pl.Int64, strict=False))
+    for special, order in _SPECIAL_CONTIGS.items():
+        rank = rank.when(upper == special).then(order)
+    rank = rank.otherwise(0).cast(pl.Int64)
+    return [group, rank, contig]
+
+
+def contig_enum(
+    contigs: Union[Iterable[str], None] = None,
+    chromsizes: Union[str, dict[str, int], None] = None,
+) -> pl.Enum:
+    """
+    Build a Polars `Enum` data type of contig names.
+
+    Parameters:
+        contigs: Contig names to include, sorted in karyotypic order. Ignored if `chromsizes` is provided.
+        chromsizes: A path to a chromsizes/`.fai` file or a dictionary of contig lengths. Its order is preserved.
+
+    Returns:
+        A `polars.Enum` whose physical order follows the genome.
+    """
+    if chromsizes is not None:
+        if isinstance(chromsizes, str):
+            chromsizes = read_chromsizes(chromsizes)
+        return pl.Enum(list(chromsizes))
+    if contigs is None:
+        raise ValueError("Either contigs or chromsizes must be provided")
+    return pl.Enum(sorted(set(contigs), key=natural_contig_key))
+
+
+def _detect_contigs(
+    df: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame], column: str
+) -> list[str]:
+    # LazyFrames are not scanned here, as it would run their pipeline before the query
+    if isinstance(df, pl.DataFrame):
+        return df.get_column(column).unique().cast(pl.Utf8).to_list()
+    elif isinstance(df, pd.DataFrame):
+        return [str(c) for c in df[column].unique()]
+    raise ValueError(
+        "Contigs can only be detected for DataFrame inputs, please provide chromsizes"
+    )
+
+
+def _contig_dtype(
+    inputs: list[tuple[Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame], str]],
+    contig_dtype: Union[str, None],
+    chromsizes: Union[str, dict[str, int], None],
+) -> Union[pl.Enum, None]:
+    """
+    Validate the `contig_dtype` and `chromsizes` arguments of a range operation and
+    build the contig `Enum` up front, so that invalid arguments are reported before
+    the operation is planned or run. Without `chromsizes`, the contigs are detected
+    from the `(input, contig column)` pairs of `inputs`.
+    """
+    if contig_dtype is None:
+        return None
+    if contig_dtype != "enum":
+        raise ValueError(
+            f"Unsupported contig_dtype: {contig_dtype}. Only 'enum' is supported."
+        )
+    if chromsizes is not None:
+        return contig_enum(chromsizes=chromsizes)
+    contigs = set()
+    for df, column in inputs:
+        contigs.update(_detect_contigs(df, column))
+    return contig_enum(contigs=contigs)
+
+
+def _apply_contig_dtype(result, output_columns: list[str], dtype: Union[pl.Enum, None]):
+    """
+    Cast the contig columns of a range operation result to `dtype` (see `_contig_dtype`),
+    an ordered `Categorical` for pandas. Candidate `output_columns` that are not present
+    in the result are skipped.
+    """
+    if dtype is None:
+        return result
+
+    if isinstance(result, (pl.DataFrame, pl.LazyFrame)):
+        names = result.collect_schema().names()
+        output_columns = [c for c in dict.fromkeys(output_columns) if c in names]
+        return result.with_columns(
+            [pl.col(c).cast(pl.Utf8).cast(dtype) for c in output_columns]
+        )
+    elif isinstance(result, pd.DataFrame):
+        categories = dtype.categories.to_list()
+        output_columns = [c for c in dict.fromkeys(output_columns) if c in result]
+        for c in output_columns:
+            values = result[c].dropna().astype(str)
+            unknown = sorted(set(values.unique()) - set(categories))
+            if unknown:
+                # consistent with the strict Enum cast of Polars results
+                raise ValueError(
+                    f"Contigs {unknown} of column {c} are not present in chromsizes"
+                )
+            result[c] = pd.Categorical(
+                result[c].astype(str).where(result[c].notna()),
+                categories=categories,
+                ordered=True,
+            )
+        return result
+    raise ValueError(
+        "contig_dtype is only supported for polars and pandas output types"
+    )
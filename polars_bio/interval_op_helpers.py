@@ -4,10 +4,13 @@ import datafusion
 import pandas as pd
 import polars as pl
 import pyarrow as pa
+from datafusion import col, functions, literal
 from typing_extensions import Union
 
-from .constants import DEFAULT_INTERVAL_COLUMNS
-from .context import Context
+from polars_bio.polars_bio import InputFormat, py_read_table, py_register_table
+
+from . import parquet_cache
+from .context import Context, ctx
 
 
 def get_py_ctx() -> datafusion.context.SessionContext:
@@ -16,31 +19,54 @@ def get_py_ctx() -> datafusion.context.SessionContext:
 
 def read_df_to_datafusion(
     py_ctx: datafusion.context.SessionContext,
-    df: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df: Union[str, pl.DataFrame, pd.DataFrame],
 ) -> datafusion.dataframe:
+    # LazyFrames are staged by the callers with `_lazy_parquet_inputs`, which removes
+    # the Parquet file once the result has been collected
     if isinstance(df, pl.DataFrame):
         return py_ctx.from_polars(df)
     elif isinstance(df, pd.DataFrame):
         return py_ctx.from_pandas(df)
-    elif isinstance(df, pl.LazyFrame):
-        return py_ctx.from_polars(df.collect())
     elif isinstance(df, str):
+        manifest = parquet_cache.lookup(df)
+        if manifest is not None:
+            return py_ctx.read_parquet(manifest["out_dir"])
         ext = Path(df).suffix
-        if ext == ".csv":
-            return py_ctx.read_csv(df)
-        elif ext == ".bed":
-            return py_ctx.read_csv(
+        if ext in (".csv", ".tsv"):
+            return py_ctx.read_csv(df, delimiter="\t" if ext == ".tsv" else ",")
+        elif ".bed" in Path(df).suffixes:
+            # reuse the schema of the native BED reader (see read_bed), its optional numeric
+            # columns are read as strings, so that their "." placeholder is mapped to null
+            table = py_register_table(ctx, df, None, InputFormat.Bed, None)
+            schema = py_read_table(ctx, table.name).schema()
+            optional = {
+                f.name
+                for i, f in enumerate(schema)
+                if i >= 3 and not pa.types.is_string(f.type)
+            }
+            compressed = ext.lower() in (".gz", ".bgz", ".bgzf")
+            bed = py_ctx.read_csv(
                 df,
-                has_header=False,
-                delimited="\t",
-                file_extension=".bed",
                 schema=pa.schema(
                     [
-                        (DEFAULT_INTERVAL_COLUMNS[0], pa.string()),
-                        (DEFAULT_INTERVAL_COLUMNS[1], pa.int64()),
-                        (DEFAULT_INTERVAL_COLUMNS[2], pa.int64()),
+                        f.with_type(pa.string()) if f.name in optional else f
+                        for f in schema
                     ]
                 ),
+                has_header=False,
+                delimiter="\t",
+                file_extension=ext,
+                file_compression_type="gzip" if compressed else None,
+            )
+            return bed.select(
+                *[
+                    (
+                        functions.nullif(col(f.name), literal(".")).cast(f.type)
+                        if f.name in optional
+                        else col(f.name)
+                    ).alias(f.name)
+                    for f in schema
+                ]
             )
         else:
             return py_ctx.read_parquet(df)
@@ -1,12 +1,22 @@
-from typing import Dict, Iterator, Union
+import glob
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import re
+from typing import Callable, Dict, Iterator, Union
 
 import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 from bioframe import SCHEMAS
 from datafusion import DataFrame, SessionContext
 from polars.io.plugins import register_io_source
 from tqdm.auto import tqdm
 
 from polars_bio.polars_bio import (
+    BedReadOptions,
     InputFormat,
     ReadOptions,
     VcfReadOptions,
@@ -18,21 +28,45 @@ from polars_bio.polars_bio import (
     py_register_view,
     py_scan_sql,
     py_scan_table,
+    py_write_bgzf,
 )
 
+from . import parquet_cache
+from .bgzf_index import (
+    bam_contig_lengths,
+    bam_contigs,
+    bam_unplaced_reads,
+    find_bam_index,
+    find_index,
+    index_contig_lengths,
+    index_contigs,
+)
+from .constants import DEFAULT_INTERVAL_COLUMNS
 from .context import ctx
+from .contigs import natural_contig_order
+from .logging import logger
 from .range_op_helpers import stream_wrapper
+from .range_op_io import _lazy_parquet_inputs, _lazy_to_parquet
+
+# a contig with its 1-based, closed bounds, *None* for an open bound
+Region = tuple[str, Union[int, None], Union[int, None]]
 
 
-def read_bam(path: str) -> pl.LazyFrame:
+def read_bam(path: Union[str, list[str]]) -> pl.LazyFrame:
     """
     Read a BAM file into a LazyFrame.
 
     Parameters:
-        path: The path to the BAM file.
+        path: The path to the BAM file. A local glob pattern (e.g. `/data/*.bam`) or a list of paths can be provided to read many files as a single table, with one partition per file.
+
+    !!! note
+        BGZF blocks of BAM files are inflated on a single thread per file, since the BAM reader requires BGZF input.
+        To decode an indexed BAM file in parallel, use [read_indexed_bam](api.md#polars_bio.read_indexed_bam) with `parallel=True`.
     """
-    df = read_file(path, InputFormat.Bam, None)
-    return lazy_scan(df)
+    materialized = _scan_materialized(path)
+    if materialized is not None:
+        return materialized
+    return _read_files(path, InputFormat.Bam, None)
 
 
 # TODO handling reference
@@ -46,81 +80,960 @@ def read_bam(path: str) -> pl.LazyFrame:
 #     return file_lazy_scan(path, InputFormat.Cram)
 
 
-# TODO passing of bam_region_filter
-# def read_indexed_bam(path: str) -> pl.LazyFrame:
-#     """
-#     Read an indexed BAM file into a LazyFrame.
-#
-#     Parameters:
-#         path: The path to the BAM file.
-#
-#     !!! warning
-#         Predicate pushdown is not supported yet. So no real benefit from using an indexed BAM file.
-#     """
-#     return file_lazy_scan(path, InputFormat.IndexedBam)
+def read_indexed_bam(
+    path: Union[str, list[str]],
+    region: Union[str, list[str], None] = None,
+    parallel: bool = False,
+) -> pl.LazyFrame:
+    """
+    Read an indexed BAM file into a LazyFrame.
+
+    Parameters:
+        path: The path to the BAM file. A BAI (`.bai`) or CSI (`.csi`) index is expected next to it. A local glob pattern or a list of paths can be provided to read many files as a single table.
+        region: A region (e.g. `chr1:1-1000000` or `chr1`) or a list of regions to read. Only the BGZF blocks overlapping the regions are read and decompressed.
+            Multiple regions are read concurrently. If *None*, the whole file is read.
+        parallel: If True and no region is given, the scan is split into position windows of the reference sequences (taken from the BAM header),
+            about `datafusion.execution.target_partitions` in total and at least one per reference sequence, so that decoding and the downstream operators run in parallel.
+            Unplaced reads, which are not covered by the index, are read by an additional partition scanning the file. Files without an index are scanned as a single partition.
+
+    !!! note
+        Without `region` and `parallel`, filters on `reference` (`==`, `is_in`) combined with comparisons of `start` or `end` with literals
+        are read as regions, e.g. `pb.read_indexed_bam(path).filter(pl.col("reference") == "chr1")` reads only the BGZF blocks of `chr1`.
+    """
+    if region is not None or parallel:
+        return lazy_scan(py_read_sql(ctx, _indexed_bam_query(path, region)))
+    materialized = _scan_materialized(path)
+    if materialized is not None:
+        return materialized
+    paths = _expand_paths(path)
+    df = py_read_sql(ctx, _union_query(_file_tables(paths, InputFormat.IndexedBam)))
+
+    def _scan(
+        _columns: Union[list[str], None], predicate: Union[pl.Expr, None]
+    ) -> DataFrame:
+        regions = _predicate_regions(predicate, "reference", ["start", "end"])
+        if regions is None:
+            return df
+        try:
+            return py_read_sql(ctx, _indexed_bam_query(paths, regions))
+        except ValueError:
+            # none of the files has the references selected by the predicate
+            return df.limit(0)
+
+    return lazy_scan(_scan, df.schema())
 
 
 def read_vcf(
-    path: str,
+    path: Union[str, list[str]],
     info_fields: Union[list[str], None] = None,
     thread_num: int = 1,
     chunk_size: int = 8,
     concurrent_fetches: int = 1,
     streaming: bool = False,
+    region: Union[str, list[str], None] = None,
+    parallel: bool = False,
+    format_fields: Union[list[str], None] = None,
+    samples: Union[list[str], None] = None,
 ) -> Union[pl.LazyFrame, pl.DataFrame]:
     """
     Read a VCF file into a LazyFrame.
 
     Parameters:
-        path: The path to the VCF file.
-        info_fields: The fields to read from the INFO column.
+        path: The path to the VCF file. A local glob pattern (e.g. `/data/chr*.vcf.bgz`) or a list of paths can be provided to read many files (e.g. per-chromosome shards) as a single table, with one partition per file.
+            With `region`, files whose index does not contain the region contigs are skipped.
+        info_fields: The fields to read from the INFO column. If *None*, all INFO fields declared in the header are exposed in the schema, but only the ones used by the query (projected or filtered on) are parsed, e.g. `pb.read_vcf(path).select("chrom", "start", "af")` parses only `AF`.
+            Pass the fields explicitly to limit the schema to them.
+            Filters on `chrom` (`==`, `is_in`) combined with comparisons of `start` or `end` with literals are read as regions (see `region`) when every file is indexed,
+            e.g. `pb.read_vcf(path).filter(pl.col("chrom") == "21")` reads only the BGZF blocks of contig `21`.
+        format_fields: The FORMAT (genotype) fields to read for every sample, e.g. `["GT", "DP"]`, exposed as one column per sample and field, named `<sample>_<field>` (e.g. `NA00001_GT`).
+            FORMAT fields that are not listed are not decoded. Like INFO fields, only the listed fields used by the query are decoded, e.g. `pb.read_vcf(path, format_fields=["GT", "DP"]).select("chrom", "NA00001_GT")` decodes only `GT`. If *None*, no FORMAT fields are read.
+        samples: The samples whose FORMAT columns are exposed, e.g. `["NA00001"]`. The columns of the other samples are not projected. If *None*, the columns of every sample are exposed. Requires `format_fields`.
         thread_num: The number of threads to use for reading the VCF file. Used **only** for parallel decompression of BGZF blocks. Works only for **local** files.
         chunk_size: The size in MB of a chunk when reading from an object store. The default is 8 MB. For large scale operations, it is recommended to increase this value to 64.
         concurrent_fetches: The number of concurrent fetches when reading from an object store. The default is 1. For large scale operations, it is recommended to increase this value to 8 or even more.
         streaming: Whether to read the VCF file in streaming mode.
+        region: A region (e.g. `chr1:1-1000000` or `chr1`) or a list of regions to read. Requires a BGZF-compressed VCF file with a tabix (`.tbi`) or CSI (`.csi`) index next to it. Only the BGZF blocks overlapping the regions are read and decompressed.
+        parallel: If True and no region is given, the scan of an indexed VCF file is split into position windows of the contigs listed in its index,
+            about `datafusion.execution.target_partitions` in total and at least one per contig, so that parsing and the downstream operators run in parallel.
+            Files without an index are scanned as a single partition.
 
     !!! note
         VCF reader uses **1-based** coordinate system for the `start` and `end` columns.
+
+    !!! note
+        Since INFO fields are decoded lazily, the default schema (`info_fields=None`) contains a column for every INFO field of the header,
+        not only the fixed VCF columns. Pass `info_fields=[]` to read only the fixed columns. Multi-file reads expose the INFO fields of the first file.
+        Streaming, region and parallel reads return the same columns, but decode every listed INFO and FORMAT field.
+
+    !!! note
+        Region and parallel reads return the same schema as the default reader. The records are read with the indexed VCF reader
+        and projected onto it. With `format_fields`, which the indexed reader does not decode, the regions are filtered from a full scan instead.
+
+    !!! Example
+        ```python
+        import polars_bio as pb
+        pb.read_vcf("/tmp/gnomad.genomes.v4.1.sites.chr1.vcf.bgz", region="chr1:1-1000000").collect()
+        ```
+
+    !!! tip
+        Once a file is converted to Parquet with [materialize](api.md#polars_bio.materialize), calls with the default `info_fields`, `format_fields`, `streaming`, `region` and `parallel` read the Parquet copy instead.
     """
+    if samples is not None and format_fields is None:
+        raise ValueError("samples requires format_fields")
+    if not streaming and region is None and not parallel:
+        if info_fields is None and format_fields is None:
+            materialized = _scan_materialized(path)
+            if materialized is not None:
+                return materialized
+        return _read_vcf_projected_infos(
+            _expand_paths(path),
+            VcfReadOptions(
+                info_fields=_cleanse_infos(info_fields),
+                format_fields=_cleanse_infos(format_fields),
+                thread_num=thread_num,
+                chunk_size=chunk_size,
+                concurrent_fetches=concurrent_fetches,
+            ),
+            samples,
+        )
+    if info_fields is None:
+        # the columns of the default schema, which cannot be projected lazily here
+        info_fields = _vcf_infos(_expand_paths(path)[0])
     vcf_read_options = VcfReadOptions(
         info_fields=_cleanse_infos(info_fields),
+        format_fields=_cleanse_infos(format_fields),
         thread_num=thread_num,
         chunk_size=chunk_size,
         concurrent_fetches=concurrent_fetches,
     )
     read_options = ReadOptions(vcf_read_options=vcf_read_options)
-    if streaming:
-        return read_file(path, InputFormat.Vcf, read_options, streaming)
+    if region is not None or parallel:
+        query = _indexed_vcf_query(
+            path, region, read_options, info_fields, format_fields
+        )
+        df = lazy_scan(py_read_sql(ctx, query))
     else:
-        df = read_file(path, InputFormat.Vcf, read_options)
-        return lazy_scan(df)
+        df = _read_files(path, InputFormat.Vcf, read_options, streaming)
+    if samples is None:
+        return df
+    names = df.collect_schema().names() if isinstance(df, pl.LazyFrame) else df.columns
+    format_columns = _vcf_format_columns(
+        names, info_fields, _cleanse_infos(format_fields)
+    )
+    return df.drop(_unselected_sample_columns(format_columns, samples))
+
+
+# INFO fields of the VCF files read with the default `info_fields`, by source
+_vcf_infos_cache: dict[tuple, list[str]] = {}
+# schema of the VCF files read with the default `info_fields`, by source and FORMAT fields
+_vcf_schemas: dict[tuple, pa.Schema] = {}
+
+
+def _vcf_source_key(path: str) -> tuple:
+    mtime = None if "://" in path else os.path.getmtime(path)
+    return _table_digest(path), mtime
+
+
+def _vcf_infos(path: str) -> list[str]:
+    """
+    INFO fields declared in the header of a VCF file, read once per file (and modification time).
+    """
+    key = _vcf_source_key(path)
+    if key not in _vcf_infos_cache:
+        _vcf_infos_cache[key] = describe_vcf(path).get_column("name").to_list()
+    return _vcf_infos_cache[key]
+
+
+def _read_vcf_projected_infos(
+    paths: list[str],
+    vcf_read_options: VcfReadOptions,
+    samples: Union[list[str], None] = None,
+) -> pl.LazyFrame:
+    """
+    Expose the INFO fields of `vcf_read_options` (every INFO field of VCF files if *None*, see
+    [describe_vcf](api.md#polars_bio.describe_vcf)) and its FORMAT fields (for `samples` only) in the schema,
+    but register the files with only the INFO and FORMAT fields projected by the query when it is executed.
+    The header of the first file, whose INFO fields the other files (e.g. per-chromosome shards) are expected
+    to share, is read once to build the schema. Many files are combined with UNION ALL (see `_read_files`).
+    The tables are named after their INFO fields, so that executing the query again replaces its table
+    instead of registering a new one. Predicates selecting contigs are read from the index (see `_predicate_regions`),
+    or only skip the files without these contigs if some files are not indexed.
+    """
+    format_fields = vcf_read_options.format_fields
+
+    def _register(
+        path: str, info_fields: list[str], format_fields: Union[list[str], None]
+    ) -> str:
+        options = VcfReadOptions(
+            info_fields=info_fields,
+            format_fields=format_fields,
+            thread_num=vcf_read_options.thread_num,
+            chunk_size=vcf_read_options.chunk_size,
+            concurrent_fetches=vcf_read_options.concurrent_fetches,
+        )
+        return py_register_table(
+            ctx,
+            path,
+            f"vcf_{_table_digest(path, info_fields, format_fields)}",
+            InputFormat.Vcf,
+            ReadOptions(vcf_read_options=options),
+        ).name
+
+    def _read(
+        info_fields: list[str], format_fields: Union[list[str], None], files: list[str]
+    ) -> DataFrame:
+        tables = [_register(p, info_fields, format_fields) for p in files]
+        if len(tables) == 1:
+            return py_read_table(ctx, tables[0])
+        return py_read_sql(ctx, _union_query(tables))
+
+    infos = vcf_read_options.info_fields
+    if infos is None:
+        infos = _vcf_infos(paths[0])
+    key = _vcf_source_key(paths[0]) + (tuple(infos), tuple(format_fields or ()))
+    if key not in _vcf_schemas:
+        _vcf_schemas[key] = py_read_table(
+            ctx, _register(paths[0], infos, format_fields)
+        ).schema()
+    schema = _vcf_schemas[key]
+    names = {n.lower(): n for n in schema.names}
+    # INFO column names may be normalized (e.g. lowercased) by the reader
+    info_columns = {
+        names[i.lower()] if i not in schema.names else i: i
+        for i in infos
+        if i in schema.names or i.lower() in names
+    }
+    format_columns = _vcf_format_columns(schema.names, infos, format_fields)
+    unselected = set(_unselected_sample_columns(format_columns, samples))
+    if unselected:
+        schema = pa.schema([f for f in schema if f.name not in unselected])
+
+    def _projected(
+        columns: Union[list[str], None], predicate: Union[pl.Expr, None]
+    ) -> DataFrame:
+        df = _projected_fields(columns, predicate)
+        if columns is None and unselected:
+            # the columns of the other samples are decoded, but not exposed
+            return df.select_columns(*schema.names)
+        return df
+
+    def _projected_fields(
+        columns: Union[list[str], None], predicate: Union[pl.Expr, None]
+    ) -> DataFrame:
+        if columns is None:
+            columns = schema.names
+        columns = dict.fromkeys(columns)
+        info_fields = [info_columns[c] for c in columns if c in info_columns]
+        # FORMAT fields in the order of `format_fields`, None if none is projected
+        fields = {format_columns[c][1] for c in columns if c in format_columns}
+        format_fields_used = [f for f in format_fields or [] if f in fields] or None
+        regions = _predicate_regions(predicate, "chrom", ["start", "end"])
+        if regions is None:
+            return _read(info_fields, format_fields_used, paths)
+        if any(find_index(p) is None for p in paths):
+            files = _prune_files(paths, InputFormat.Vcf, regions)
+            if len(files) == 0:
+                return _read(info_fields, format_fields_used, paths[:1]).limit(0)
+            return _read(info_fields, format_fields_used, files)
+        options = VcfReadOptions(
+            info_fields=info_fields,
+            format_fields=format_fields_used,
+            thread_num=vcf_read_options.thread_num,
+            chunk_size=vcf_read_options.chunk_size,
+            concurrent_fetches=vcf_read_options.concurrent_fetches,
+        )
+        try:
+            query = _indexed_vcf_query(
+                paths,
+                regions,
+                ReadOptions(vcf_read_options=options),
+                info_fields,
+                format_fields_used,
+            )
+        except ValueError:
+            # none of the files has the contigs selected by the predicate
+            return _read(info_fields, format_fields_used, paths[:1]).limit(0)
+        return py_read_sql(ctx, query)
+
+    return lazy_scan(_projected, schema)
+
+
+def _vcf_format_columns(
+    names: list[str],
+    info_fields: list[str],
+    format_fields: Union[list[str], None],
+) -> dict[str, tuple[str, str]]:
+    """
+    FORMAT columns of a VCF schema with the columns `names`, named `<sample>_<field>`
+    by the reader, mapped to their sample and FORMAT field.
+    """
+    skipped = {c.lower() for c in VCF_COLUMNS + ["end"] + list(info_fields)}
+    # longer fields first, so that e.g. `X_AD` is not read as sample `X_A` of field `D`
+    fields = sorted(format_fields or [], key=len, reverse=True)
+    columns = {}
+    for name in names:
+        if name.lower() in skipped:
+            continue
+        for field in fields:
+            suffix = f"_{field}".lower()
+            if name.lower().endswith(suffix) and len(name) > len(suffix):
+                columns[name] = (name[: -len(suffix)], field)
+                break
+    return columns
+
+
+def _unselected_sample_columns(
+    format_columns: dict[str, tuple[str, str]], samples: Union[list[str], None]
+) -> list[str]:
+    """
+    The FORMAT columns (see `_vcf_format_columns`) of the samples not listed in `samples`.
+    """
+    if samples is None:
+        return []
+    selected = {s.lower() for s in samples}
+    found = {s.lower() for s, _ in format_columns.values()}
+    missing = [s for s in samples if s.lower() not in found]
+    if missing:
+        raise ValueError(f"Samples not found in the VCF file: {missing}")
+    return [c for c, (s, _) in format_columns.items() if s.lower() not in selected]
+
+
+def _indexed_vcf_query(
+    path: Union[str, list[str]],
+    region: Union[str, list[Union[str, Region]], None],
+    read_options: ReadOptions,
+    info_fields: Union[list[str], None],
+    format_fields: Union[list[str], None],
+) -> str:
+    """
+    Build a query reading regions of one or many indexed VCF files, with the schema of the default
+    VCF reader. Each region is pushed down to the index with the region filter UDF, multiple regions
+    (and files) are combined with UNION ALL, whose inputs are executed concurrently by DataFusion.
+    Files whose index has none of the requested contigs are skipped. If `region` is *None*, every
+    file is read in position windows (see `_contig_windows`), and files without an index are scanned.
+    Regions can also be given already parsed (see `_parse_region`).
+    """
+    queries = []
+    for p in _expand_paths(path):
+        unindexed = region is None and find_index(p) is None
+        regions = [] if unindexed else _file_regions(p, InputFormat.IndexedVcf, region)
+        if len(regions) == 0 and not unindexed:
+            continue
+        # the default reader is only scanned if the records cannot be projected from the index
+        table = py_register_table(
+            ctx,
+            p,
+            f"vcf_{_table_digest(p, info_fields, format_fields)}",
+            InputFormat.Vcf,
+            read_options,
+        ).name
+        if unindexed:
+            logger.warning(f"No .tbi or .csi index found, scanning {p}")
+            queries.append(f"SELECT * FROM {_sql_identifier(table)}")
+            continue
+        indexed = py_register_table(
+            ctx, p, f"indexed_{_table_digest(p)}", InputFormat.IndexedVcf, None
+        ).name
+        columns = _indexed_vcf_columns(
+            py_read_table(ctx, indexed).schema(), py_read_table(ctx, table).schema()
+        )
+        if columns is None:
+            logger.warning(
+                f"FORMAT fields are not read by the indexed VCF reader, scanning {p}"
+            )
+            queries.append(_region_scan_query(table, regions, "chrom"))
+        else:
+            queries.append(
+                _region_query(
+                    indexed,
+                    regions,
+                    "vcf_region_filter",
+                    ["chrom", "pos"],
+                    columns,
+                    "pos" if region is None else None,
+                )
+            )
+    if len(queries) == 0:
+        raise ValueError("None of the input files contains the requested regions")
+    return " UNION ALL ".join(queries)
 
 
-def read_fasta(path: str) -> pl.LazyFrame:
+def _indexed_bam_query(
+    path: Union[str, list[str]], region: Union[str, list[Union[str, Region]], None]
+) -> str:
+    """
+    Build a query reading regions of one or many indexed BAM files (see `_indexed_vcf_query`).
+    """
+    queries = []
+    for p in _expand_paths(path):
+        if region is None and find_bam_index(p) is None:
+            table = py_register_table(
+                ctx, p, f"bam_{_table_digest(p)}", InputFormat.Bam, None
+            ).name
+            logger.warning(f"No .bai or .csi index found, scanning {p}")
+            queries.append(f"SELECT * FROM {_sql_identifier(table)}")
+            continue
+        regions = _file_regions(p, InputFormat.IndexedBam, region)
+        if len(regions) == 0 and region is not None:
+            continue
+        table = py_register_table(
+            ctx, p, f"indexed_{_table_digest(p)}", InputFormat.IndexedBam, None
+        ).name
+        if len(regions) > 0:
+            queries.append(
+                _region_query(
+                    table,
+                    regions,
+                    "bam_region_filter",
+                    ["reference", "start", "end"],
+                    ["*"],
+                    "start" if region is None else None,
+                )
+            )
+        if region is None and bam_unplaced_reads(p) != 0:
+            # unplaced reads have no index bins, they are read by a scan skipping the placed ones
+            queries.append(
+                f'SELECT * FROM {_sql_identifier(table)} WHERE "reference" IS NULL'
+            )
+    if len(queries) == 0:
+        raise ValueError("None of the input files contains the requested regions")
+    return " UNION ALL ".join(queries)
+
+
+def _indexed_vcf_columns(
+    indexed_schema: pa.Schema, schema: pa.Schema
+) -> Union[list[str], None]:
+    """
+    SQL expressions projecting the columns of the indexed VCF reader (`chrom`, `pos`, `id`, `ref`, `alt`,
+    `qual`, `filters`, `info`, `formats`) onto `schema` of the default reader. Returns *None* if a column
+    of `schema` cannot be derived, i.e. FORMAT fields.
+    """
+    info = indexed_schema.field("info").type
+    infos = {
+        info.field(i).name.lower(): info.field(i).name for i in range(info.num_fields)
+    }
+
+    def _joined(column: str, separator: str) -> str:
+        if pa.types.is_list(indexed_schema.field(column).type):
+            return f"array_to_string(\"{column}\", '{separator}')"
+        return f'"{column}"'
+
+    end = 'CAST("pos" AS BIGINT) + character_length("ref") - 1'
+    if "end" in infos:
+        end = f"coalesce(CAST(\"info\"[{_sql_string(infos['end'])}] AS BIGINT), {end})"
+    base = {
+        "chrom": '"chrom"',
+        "start": '"pos"',
+        "end": end,
+        "id": _joined("id", ";"),
+        "ref": '"ref"',
+        "alt": _joined("alt", "|"),
+        "qual": '"qual"',
+        "filter": _joined("filters", ";"),
+    }
+    columns = []
+    for field in schema:
+        if field.name in base:
+            expr = base[field.name]
+        elif field.name.lower() in infos:
+            expr = f'"info"[{_sql_string(infos[field.name.lower()])}]'
+        else:
+            return None
+        sql_type = _sql_type(field.type)
+        if sql_type is not None:
+            expr = f"CAST({expr} AS {sql_type})"
+        columns.append(f"{expr} AS {_sql_identifier(field.name)}")
+    return columns
+
+
+_SQL_TYPES = {
+    pa.int8(): "TINYINT",
+    pa.int16(): "SMALLINT",
+    pa.int32(): "INT",
+    pa.int64(): "BIGINT",
+    pa.uint8(): "TINYINT UNSIGNED",
+    pa.uint16(): "SMALLINT UNSIGNED",
+    pa.uint32(): "INT UNSIGNED",
+    pa.uint64(): "BIGINT UNSIGNED",
+    pa.float32(): "FLOAT",
+    pa.float64(): "DOUBLE",
+    pa.bool_(): "BOOLEAN",
+    pa.string(): "VARCHAR",
+    pa.large_string(): "VARCHAR",
+    pa.string_view(): "VARCHAR",
+}
+
+
+def _sql_type(data_type: pa.DataType) -> Union[str, None]:
+    # nested types other than lists of primitives are kept as read
+    if pa.types.is_list(data_type) or pa.types.is_large_list(data_type):
+        item = _SQL_TYPES.get(data_type.value_type)
+        return None if item is None else f"{item}[]"
+    return _SQL_TYPES.get(data_type)
+
+
+def _table_digest(path: str, *parts) -> str:
+    source = path if "://" in path else os.path.abspath(path)
+    return hashlib.sha1(repr((source,) + parts).encode()).hexdigest()[:16]
+
+
+def _file_regions(
+    path: str,
+    input_format: InputFormat,
+    region: Union[str, list[Union[str, Region]], None],
+) -> list[Region]:
+    contigs = _file_contigs(path, input_format)
+    if region is None:
+        if contigs is None:
+            raise ValueError(f"No .tbi or .csi index found for: {path}")
+        if input_format == InputFormat.IndexedBam:
+            lengths = bam_contig_lengths(path)
+        else:
+            lengths = index_contig_lengths(path)
+        partitions = ctx.get_option("datafusion.execution.target_partitions")
+        return _contig_windows(lengths, int(partitions or 1))
+    regions = [region] if isinstance(region, str) else region
+    regions = [_parse_region(r, contigs) if isinstance(r, str) else r for r in regions]
+    if contigs is None:
+        return regions
+    contigs = set(contigs)
+    return [r for r in regions if r[0] in contigs]
+
+
+def _contig_windows(lengths: dict[str, int], partitions: int) -> list[Region]:
+    """
+    Split contigs into about `partitions` position windows in total, proportionally to their lengths,
+    with at least one window per contig. The first and last windows of a contig are open, so that
+    the records beyond an estimated length (see `index_contig_lengths`) are read too.
+    """
+    total = sum(lengths.values())
+    windows = []
+    for contig, length in lengths.items():
+        n = max(1, min(round(partitions * length / total) if total else 1, length))
+        size = -(-length // n)
+        for i in range(n):
+            start = None if i == 0 else i * size + 1
+            end = None if i == n - 1 else (i + 1) * size
+            windows.append((contig, start, end))
+    return windows
+
+
+def _file_contigs(path: str, input_format: InputFormat) -> Union[list[str], None]:
+    # the contigs of a file, from its index or BAM header, *None* if they are not known
+    if input_format in (InputFormat.Bam, InputFormat.IndexedBam):
+        return bam_contigs(path)
+    if find_index(path) is not None:
+        return index_contigs(path)
+    return None
+
+
+def _prune_files(
+    paths: list[str], input_format: InputFormat, regions: list[Region]
+) -> list[str]:
+    """
+    Select the files which may contain records of `regions`, i.e. all the files whose contigs are not known.
+    """
+    contigs = {r[0] for r in regions}
+    files = []
+    for p in paths:
+        file_contigs = _file_contigs(p, input_format)
+        if file_contigs is None or not contigs.isdisjoint(file_contigs):
+            files.append(p)
+    return files
+
+
+# the compression extensions before which the format extension is read (see `scan.rs`)
+_COMPRESSION_EXTENSIONS = (".gz", ".bgz", ".bgzf", ".bz2", ".xz", ".zst")
+
+
+def _input_format(path: str) -> InputFormat:
+    name = path.lower()
+    for ext in _COMPRESSION_EXTENSIONS:
+        if name.endswith(ext):
+            name = name[: -len(ext)]
+            break
+    if name.endswith(".parquet"):
+        return InputFormat.Parquet
+    elif name.endswith((".csv", ".tsv")):
+        return InputFormat.Csv
+    elif name.endswith(".bed"):
+        return InputFormat.Bed
+    elif name.endswith(".vcf"):
+        return InputFormat.Vcf
+    elif name.endswith(".bam"):
+        return InputFormat.Bam
+    raise ValueError(f"Unsupported format: {path}")
+
+
+def _contig_column(input_format: InputFormat) -> str:
+    if input_format in (InputFormat.Bam, InputFormat.IndexedBam):
+        return "reference"
+    return "chrom"
+
+
+def _expand_paths(path: Union[str, list[str]]) -> list[str]:
+    """
+    Expand a path, a local glob pattern or a list of paths into a list of paths.
+    """
+    if isinstance(path, list):
+        return path
+    if "://" not in path and glob.has_magic(path):
+        paths = sorted(glob.glob(path))
+        if len(paths) == 0:
+            raise ValueError(f"No files found for: {path}")
+        return paths
+    return [path]
+
+
+def _file_table_name(path: str, paths: list[str]) -> Union[str, None]:
+    # files of a multi-file table may share a name (e.g. in different directories)
+    if len(paths) == 1:
+        return None
+    return f"file_{_table_digest(path)}"
+
+
+def _read_files(
+    path: Union[str, list[str]],
+    input_format: InputFormat,
+    read_options: Union[ReadOptions, None],
+    streaming: bool = False,
+) -> Union[pl.LazyFrame, pl.DataFrame]:
+    """
+    Read one or many files of the same format as a single table. Each file is registered
+    separately and the tables are combined with UNION ALL, so that every file is scanned
+    as a separate, concurrently executed partition. Files whose index (or BAM header) has
+    none of the contigs selected by the Polars predicate (see `_predicate_regions`) are skipped.
+    """
+    paths = _expand_paths(path)
+    if len(paths) == 1:
+        if streaming:
+            return read_file(paths[0], input_format, read_options, streaming)
+        return lazy_scan(read_file(paths[0], input_format, read_options))
+    tables = _file_tables(paths, input_format, read_options)
+    query = _union_query(tables)
+    if streaming:
+        return stream_wrapper(py_scan_sql(ctx, query))
+    df = py_read_sql(ctx, query)
+
+    def _pruned(
+        _columns: Union[list[str], None], predicate: Union[pl.Expr, None]
+    ) -> DataFrame:
+        regions = _predicate_regions(
+            predicate, _contig_column(input_format), ["start", "end"]
+        )
+        if regions is None:
+            return df
+        files = set(_prune_files(paths, input_format, regions))
+        if len(files) == len(set(paths)):
+            return df
+        if len(files) == 0:
+            return df.limit(0)
+        return py_read_sql(
+            ctx, _union_query([t for p, t in zip(paths, tables) if p in files])
+        )
+
+    return lazy_scan(_pruned, df.schema())
+
+
+def _file_tables(
+    paths: list[str],
+    input_format: InputFormat,
+    read_options: Union[ReadOptions, None] = None,
+) -> list[str]:
+    # the files registered as separate tables (see `_read_files`)
+    return [
+        py_register_table(
+            ctx, p, _file_table_name(p, paths), input_format, read_options
+        ).name
+        for p in paths
+    ]
+
+
+def _union_query(tables: list[str]) -> str:
+    return " UNION ALL ".join(f"SELECT * FROM {_sql_identifier(t)}" for t in tables)
+
+
+def _region_query(
+    table_name: str,
+    regions: list[Region],
+    region_filter: str,
+    region_cols: list[str],
+    columns: list[str],
+    position_col: Union[str, None] = None,
+) -> str:
+    """
+    Read each region with the region filter UDF, combined with UNION ALL. With `position_col`, the regions
+    are windows (see `_contig_windows`) keeping only the records starting in them, so that the records
+    spanning two windows are read once.
+    """
+    if len(regions) == 0:
+        raise ValueError("At least one region must be provided")
+    cols = ", ".join(_sql_identifier(c) for c in region_cols)
+    projection = ", ".join(columns)
+    queries = []
+    for contig, start, end in regions:
+        condition = f"{region_filter}({_sql_string(_format_region(contig, start, end))}, {cols})"
+        if position_col is not None and start is not None:
+            condition += f" AND {_sql_identifier(position_col)} >= {int(start)}"
+        if position_col is not None and end is not None:
+            condition += f" AND {_sql_identifier(position_col)} <= {int(end)}"
+        queries.append(
+            f"SELECT {projection} FROM {_sql_identifier(table_name)} WHERE {condition}"
+        )
+    return " UNION ALL ".join(queries)
+
+
+def _region_scan_query(
+    table_name: str,
+    regions: list[Region],
+    contig_col: str,
+) -> str:
+    # a single scan of the file, filtered on the 1-based, closed regions
+    conditions = []
+    for contig, start, end in regions:
+        condition = f"{_sql_identifier(contig_col)} = {_sql_string(contig)}"
+        if start is not None:
+            condition += f' AND "end" >= {int(start)}'
+        if end is not None:
+            condition += f' AND "start" <= {int(end)}'
+        conditions.append(f"({condition})")
+    return (
+        f"SELECT * FROM {_sql_identifier(table_name)} WHERE {' OR '.join(conditions)}"
+    )
+
+
+def _sql_string(value: str) -> str:
+    # quotes are escaped by doubling them, the only escape of SQL string literals
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _sql_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+# the largest position accepted by the region filters
+_MAX_POSITION = 2**31 - 1
+
+
+def _parse_region(region: str, contigs: Union[list[str], None] = None) -> Region:
+    """
+    Split a region (`chrom`, `chrom:start` or `chrom:start-end`) into its contig and 1-based bounds.
+    The interval is parsed from the right, so that contig names containing `:` (e.g. the HLA contigs
+    of GRCh38) are supported. A region equal to one of `contigs` is read as the whole contig.
+    """
+    contig, start, end = region, None, None
+    if contigs is None or region not in contigs:
+        match = re.fullmatch(r"(.+):(\d[\d,]*)(?:-(\d[\d,]*))?", region)
+        if match is not None:
+            contig = match[1]
+            start = int(match[2].replace(",", ""))
+            end = None if match[3] is None else int(match[3].replace(",", ""))
+    if re.search(r"\s", contig) or contig == "":
+        raise ValueError(
+            f"Invalid region: '{region}', expected 'chrom', 'chrom:start' or 'chrom:start-end'"
+        )
+    return contig, start, end
+
+
+def _format_region(contig: str, start: Union[int, None], end: Union[int, None]) -> str:
+    if start is None and end is None and ":" not in contig:
+        return contig
+    # an explicit interval keeps contig names containing ':' from being split
+    return f"{contig}:{start or 1}-{end or _MAX_POSITION}"
+
+
+# a region without bounds on the contig or positions
+_ANY_REGION = (None, None, None)
+# comparisons with the literal on the left, as seen from the column
+_FLIPPED_OPS = {"Lt": "Gt", "LtEq": "GtEq", "Gt": "Lt", "GtEq": "LtEq"}
+
+
+def _predicate_regions(
+    predicate: Union[pl.Expr, None], contig_col: str, position_cols: list[str]
+) -> Union[list[Region], None]:
+    """
+    Translate a Polars predicate into the regions it selects, so that it can be read from the index.
+    Equality and `is_in` on `contig_col`, and comparisons (including `is_between`) of `position_cols`
+    with integer literals, combined with `&` and `|`, are translated, other expressions do not restrict
+    the regions. The regions may select more records than the predicate, which is still applied to the
+    records read. Returns *None* if the predicate does not restrict the contigs.
+    """
+    if predicate is None:
+        return None
+    try:
+        tree = json.loads(predicate.meta.serialize(format="json"))
+    except Exception:  # e.g. expressions calling Python functions
+        return None
+    regions = []
+    for contig, start, end in _expr_regions(tree, contig_col, position_cols):
+        if contig is None:
+            return None
+        if (end is not None and end < 1) or (start or 1) > _MAX_POSITION:
+            continue
+        start = None if start is None or start <= 1 else start
+        end = None if end is None or end >= _MAX_POSITION else end
+        regions.append((contig, start, end))
+    return list(dict.fromkeys(regions))
+
+
+def _expr_regions(node: dict, contig_col: str, position_cols: list[str]) -> list:
+    # regions of a serialized expression, with *None* for an unrestricted contig or bound
+    if "BinaryExpr" in node:
+        left, op, right = (node["BinaryExpr"][k] for k in ("left", "op", "right"))
+        if op in ("And", "LogicalAnd"):
+            left = _expr_regions(left, contig_col, position_cols)
+            right = _expr_regions(right, contig_col, position_cols)
+            regions = (_intersect_regions(a, b) for a in left for b in right)
+            return [r for r in regions if r is not None]
+        if op in ("Or", "LogicalOr"):
+            return _expr_regions(left, contig_col, position_cols) + _expr_regions(
+                right, contig_col, position_cols
+            )
+        if _expr_column(left) is None:
+            left, right, op = right, left, _FLIPPED_OPS.get(op, op)
+        column, value = _expr_column(left), _expr_literal(right)
+        if column == contig_col and op == "Eq" and isinstance(value, str):
+            return [(value, None, None)]
+        if column in position_cols and isinstance(value, int):
+            bounds = {
+                "Eq": (value, value),
+                "GtEq": (value, None),
+                "Gt": (value + 1, None),
+                "LtEq": (None, value),
+                "Lt": (None, value - 1),
+            }
+            if op in bounds:
+                return [(None, *bounds[op])]
+    elif "Function" in node:
+        function, inputs = node["Function"]["function"], node["Function"]["input"]
+        column = _expr_column(inputs[0])
+        values = [_expr_literal(i) for i in inputs[1:]]
+        if function == {"Boolean": "IsIn"} and column == contig_col:
+            if isinstance(values[0], list):
+                return [(v, None, None) for v in values[0] if isinstance(v, str)]
+        elif (
+            isinstance(function, dict)
+            and isinstance(function.get("Boolean"), dict)
+            and "IsBetween" in function["Boolean"]
+            and column in position_cols
+            and all(isinstance(v, int) for v in values)
+        ):
+            # the closed bounds also select the records of an open interval
+            return [(None, values[0], values[1])]
+    return [_ANY_REGION]
+
+
+def _intersect_regions(a: tuple, b: tuple) -> Union[tuple, None]:
+    if a[0] is not None and b[0] is not None and a[0] != b[0]:
+        return None
+    starts = [s for s in (a[1], b[1]) if s is not None]
+    ends = [e for e in (a[2], b[2]) if e is not None]
+    start = max(starts) if starts else None
+    end = min(ends) if ends else None
+    if start is not None and end is not None and start > end:
+        return None
+    return a[0] if a[0] is not None else b[0], start, end
+
+
+def _expr_column(node: dict) -> Union[str, None]:
+    return node.get("Column") if isinstance(node, dict) else None
+
+
+def _expr_literal(node: dict):
+    # the Python value of a (cast) literal, a list for a Series literal
+    while isinstance(node, dict) and "Cast" in node:
+        node = node["Cast"]["expr"]
+    if not isinstance(node, dict) or not isinstance(node.get("Literal"), dict):
+        return None
+    ((dtype, value),) = node["Literal"].items()
+    if dtype == "Series":
+        return value["values"]
+    if isinstance(value, bool) or dtype == "Null":
+        return None
+    return value
+
+
+def read_bed(
+    path: Union[str, list[str]],
+    schema: Union[str, None] = None,
+    thread_num: int = 1,
+    streaming: bool = False,
+) -> Union[pl.LazyFrame, pl.DataFrame]:
+    """
+    Read a BED, bedGraph or narrowPeak file into a LazyFrame. The columns are named as in `bioframe.SCHEMAS`
+    (`chrom`, `start`, `end`, `name`, `score`, `strand`, `thickStart`, ...), so the result can be used in range operations with the default columns.
+
+    Parameters:
+        path: The path to the BED file (plain, gzip or BGZF-compressed). A local glob pattern or a list of paths can be provided to read many files as a single table.
+        schema: One of `bed3`..`bed12`, `bedGraph` or `narrowPeak`. If *None*, `bedN` is detected from the number of columns in the first record of a local file, remote files default to `bed3`.
+            Columns beyond the 12 BED ones are read as strings named `column_13`, `column_14`, ...
+        thread_num: The number of threads to use for parallel decompression of BGZF blocks. Works only for **local** BGZF-compressed files, whose blocks are inflated and checked against their CRC32 while the file is scanned, a bounded number of blocks at a time, without writing a decompressed copy. Uncompressed files are split into byte ranges and parsed in parallel (see `datafusion.execution.target_partitions`).
+        streaming: Whether to read the BED file in streaming mode.
+
+    !!! note
+        Lines starting with `#`, `track` or `browser` are skipped, and `.` is read as null in the numeric columns (e.g. `score`, `thickStart`).
+        Files with `track` or `browser` lines are read line by line, which is slower than the default parser.
+
+    !!! Example
+        ```python
+        import polars_bio as pb
+        pb.read_bed("/tmp/ENCFF001XKR.bed.gz", schema="bed9").collect()
+        ```
+    """
+    if schema is None and not streaming:
+        materialized = _scan_materialized(path)
+        if materialized is not None:
+            return materialized
+    read_options = ReadOptions(
+        thread_num=thread_num, bed_read_options=BedReadOptions(schema=schema)
+    )
+    return _read_files(path, InputFormat.Bed, read_options, streaming)
+
+
+def read_fasta(path: str, thread_num: int = 1) -> pl.LazyFrame:
     """
     Read a FASTA file into a LazyFrame.
 
     Parameters:
         path: The path to the FASTA file.
+        thread_num: The number of threads to use for parallel decompression of BGZF blocks. Works only for **local** BGZF-compressed files, whose blocks are inflated and checked against their CRC32 while the file is scanned, a bounded number of blocks at a time, without writing a decompressed copy.
     """
-    df = read_file(path, InputFormat.Fasta, None)
+    materialized = _scan_materialized(path)
+    if materialized is not None:
+        return materialized
+    df = read_file(path, InputFormat.Fasta, ReadOptions(thread_num=thread_num))
     return lazy_scan(df)
 
 
-def read_fastq(path: str) -> pl.LazyFrame:
+def read_fastq(path: str, thread_num: int = 1) -> pl.LazyFrame:
     """
     Read a FASTQ file into a LazyFrame.
 
     Parameters:
         path: The path to the FASTQ file.
+        thread_num: The number of threads to use for parallel decompression of BGZF blocks. Works only for **local** BGZF-compressed files, whose blocks are inflated and checked against their CRC32 while the file is scanned, a bounded number of blocks at a time, without writing a decompressed copy.
     """
-    df = read_file(path, InputFormat.Fastq, None)
+    materialized = _scan_materialized(path)
+    if materialized is not None:
+        return materialized
+    df = read_file(path, InputFormat.Fastq, ReadOptions(thread_num=thread_num))
     return lazy_scan(df)
 
 
-def lazy_scan(df: Union[pl.DataFrame, pl.LazyFrame]) -> pl.LazyFrame:
-    df_lazy: DataFrame = df
-    arrow_schema = df_lazy.schema()
+def lazy_scan(
+    df: Union[
+        DataFrame,
+        Callable[[Union[list[str], None], Union[pl.Expr, None]], DataFrame],
+    ],
+    schema: Union[pa.Schema, None] = None,
+) -> pl.LazyFrame:
+    """
+    Wrap a DataFusion DataFrame into a Polars LazyFrame. `df` can also be a function building
+    the DataFrame from the columns projected by the Polars query (or *None* for all columns)
+    and its predicate (or *None*) when it is executed, `schema` is then required.
+    The predicate is applied to the DataFrame in any case.
+    """
+    arrow_schema = df.schema() if schema is None else schema
 
     def _overlap_source(
         with_columns: Union[pl.Expr, None],
@@ -128,30 +1041,37 @@ def lazy_scan(df: Union[pl.DataFrame, pl.LazyFrame]) -> pl.LazyFrame:
         n_rows: Union[int, None],
         _batch_size: Union[int, None],
     ) -> Iterator[pl.DataFrame]:
+        if callable(df):
+            columns = with_columns
+            if columns is not None and predicate is not None:
+                columns = list(columns) + predicate.meta.root_names()
+            df_lazy: DataFrame = df(columns, predicate)
+        else:
+            df_lazy = df
         if n_rows and n_rows < 8192:  # 8192 is the default batch size in datafusion
-            df = df_lazy.execute_stream().next().to_pyarrow()
-            df = pl.DataFrame(df).limit(n_rows)
+            batch_df = df_lazy.execute_stream().next().to_pyarrow()
+            batch_df = pl.DataFrame(batch_df).limit(n_rows)
             if predicate is not None:
-                df = df.filter(predicate)
+                batch_df = batch_df.filter(predicate)
             # TODO: We can push columns down to the DataFusion plan in the future,
             #  but for now we'll do it here.
             if with_columns is not None:
-                df = df.select(with_columns)
-            yield df
+                batch_df = batch_df.select(with_columns)
+            yield batch_df
             return
         df_stream = df_lazy.execute_stream()
         progress_bar = tqdm(unit="rows")
         for r in df_stream:
             py_df = r.to_pyarrow()
-            df = pl.DataFrame(py_df)
+            batch_df = pl.DataFrame(py_df)
             if predicate is not None:
-                df = df.filter(predicate)
+                batch_df = batch_df.filter(predicate)
             # TODO: We can push columns down to the DataFusion plan in the future,
             #  but for now we'll do it here.
             if with_columns is not None:
-                df = df.select(with_columns)
-            progress_bar.update(len(df))
-            yield df
+                batch_df = batch_df.select(with_columns)
+            progress_bar.update(len(batch_df))
+            yield batch_df
 
     return register_io_source(_overlap_source, schema=arrow_schema)
 
@@ -251,6 +1171,9 @@ def register_vcf(
     thread_num: int = 1,
     chunk_size: int = 64,
     concurrent_fetches: int = 8,
+    parallel: bool = False,
+    format_fields: Union[list[str], None] = None,
+    samples: Union[list[str], None] = None,
 ) -> None:
     """
     Register a VCF file as a Datafusion table.
@@ -259,9 +1182,13 @@ def register_vcf(
         path: The path to the VCF file.
         name: The name of the table. If *None*, the name of the table will be generated automatically based on the path.
         info_fields: The fields to read from the INFO column.
+        format_fields: The FORMAT (genotype) fields to read for every sample, e.g. `["GT", "DP"]`, exposed as one column per sample and field, named `<sample>_<field>`. FORMAT fields that are not listed are not decoded. If *None*, no FORMAT fields are read.
+        samples: The samples whose FORMAT columns are exposed. If set, the file is registered as a view projecting the columns of these samples only. Requires `format_fields`.
         thread_num: The number of threads to use for reading the VCF file. Used **only** for parallel decompression of BGZF blocks. Works only for **local** files.
         chunk_size: The size in MB of a chunk when reading from an object store. Default settings are optimized for large scale operations. For small scale (interactive) operations, it is recommended to decrease this value to **8-16**.
         concurrent_fetches: The number of concurrent fetches when reading from an object store. Default settings are optimized for large scale operations. For small scale (interactive) operations, it is recommended to decrease this value to **1-2**.
+        parallel: If True, an indexed VCF file is registered as a view with one partition per contig listed in its `.tbi`/`.csi` index,
+            so that queries and range operations on it run in parallel. The view has the same schema as the table registered without `parallel`.
 
     !!! note
         VCF reader uses **1-based** coordinate system for the `start` and `end` columns.
@@ -280,12 +1207,41 @@ def register_vcf(
 
     vcf_read_options = VcfReadOptions(
         info_fields=_cleanse_infos(info_fields),
+        format_fields=_cleanse_infos(format_fields),
         thread_num=thread_num,
         chunk_size=chunk_size,
         concurrent_fetches=concurrent_fetches,
     )
     read_options = ReadOptions(vcf_read_options=vcf_read_options)
-    py_register_table(ctx, path, name, InputFormat.Vcf, read_options)
+    if samples is not None and format_fields is None:
+        raise ValueError("samples requires format_fields")
+    if not parallel and samples is None:
+        py_register_table(ctx, path, name, InputFormat.Vcf, read_options)
+        return
+    if name is None:
+        table = py_register_table(ctx, path, None, InputFormat.Vcf, read_options)
+        name = f"{table.name}_parallel" if parallel else f"{table.name}_samples"
+    if parallel:
+        query = _indexed_vcf_query(path, None, read_options, info_fields, format_fields)
+    else:
+        table = py_register_table(
+            ctx,
+            path,
+            f"vcf_{_table_digest(path, info_fields, format_fields)}",
+            InputFormat.Vcf,
+            read_options,
+        ).name
+        query = f"SELECT * FROM {_sql_identifier(table)}"
+    if samples is not None:
+        names = py_read_sql(ctx, query).schema().names
+        format_columns = _vcf_format_columns(
+            names, info_fields or [], _cleanse_infos(format_fields)
+        )
+        unselected = set(_unselected_sample_columns(format_columns, samples))
+        columns = ", ".join(_sql_identifier(n) for n in names if n not in unselected)
+        query = f"SELECT {columns} FROM ({query})"
+    py_register_view(ctx, name, query)
+    logger.info(f"View: {name} registered for path: {path}")
 
 
 def register_view(name: str, query: str) -> None:
@@ -377,12 +1333,379 @@ def from_polars(name: str, df: Union[pl.DataFrame, pl.LazyFrame]) -> None:
         └─────┴─────┘
         ```
     """
-    reader = (
-        df.to_arrow()
-        if isinstance(df, pl.DataFrame)
-        else df.collect().to_arrow().to_reader()
+    if isinstance(df, pl.LazyFrame):
+        # stream the pipeline to Parquet instead of collecting it in memory
+        path = _lazy_to_parquet(df, ctx.catalog_dir)
+        py_register_table(ctx, path, name, InputFormat.Parquet, None)
+    else:
+        py_from_polars(ctx, name, df.to_arrow())
+
+
+def materialize(
+    path: str,
+    out_dir: str,
+    partition_by: Union[str, None] = "chrom",
+    sort_by: Union[str, None] = "start",
+) -> pl.LazyFrame:
+    """
+    Convert a file of any supported format into sorted Parquet files with column statistics, one per contig, and cache it:
+    as long as `path` is not modified, subsequent reads of `path` (e.g. [read_vcf](api.md#polars_bio.read_vcf) or [read_bam](api.md#polars_bio.read_bam))
+    and range operations on `path` use the Parquet copy instead of parsing the source again.
+
+    Parameters:
+        path: The path to a local VCF, BAM, BED, FASTA, FASTQ, CSV or Parquet file (optionally gzip or BGZF-compressed).
+        out_dir: The directory of the Parquet files and of the manifest recording the modification time of `path`. An up-to-date copy found in `out_dir` is reused without conversion.
+        partition_by: The contig column to partition by. If the file has no such column, the contig column of its reader is used (`chrom`, or `reference` for BAM).
+            If *None* or the file has no contig column (e.g. FASTQ), a single Parquet file is written.
+        sort_by: The column to sort every partition by, so that the row group statistics of the column skip row groups outside of the queried ranges. Ignored if the file has no such column.
+
+    Returns:
+        A LazyFrame scanning the Parquet copy, with the partitions in karyotypic contig order.
+
+    !!! note
+        Reads with options changing the schema (e.g. `info_fields` or `region` of [read_vcf](api.md#polars_bio.read_vcf)) always read the source file.
+
+    !!! note
+        The materialized paths are recorded in the current Python process only. In a new process, call `materialize` again with the same `out_dir`:
+        the up-to-date Parquet copy is found through its manifest and registered without conversion.
+
+    !!! Example
+        ```python
+        import polars_bio as pb
+        pb.materialize("/tmp/gnomad.exomes.v4.1.sites.chr21.vcf.bgz", "/tmp/gnomad_chr21")
+        pb.read_vcf("/tmp/gnomad.exomes.v4.1.sites.chr21.vcf.bgz").filter(pl.col("chrom") == "chr21").collect()
+        ```
+    """
+    if "://" in path:
+        raise ValueError(f"Only local files can be materialized: {path}")
+    manifest = parquet_cache.read_manifest(out_dir)
+    if parquet_cache.is_fresh(manifest, path):
+        logger.info(f"Reusing the Parquet copy of {path} in {out_dir}")
+    else:
+        manifest = _materialize(path, out_dir, partition_by, sort_by)
+    parquet_cache.register(path, out_dir)
+    return pl.scan_parquet(parquet_cache.partition_paths(manifest))
+
+
+_CONTIG_COLUMNS = ["chrom", "reference"]
+
+
+def _materialize(
+    path: str,
+    out_dir: str,
+    partition_by: Union[str, None],
+    sort_by: Union[str, None],
+) -> dict:
+    # taken before reading, so that a concurrent modification invalidates the copy
+    source_stat = parquet_cache.source_stat(path)
+    os.makedirs(out_dir, exist_ok=True)
+    _remove_materialized(out_dir)
+    df = _materialize_reader(path)
+    schema = df.collect_schema()
+    if partition_by is not None and partition_by not in schema:
+        if partition_by not in _CONTIG_COLUMNS:
+            raise ValueError(f"Column {partition_by} not found in {path}")
+        partition_by = next((c for c in _CONTIG_COLUMNS if c in schema), None)
+    if sort_by not in schema:
+        sort_by = None
+    # the source is parsed and sorted once into an intermediate Parquet file,
+    # whose contiguous contig runs are then split into partitions in a single pass
+    keys = [] if partition_by is None else natural_contig_order(pl.col(partition_by))
+    if sort_by is not None:
+        keys.append(pl.col(sort_by))
+    if keys:
+        names = [f"__pb_sort_key_{i}" for i in range(len(keys))]
+        df = (
+            df.with_columns(k.alias(n) for k, n in zip(keys, names))
+            .sort(names, nulls_last=True)
+            .drop(names)
+        )
+    tmp_path = _lazy_to_parquet(df, ctx.catalog_dir)
+    try:
+        partitions = _split_partitions(tmp_path, out_dir, partition_by)
+    finally:
+        os.remove(tmp_path)
+    manifest = {
+        "source": os.path.abspath(path),
+        "source_stat": source_stat,
+        "partition_by": partition_by,
+        "sort_by": sort_by,
+        "partitions": partitions,
+    }
+    parquet_cache.write_manifest(out_dir, manifest)
+    return parquet_cache.read_manifest(out_dir)
+
+
+def _split_partitions(
+    path: str, out_dir: str, partition_by: Union[str, None]
+) -> list[dict]:
+    """
+    Split a Parquet file sorted by `partition_by` into one file per value of the column.
+    """
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    partitions = []
+    writer = None
+    try:
+        for batch in parquet_file.iter_batches():
+            runs = [{"len": batch.num_rows, "value": None}]
+            if partition_by is not None:
+                contigs = pl.from_arrow(batch.column(partition_by)).cast(pl.Utf8)
+                runs = contigs.rle().to_list()
+            offset = 0
+            for run in runs:
+                if writer is None or (
+                    partition_by is not None and run["value"] != partitions[-1]["value"]
+                ):
+                    if writer is not None:
+                        writer.close()
+                    name = f"part-{len(partitions):05d}.parquet"
+                    writer = pq.ParquetWriter(
+                        os.path.join(out_dir, name), schema, compression="zstd"
+                    )
+                    partitions.append({"value": run["value"], "path": name})
+                writer.write_batch(batch.slice(offset, run["len"]))
+                offset += run["len"]
+        if writer is None:
+            # an empty source still has a (single, empty) partition
+            name = "part-00000.parquet"
+            writer = pq.ParquetWriter(os.path.join(out_dir, name), schema)
+            partitions.append({"value": None, "path": name})
+    finally:
+        if writer is not None:
+            writer.close()
+        parquet_file.close()
+    return partitions
+
+
+def _remove_materialized(out_dir: str) -> None:
+    manifest = parquet_cache.read_manifest(out_dir)
+    if manifest is None:
+        return
+    os.remove(os.path.join(out_dir, parquet_cache.MANIFEST_FILE))
+    for part_path in parquet_cache.partition_paths(manifest):
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def _materialize_reader(path: str) -> pl.LazyFrame:
+    name = path.lower()
+    for ext in (".gz", ".bgz", ".bgzf"):
+        name = name.removesuffix(ext)
+    readers = {
+        ".vcf": read_vcf,
+        ".bam": read_bam,
+        ".bed": read_bed,
+        ".fasta": read_fasta,
+        ".fa": read_fasta,
+        ".fastq": read_fastq,
+        ".fq": read_fastq,
+        ".parquet": pl.scan_parquet,
+        ".csv": pl.scan_csv,
+    }
+    for ext, reader in readers.items():
+        if name.endswith(ext):
+            return reader(path)
+    raise ValueError(f"Unsupported file format: {path}")
+
+
+def _scan_materialized(path: Union[str, list[str]]) -> Union[pl.LazyFrame, None]:
+    """
+    Scan the Parquet copy of `path` if it was [materialized](api.md#polars_bio.materialize) and has not changed since.
+    """
+    if not isinstance(path, str):
+        return None
+    manifest = parquet_cache.lookup(path)
+    if manifest is None:
+        return None
+    return pl.scan_parquet(parquet_cache.partition_paths(manifest))
+
+
+def write_bed(
+    df: Union[pl.LazyFrame, pl.DataFrame],
+    path: str,
+    cols: Union[list[str], None] = None,
+    index: Union[str, None] = "tbi",
+    thread_num: int = 1,
+) -> None:
+    """
+    Write intervals to a BGZF-compressed BED file and index it with tabix.
+
+    Parameters:
+        df: The intervals, sorted by contig and start if an index is built (see [sort](api.md#polars_bio.LazyFrame.sort)).
+        path: The path to the output file, e.g. `out.bed.gz`.
+        cols: The names of the contig, start and end (0-based) columns, written first. The remaining columns follow in their order.
+        index: `tbi` or `csi` to write a `.tbi`/`.csi` index next to the file while compressing it, *None* to skip indexing.
+        thread_num: The number of threads used to compress BGZF blocks.
+    """
+    cols = DEFAULT_INTERVAL_COLUMNS if cols is None else cols
+    df = df.lazy()
+    schema = df.collect_schema()
+    columns = list(cols) + [c for c in schema.names() if c not in cols]
+    line = pl.concat_str(
+        [_text_expr(c, schema[c]).fill_null(".") for c in columns], separator="\t"
+    )
+    records = df.select(
+        line.alias("line"),
+        pl.col(cols[0]).cast(pl.Utf8).alias("contig"),
+        pl.col(cols[1]).alias("begin"),
+        pl.col(cols[2]).alias("end"),
+    )
+    _write_bgzf(records, path, "", "bed", index, thread_num)
+
+
+def write_vcf(
+    df: Union[pl.LazyFrame, pl.DataFrame],
+    path: str,
+    header: Union[str, list[str], None] = None,
+    info_fields: Union[list[str], None] = None,
+    index: Union[str, None] = "tbi",
+    thread_num: int = 1,
+) -> None:
+    """
+    Write variants (e.g. the output of [read_vcf](api.md#polars_bio.read_vcf)) to a BGZF-compressed, sites-only VCF file and index it with tabix.
+
+    Parameters:
+        df: The variants with the `chrom`, `start` (1-based POS), `id`, `ref`, `alt`, `qual` and `filter` columns, sorted by `chrom` and `start` if an index is built.
+        path: The path to the output file, e.g. `out.vcf.gz`.
+        header: A path to a VCF file whose meta-information (`##`) lines are copied, or a list of these lines. INFO fields are written with the case of the matching `##INFO` IDs, `##INFO` lines are generated from the column types for the ones the header does not declare. If *None*, a minimal header is generated from the column types.
+        info_fields: The columns written to the INFO field. If *None*, all the columns not listed above (and `end`) are written.
+        index: `tbi` or `csi` to write a `.tbi`/`.csi` index next to the file while compressing it, *None* to skip indexing.
+        thread_num: The number of threads used to compress BGZF blocks.
+
+    !!! Example
+        ```python
+        import polars_bio as pb
+        lf = pb.read_vcf("/tmp/gnomad.chr21.vcf.bgz", info_fields=["AF"])
+        pb.write_vcf(lf.filter(pl.col("af").list.first() > 0.01), "/tmp/common.vcf.gz", header="/tmp/gnomad.chr21.vcf.bgz")
+        ```
+    """
+    df = df.lazy()
+    schema = df.collect_schema()
+    missing = [c for c in VCF_COLUMNS if c not in schema]
+    if missing:
+        raise ValueError(f"Missing VCF columns: {missing}")
+    if info_fields is None:
+        info_fields = [c for c in schema.names() if c not in VCF_COLUMNS + ["end"]]
+    meta = _vcf_meta_lines(header, info_fields, schema)
+    info_ids = {
+        m.group(1).lower(): m.group(1)
+        for m in (re.match(r"##INFO=<ID=([^,>]+)", line) for line in meta)
+        if m is not None
+    }
+    infos = [_info_expr(c, info_ids.get(c.lower(), c), schema[c]) for c in info_fields]
+    info = (
+        pl.concat_str(infos, separator=";", ignore_nulls=True) if infos else pl.lit("")
+    )
+    fields = [_text_expr(c, schema[c]).fill_null(".") for c in VCF_COLUMNS] + [
+        pl.when(info == "").then(pl.lit(".")).otherwise(info)
+    ]
+    begin = pl.col("start") - 1
+    end = (
+        pl.col("end")
+        if "end" in schema
+        else begin + pl.col("ref").str.len_bytes().fill_null(1)
+    )
+    records = df.select(
+        pl.concat_str(fields, separator="\t").alias("line"),
+        pl.col("chrom").cast(pl.Utf8).alias("contig"),
+        begin.alias("begin"),
+        end.alias("end"),
+    )
+    columns = "\t".join(["#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO"])
+    _write_bgzf(
+        records,
+        path,
+        "".join(f"{m}\n" for m in meta) + columns + "\n",
+        "vcf",
+        index,
+        thread_num,
     )
-    py_from_polars(ctx, name, reader)
+
+
+VCF_COLUMNS = ["chrom", "start", "id", "ref", "alt", "qual", "filter"]
+_VCF_TYPES = {pl.Boolean: "Flag", pl.Utf8: "String"}
+
+
+def _vcf_meta_lines(
+    header: Union[str, list[str], None], info_fields: list[str], schema: pl.Schema
+) -> list[str]:
+    if isinstance(header, list):
+        meta = [h.rstrip("\n") for h in header if h.startswith("##")]
+    elif isinstance(header, str):
+        with gzip.open(header, "rt") if _is_gzip(header) else open(header) as f:
+            meta = [
+                line.rstrip("\n")
+                for line in itertools.takewhile(lambda l: l.startswith("##"), f)
+            ]
+    else:
+        meta = ["##fileformat=VCFv4.3"]
+    declared = {
+        m.group(1).lower()
+        for m in (re.match(r"##INFO=<ID=([^,>]+)", line) for line in meta)
+        if m is not None
+    }
+    # INFO fields missing from the header are declared from their column types
+    for c in info_fields:
+        if c.lower() in declared:
+            continue
+        dtype = schema[c]
+        is_list = isinstance(dtype, pl.List)
+        inner = dtype.inner if is_list else dtype
+        if inner.is_integer():
+            vcf_type = "Integer"
+        elif inner.is_float():
+            vcf_type = "Float"
+        else:
+            vcf_type = _VCF_TYPES.get(inner, "String")
+        number = "0" if vcf_type == "Flag" else "." if is_list else "1"
+        meta.append(
+            f'##INFO=<ID={c},Number={number},Type={vcf_type},Description="{c}">'
+        )
+    return meta
+
+
+def _is_gzip(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def _text_expr(column: str, dtype: pl.DataType) -> pl.Expr:
+    if isinstance(dtype, pl.List):
+        return (
+            pl.col(column)
+            .list.eval(pl.element().cast(pl.Utf8).fill_null("."))
+            .list.join(",")
+        )
+    return pl.col(column).cast(pl.Utf8)
+
+
+def _info_expr(column: str, key: str, dtype: pl.DataType) -> pl.Expr:
+    if dtype == pl.Boolean:
+        # flags are written only when set
+        return pl.when(pl.col(column)).then(pl.lit(key))
+    return pl.lit(f"{key}=") + _text_expr(column, dtype)
+
+
+def _write_bgzf(
+    records: pl.LazyFrame,
+    path: str,
+    header: str,
+    preset: str,
+    index: Union[str, None],
+    thread_num: int,
+    batch_size: int = 65536,
+) -> None:
+    """
+    Stream `line`, `contig`, `begin` and `end` records to the native BGZF writer, which builds the index on the fly.
+    """
+    # the records are streamed through a temporary Parquet file and read back batch by batch
+    with _lazy_parquet_inputs(records, catalog_dir=ctx.catalog_dir) as (records_path,):
+        parquet = pq.ParquetFile(records_path)
+        reader = pa.RecordBatchReader.from_batches(
+            parquet.schema_arrow, parquet.iter_batches(batch_size)
+        )
+        py_write_bgzf(reader, path, header, preset, index, thread_num)
 
 
 def _cleanse_infos(t: Union[list[str], None]) -> Union[list[str], None]:
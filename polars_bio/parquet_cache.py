@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+from typing import Union
+
+from .logging import logger
+
+MANIFEST_FILE = "_polars_bio_manifest.json"
+
+# absolute source path -> directory of its Parquet copy, filled by materialize in this process only,
+# the manifests in the directories are what persists across processes
+_materialized: dict[str, str] = {}
+
+
+def source_stat(path: str) -> dict:
+    """
+    Modification time and size identifying the version of a source file.
+    """
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def read_manifest(out_dir: str) -> Union[dict, None]:
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    # partitions are stored relative to the directory, which may be moved
+    manifest["out_dir"] = os.path.abspath(out_dir)
+    return manifest
+
+
+def write_manifest(out_dir: str, manifest: dict) -> None:
+    # written last, so that an interrupted conversion is never picked up
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w") as f:
+        json.dump({k: v for k, v in manifest.items() if k != "out_dir"}, f, indent=2)
+
+
+def is_fresh(manifest: Union[dict, None], path: str) -> bool:
+    """
+    Check that `manifest` describes a Parquet copy of the current version of `path`.
+    """
+    return (
+        manifest is not None
+        and manifest["source"] == os.path.abspath(path)
+        and os.path.exists(path)
+        and manifest["source_stat"] == source_stat(path)
+    )
+
+
+def register(path: str, out_dir: str) -> None:
+    _materialized[os.path.abspath(path)] = os.path.abspath(out_dir)
+
+
+def lookup(path: str) -> Union[dict, None]:
+    """
+    Return the manifest of the Parquet copy of `path` created with
+    [materialize](api.md#polars_bio.materialize), or *None* if the file was not materialized
+    or has been modified since.
+    """
+    if "://" in path:
+        return None
+    source = os.path.abspath(path)
+    out_dir = _materialized.get(source)
+    if out_dir is None:
+        return None
+    manifest = read_manifest(out_dir)
+    if not is_fresh(manifest, path):
+        logger.info(f"{path} has changed since it was materialized, reading the source")
+        del _materialized[source]
+        return None
+    return manifest
+
+
+def partition_paths(manifest: dict) -> list[str]:
+    return [
+        os.path.join(manifest["out_dir"], p["path"]) for p in manifest["partitions"]
+    ]
+
+
+def table_name(manifest: dict) -> str:
+    digest = hashlib.sha1(manifest["out_dir"].encode()).hexdigest()[:16]
+    return f"materialized_{digest}"
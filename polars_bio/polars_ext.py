@@ -1,10 +1,62 @@
+from pathlib import Path
 from typing import Union
 
 import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 import polars_bio as pb
 from polars_bio.polars_bio import FilterOp
 
+from .constants import (
+    DEFAULT_INTERVAL_COLUMNS,
+    DEFAULT_OUTPUT_BATCH_BYTES,
+    DEFAULT_ROW_GROUP_SIZE,
+)
+from .contigs import contig_enum, natural_contig_order, read_chromsizes
+from .logging import logger
+from .range_op_io import _coalesce_batches
+
+
+def _write_sorted_parquet(ldf: pl.LazyFrame, path: str, cols: list[str]) -> None:
+    """
+    Write a sorted LazyFrame to a Parquet file declaring that it is sorted by `cols`, in a single
+    writer pass. The streaming engine spills the sorted frame to a temporary Arrow IPC file,
+    whose memory-mapped batches are regrouped into row groups of the Parquet writer.
+    """
+    tmp_path = f"{path}.arrow"
+    try:
+        ldf.sink_ipc(tmp_path, compression=None)
+        source = pa.ipc.open_file(pa.memory_map(tmp_path))
+        # the IPC file holds string views, which the Parquet writer does not support
+        batches = (
+            batch
+            for i in range(source.num_record_batches)
+            for batch in pl.from_arrow(source.get_batch(i)).to_arrow().to_batches()
+        )
+        schema = pl.DataFrame(schema=ldf.collect_schema()).to_arrow().schema
+    except pl.exceptions.InvalidOperationError:
+        logger.warning(
+            "The LazyFrame is not supported by the Polars streaming engine, "
+            "it is collected in memory before writing"
+        )
+        table = ldf.collect(streaming=True).to_arrow()
+        schema = table.schema
+        batches = table.to_batches()
+    sorting_columns = pq.SortingColumn.from_ordering(
+        schema, [(c, "ascending") for c in cols], null_placement="at_end"
+    )
+    try:
+        with pq.ParquetWriter(
+            path, schema, compression="zstd", sorting_columns=sorting_columns
+        ) as writer:
+            for table in _coalesce_batches(
+                batches, DEFAULT_ROW_GROUP_SIZE, DEFAULT_OUTPUT_BATCH_BYTES
+            ):
+                writer.write_table(table, row_group_size=DEFAULT_ROW_GROUP_SIZE)
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
 
 @pl.api.register_lazyframe_namespace("pb")
 class PolarsRangesOperations:
@@ -95,15 +147,24 @@ class PolarsRangesOperations:
         )
 
     def sort(
-        self, cols: Union[tuple[str], None] = ["chrom", "start", "end"]
+        self,
+        cols: Union[tuple[str], None] = ["chrom", "start", "end"],
+        natural: bool = False,
+        chromsizes: Union[str, dict[str, int], None] = None,
     ) -> pl.LazyFrame:
         """
         Sort a bedframe.
         !!! note
             Adapted to Polars API from [bioframe.sort_bedframe](https://github.com/open2c/bioframe/blob/2b685eebef393c2c9e6220dcf550b3630d87518e/bioframe/ops.py#L1698)
 
+        Contigs are ordered by their physical codes (i.e. integer sort) if the contig column is an `Enum`
+        (see `contig_dtype` of the range operations), or if `natural` or `chromsizes` are given.
+        Otherwise they are sorted lexicographically. Null values are placed last.
+
         Parameters:
             cols: The names of columns containing the chromosome, start and end of the genomic intervals.
+            natural: If True, sort contigs in karyotypic order (chr1, chr2, ..., chr10, ..., chrX, chrY, chrM).
+            chromsizes: A path to a chromsizes/`.fai` file or a dictionary of contig lengths defining the contig order.
 
 
         !!! Example
@@ -130,7 +191,82 @@ class PolarsRangesOperations:
                 ```
 
         """
-        return self._ldf.sort(by=cols)
+        return self._ldf.sort(
+            by=self._sort_keys(cols, natural, chromsizes), nulls_last=True
+        )
+
+    def sink_sorted_parquet(
+        self,
+        path: str,
+        cols: Union[tuple[str], None] = ["chrom", "start", "end"],
+        natural: bool = False,
+        chromsizes: Union[str, dict[str, int], None] = None,
+        sorting_columns: bool = True,
+    ) -> None:
+        """
+        Sort a bedframe (see [sort](api.md#polars_bio.LazyFrame.sort)) and write it to a Parquet file
+        with the Polars streaming engine, without collecting the frame in memory.
+        For the lexicographic contig order, the `sorting_columns` metadata is written to each row group,
+        so that readers can skip re-sorting the file.
+
+        Parameters:
+            path: The path of the output Parquet file.
+            cols: The names of columns containing the chromosome, start and end of the genomic intervals.
+            natural: If True, sort contigs in karyotypic order.
+            chromsizes: A path to a chromsizes/`.fai` file or a dictionary of contig lengths defining the contig order.
+            sorting_columns: If True, declare the lexicographic sort order in the `sorting_columns` metadata.
+                The sorted frame is then spilled to a temporary Arrow IPC file before the Parquet file is written.
+        """
+        cols = DEFAULT_INTERVAL_COLUMNS if cols is None else cols
+        keys = self._sort_keys(cols, natural, chromsizes)
+        # the streaming engine sorts by columns, so expression keys become temporary columns
+        tmp_keys = {
+            f"__pb_sort_key_{i}": k
+            for i, k in enumerate(keys)
+            if not isinstance(k, str)
+        }
+        by = [
+            k if isinstance(k, str) else f"__pb_sort_key_{i}"
+            for i, k in enumerate(keys)
+        ]
+        ldf = (
+            self._ldf.with_columns(**tmp_keys)
+            .sort(by=by, nulls_last=True)
+            .drop(list(tmp_keys))
+        )
+        if (
+            sorting_columns
+            and not tmp_keys
+            and self._ldf.collect_schema()[cols[0]] == pl.Utf8
+        ):
+            # the Parquet sort order of strings is lexicographic, so only this order can be declared
+            _write_sorted_parquet(ldf, path, cols)
+            return
+        try:
+            ldf.sink_parquet(path)
+        except pl.exceptions.InvalidOperationError:
+            logger.warning(
+                "The LazyFrame is not supported by the Polars streaming engine, "
+                "it is collected in memory before writing"
+            )
+            ldf.collect(streaming=True).write_parquet(path)
+
+    def _sort_keys(
+        self,
+        cols: Union[tuple[str], None],
+        natural: bool,
+        chromsizes: Union[str, dict[str, int], None],
+    ) -> list:
+        cols = DEFAULT_INTERVAL_COLUMNS if cols is None else cols
+        ck = cols[0]
+        if not natural and chromsizes is None:
+            return list(cols)
+        if chromsizes is not None:
+            # sort on the integer codes of the contigs instead of the strings
+            dtype = contig_enum(chromsizes=chromsizes)
+            return [pl.col(ck).cast(pl.Utf8).cast(dtype)] + list(cols[1:])
+        # the order is computed in the query, instead of listing the contigs in a first pass
+        return natural_contig_order(pl.col(ck)) + list(cols[1:])
 
     def expand(
         self,
@@ -138,6 +274,7 @@ class PolarsRangesOperations:
         scale: Union[float, None] = None,
         side: str = "both",
         cols: Union[list[str], None] = ["chrom", "start", "end"],
+        chromsizes: Union[str, dict[str, int], None] = None,
     ) -> pl.LazyFrame:
         """
         Expand each interval by an amount specified with `pad`.
@@ -146,7 +283,8 @@ class PolarsRangesOperations:
 
         Negative values for pad shrink the interval, up to the midpoint.
         Multiplicative rescaling of intervals enabled with scale. Only one of pad
-        or scale can be provided.
+        or scale can be provided. The new coordinates are computed in a single
+        projection, using integer arithmetic for `pad`.
 
         Parameters:
             pad :
@@ -168,60 +306,57 @@ class PolarsRangesOperations:
                 The names of columns containing the chromosome, start and end of the
                 genomic intervals. Default values are 'chrom', 'start', 'end'.
 
+            chromsizes :
+                A path to a chromsizes/`.fai` file or a dictionary of contig lengths. If provided,
+                the expanded intervals are clamped to `[0, length]` of their contig.
+                Contigs missing from `chromsizes` are only clamped at 0.
+
 
         """
         df = self._ldf
         ck, sk, ek = ["chrom", "start", "end"] if cols is None else cols
-        padsk = "pads"
-        midsk = "mids"
+        schema = df.collect_schema()
+        start = pl.col(sk)
+        end = pl.col(ek)
 
         if scale is not None and pad is not None:
             raise ValueError("only one of pad or scale can be supplied")
         elif scale is not None:
             if scale < 0:
                 raise ValueError("multiplicative scale must be >=0")
-            df = df.with_columns(
-                [(0.5 * (scale - 1) * (pl.col(ek) - pl.col(sk))).alias(padsk)]
-            )
+            pads = 0.5 * (scale - 1) * (pl.col(ek) - pl.col(sk))
         elif pad is not None:
             if not isinstance(pad, int):
                 raise ValueError("additive pad must be integer")
-            df = df.with_columns([pl.lit(pad).alias(padsk)])
+            pads = pl.lit(pad)
         else:
             raise ValueError("either pad or scale must be supplied")
         if side == "both" or side == "left":
-            df = df.with_columns([(pl.col(sk) - pl.col(padsk)).alias(sk)])
+            start = start - pads
         if side == "both" or side == "right":
-            df = df.with_columns([(pl.col(ek) + pl.col(padsk)).alias(ek)])
-
-        if pad is not None:
-            if pad < 0:
-                df = df.with_columns(
-                    [(pl.col(sk) + 0.5 * (pl.col(ek) - pl.col(sk))).alias(midsk)]
-                )
-                df = df.with_columns(
-                    [
-                        pl.min_horizontal(pl.col(sk), pl.col(midsk))
-                        .cast(pl.Int64)
-                        .alias(sk),
-                        pl.max_horizontal(pl.col(ek), pl.col(midsk))
-                        .cast(pl.Int64)
-                        .alias(ek),
-                    ]
-                )
+            end = end + pads
+
+        if pad is not None and pad < 0:
+            # midpoints of the original intervals
+            mids = pl.col(sk) + (pl.col(ek) - pl.col(sk)) // 2
+            start = pl.min_horizontal(start, mids)
+            end = pl.max_horizontal(end, mids)
         if scale is not None:
-            df = df.with_columns(
-                [
-                    pl.col(sk).round(0).cast(pl.Int64).alias(sk),
-                    pl.col(ek).round(0).cast(pl.Int64).alias(ek),
-                ]
+            start = start.round(0)
+            end = end.round(0)
+        if chromsizes is not None:
+            if isinstance(chromsizes, str):
+                chromsizes = read_chromsizes(chromsizes)
+            lengths = (
+                pl.col(ck)
+                .cast(pl.Utf8)
+                .replace_strict(chromsizes, default=None, return_dtype=pl.Int64)
             )
-        schema = df.collect_schema().names()
-        if padsk in schema:
-            df = df.drop(padsk)
-        if midsk in schema:
-            df = df.drop(midsk)
-        return df
+            start = pl.max_horizontal(start, pl.lit(0))
+            end = pl.min_horizontal(end, lengths)
+        return df.with_columns(
+            start.cast(schema[sk]).alias(sk), end.cast(schema[ek]).alias(ek)
+        )
 
     def coverage(
         self,
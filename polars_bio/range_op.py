@@ -6,12 +6,18 @@ import polars as pl
 from datafusion import col, literal
 from typing_extensions import TYPE_CHECKING, Union
 
-from polars_bio.polars_bio import ReadOptions
+from polars_bio.polars_bio import ReadOptions, WriteOptions
 
 from .constants import DEFAULT_INTERVAL_COLUMNS
 from .context import ctx
+from .contigs import _apply_contig_dtype, _contig_dtype
 from .interval_op_helpers import convert_result, get_py_ctx, read_df_to_datafusion
-from .range_op_helpers import _validate_overlap_input, range_operation
+from .range_op_helpers import (
+    _validate_overlap_input,
+    range_operation,
+    sink_range_operation,
+)
+from .range_op_io import _lazy_parquet_inputs
 
 __all__ = ["overlap", "nearest", "count_overlaps", "merge"]
 
@@ -22,8 +28,8 @@ from polars_bio.polars_bio import FilterOp, RangeOp, RangeOptions
 
 
 def overlap(
-    df1: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
-    df2: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df1: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df2: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
     how: str = "inner",
     overlap_filter: FilterOp = FilterOp.Strict,
     suffixes: tuple[str, str] = ("_1", "_2"),
@@ -35,14 +41,19 @@ def overlap(
     streaming: bool = False,
     read_options1: Union[ReadOptions, None] = None,
     read_options2: Union[ReadOptions, None] = None,
+    contig_dtype: Union[str, None] = None,
+    chromsizes: Union[str, dict[str, int], None] = None,
+    sink: Union[str, None] = None,
+    write_options: Union[WriteOptions, None] = None,
+    batch_size: Union[int, None] = None,
 ) -> Union[pl.LazyFrame, pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
     """
     Find pairs of overlapping genomic intervals.
     Bioframe inspired API.
 
     Parameters:
-        df1: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV with a header, BED and Parquet are supported.
-        df2: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table. CSV with a header, BED  and Parquet are supported.
+        df1: Can be a path to a file, a list of paths or a local glob pattern (e.g. `calls/*.vcf.gz`) read as a single table with one partition per file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV/TSV (see `CsvReadOptions`), BED and Parquet are supported.
+        df2: Can be a path to a file, a list of paths or a local glob pattern, a polars DataFrame, or a pandas DataFrame or a registered table. CSV/TSV, BED and Parquet are supported.
         how: How to handle the overlaps on the two dataframes. inner: use intersection of the set of intervals from df1 and df2, optional.
         overlap_filter: FilterOp, optional. The type of overlap to consider(Weak or Strict). Strict for **0-based**, Weak for **1-based** coordinate systems.
         cols1: The names of columns containing the chromosome, start and end of the
@@ -56,6 +67,11 @@ def overlap(
         streaming: **EXPERIMENTAL** If True, use Polars [streaming](features.md#streaming) engine.
         read_options1: Additional options for reading the input files.
         read_options2: Additional options for reading the input files.
+        contig_dtype: If "enum", the contig columns of the result are emitted as a Polars `Enum` (an ordered `Categorical` for pandas) in karyotypic order, so that sorting and grouping run on integer codes.
+        chromsizes: A path to a chromsizes/`.fai` file or a dictionary of contig lengths defining the contig order for `contig_dtype`. If not provided, contigs are detected from the input DataFrames, it is required for LazyFrame and file inputs.
+        sink: A path of a Parquet (`.parquet`), BED (`.bed`, `.bed.gz`), TSV or CSV file. If provided, the result is written directly from DataFusion with partitioned parallel writers, skipping the conversion to Polars, and *None* is returned.
+        write_options: Row group size, compression and sort order of the written file (see `WriteOptions`). The sort order is recorded as `sorting_columns` metadata in Parquet files.
+        batch_size: Number of rows of the chunks the `polars.LazyFrame` output is streamed in. The small record batches produced by DataFusion are coalesced up to this size (or 64 MiB). If not provided, the batch size requested by the Polars engine is used, or 65536 rows.
 
     Returns:
         **polars.LazyFrame** or polars.DataFrame or pandas.DataFrame of the overlapping intervals.
@@ -64,6 +80,7 @@ def overlap(
         1. The default output format, i.e.  [LazyFrame](https://docs.pola.rs/api/python/stable/reference/lazyframe/index.html), is recommended for large datasets as it supports output streaming and lazy evaluation.
         This enables efficient processing of large datasets without loading the entire output dataset into memory.
         2. Streaming is only supported for polars.LazyFrame output.
+        3. Small Polars DataFrames (up to ~1M rows in total) are overlapped in-process directly on their Arrow buffers, without registering them as DataFusion tables.
 
     Example:
         ```python
@@ -100,6 +117,7 @@ def overlap(
 
     cols1 = DEFAULT_INTERVAL_COLUMNS if cols1 is None else cols1
     cols2 = DEFAULT_INTERVAL_COLUMNS if cols2 is None else cols2
+    dtype = _contig_dtype([(df1, cols1[0]), (df2, cols2[0])], contig_dtype, chromsizes)
     range_options = RangeOptions(
         range_op=RangeOp.Overlap,
         filter_op=overlap_filter,
@@ -109,14 +127,37 @@ def overlap(
         overlap_alg=algorithm,
         streaming=streaming,
     )
-    return range_operation(
-        df1, df2, range_options, output_type, ctx, read_options1, read_options2
+    if sink is not None:
+        return sink_range_operation(
+            df1,
+            df2,
+            range_options,
+            ctx,
+            sink,
+            write_options,
+            read_options1,
+            read_options2,
+        )
+    result = range_operation(
+        df1,
+        df2,
+        range_options,
+        output_type,
+        ctx,
+        read_options1,
+        read_options2,
+        batch_size,
+    )
+    return _apply_contig_dtype(
+        result,
+        [cols1[0] + suffixes[0], cols2[0] + suffixes[1]],
+        dtype,
     )
 
 
 def nearest(
-    df1: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
-    df2: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df1: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df2: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
     overlap_filter: FilterOp = FilterOp.Strict,
     suffixes: tuple[str, str] = ("_1", "_2"),
     on_cols: Union[list[str], None] = None,
@@ -125,14 +166,19 @@ def nearest(
     output_type: str = "polars.LazyFrame",
     streaming: bool = False,
     read_options: Union[ReadOptions, None] = None,
+    contig_dtype: Union[str, None] = None,
+    chromsizes: Union[str, dict[str, int], None] = None,
+    sink: Union[str, None] = None,
+    write_options: Union[WriteOptions, None] = None,
+    batch_size: Union[int, None] = None,
 ) -> Union[pl.LazyFrame, pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
     """
     Find pairs of closest genomic intervals.
     Bioframe inspired API.
 
     Parameters:
-        df1: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV with a header, BED and Parquet are supported.
-        df2: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table. CSV with a header, BED  and Parquet are supported.
+        df1: Can be a path to a file, a list of paths or a local glob pattern (e.g. `calls/*.vcf.gz`) read as a single table with one partition per file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV/TSV (see `CsvReadOptions`), BED and Parquet are supported.
+        df2: Can be a path to a file, a list of paths or a local glob pattern, a polars DataFrame, or a pandas DataFrame or a registered table. CSV/TSV, BED and Parquet are supported.
         overlap_filter: FilterOp, optional. The type of overlap to consider(Weak or Strict). Strict for **0-based**, Weak for **1-based** coordinate systems.
         cols1: The names of columns containing the chromosome, start and end of the
             genomic intervals, provided separately for each set.
@@ -143,7 +189,11 @@ def nearest(
         output_type: Type of the output. default is "polars.LazyFrame", "polars.DataFrame", or "pandas.DataFrame" or "datafusion.DataFrame" are also supported.
         streaming: **EXPERIMENTAL** If True, use Polars [streaming](features.md#streaming) engine.
         read_options: Additional options for reading the input files.
-
+        contig_dtype: See [overlap](api.md#polars_bio.overlap).
+        chromsizes: See [overlap](api.md#polars_bio.overlap).
+        sink: A path of a Parquet (`.parquet`), BED (`.bed`, `.bed.gz`), TSV or CSV file. If provided, the result is written directly from DataFusion with partitioned parallel writers, skipping the conversion to Polars, and *None* is returned.
+        write_options: Row group size, compression and sort order of the written file (see `WriteOptions`). The sort order is recorded as `sorting_columns` metadata in Parquet files.
+        batch_size: Number of rows of the chunks the `polars.LazyFrame` output is streamed in. The small record batches produced by DataFusion are coalesced up to this size (or 64 MiB). If not provided, the batch size requested by the Polars engine is used, or 65536 rows.
 
     Returns:
         **polars.LazyFrame** or polars.DataFrame or pandas.DataFrame of the overlapping intervals.
@@ -162,6 +212,7 @@ def nearest(
 
     cols1 = DEFAULT_INTERVAL_COLUMNS if cols1 is None else cols1
     cols2 = DEFAULT_INTERVAL_COLUMNS if cols2 is None else cols2
+    dtype = _contig_dtype([(df1, cols1[0]), (df2, cols2[0])], contig_dtype, chromsizes)
     range_options = RangeOptions(
         range_op=RangeOp.Nearest,
         filter_op=overlap_filter,
@@ -170,12 +221,23 @@ def nearest(
         columns_2=cols2,
         streaming=streaming,
     )
-    return range_operation(df1, df2, range_options, output_type, ctx, read_options)
+    if sink is not None:
+        return sink_range_operation(
+            df1, df2, range_options, ctx, sink, write_options, read_options
+        )
+    result = range_operation(
+        df1, df2, range_options, output_type, ctx, read_options, batch_size=batch_size
+    )
+    return _apply_contig_dtype(
+        result,
+        [cols1[0] + suffixes[0], cols2[0] + suffixes[1]],
+        dtype,
+    )
 
 
 def coverage(
-    df1: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
-    df2: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df1: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df2: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
     overlap_filter: FilterOp = FilterOp.Strict,
     suffixes: tuple[str, str] = ("_1", "_2"),
     on_cols: Union[list[str], None] = None,
@@ -184,14 +246,19 @@ def coverage(
     output_type: str = "polars.LazyFrame",
     streaming: bool = False,
     read_options: Union[ReadOptions, None] = None,
+    contig_dtype: Union[str, None] = None,
+    chromsizes: Union[str, dict[str, int], None] = None,
+    sink: Union[str, None] = None,
+    write_options: Union[WriteOptions, None] = None,
+    batch_size: Union[int, None] = None,
 ) -> Union[pl.LazyFrame, pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
     """
     Calculate intervals coverage.
     Bioframe inspired API.
 
     Parameters:
-        df1: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV with a header, BED and Parquet are supported.
-        df2: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table. CSV with a header, BED  and Parquet are supported.
+        df1: Can be a path to a file, a list of paths or a local glob pattern (e.g. `calls/*.vcf.gz`) read as a single table with one partition per file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV/TSV (see `CsvReadOptions`), BED and Parquet are supported.
+        df2: Can be a path to a file, a list of paths or a local glob pattern, a polars DataFrame, or a pandas DataFrame or a registered table. CSV/TSV, BED and Parquet are supported.
         overlap_filter: FilterOp, optional. The type of overlap to consider(Weak or Strict). Strict for **0-based**, Weak for **1-based** coordinate systems.
         cols1: The names of columns containing the chromosome, start and end of the
             genomic intervals, provided separately for each set.
@@ -202,7 +269,11 @@ def coverage(
         output_type: Type of the output. default is "polars.LazyFrame", "polars.DataFrame", or "pandas.DataFrame" or "datafusion.DataFrame" are also supported.
         streaming: **EXPERIMENTAL** If True, use Polars [streaming](features.md#streaming) engine.
         read_options: Additional options for reading the input files.
-
+        contig_dtype: See [overlap](api.md#polars_bio.overlap).
+        chromsizes: See [overlap](api.md#polars_bio.overlap).
+        sink: A path of a Parquet (`.parquet`), BED (`.bed`, `.bed.gz`), TSV or CSV file. If provided, the result is written directly from DataFusion with partitioned parallel writers, skipping the conversion to Polars, and *None* is returned.
+        write_options: Row group size, compression and sort order of the written file (see `WriteOptions`). The sort order is recorded as `sorting_columns` metadata in Parquet files.
+        batch_size: Number of rows of the chunks the `polars.LazyFrame` output is streamed in. The small record batches produced by DataFusion are coalesced up to this size (or 64 MiB). If not provided, the batch size requested by the Polars engine is used, or 65536 rows.
 
     Returns:
         **polars.LazyFrame** or polars.DataFrame or pandas.DataFrame of the overlapping intervals.
@@ -221,6 +292,7 @@ def coverage(
 
     cols1 = DEFAULT_INTERVAL_COLUMNS if cols1 is None else cols1
     cols2 = DEFAULT_INTERVAL_COLUMNS if cols2 is None else cols2
+    dtype = _contig_dtype([(df1, cols1[0]), (df2, cols2[0])], contig_dtype, chromsizes)
     range_options = RangeOptions(
         range_op=RangeOp.Coverage,
         filter_op=overlap_filter,
@@ -229,7 +301,18 @@ def coverage(
         columns_2=cols2,
         streaming=streaming,
     )
-    return range_operation(df2, df1, range_options, output_type, ctx, read_options)
+    if sink is not None:
+        return sink_range_operation(
+            df2, df1, range_options, ctx, sink, write_options, read_options
+        )
+    result = range_operation(
+        df2, df1, range_options, output_type, ctx, read_options, batch_size=batch_size
+    )
+    return _apply_contig_dtype(
+        result,
+        [cols1[0], cols2[0], cols1[0] + suffixes[0]],
+        dtype,
+    )
 
 
 def count_overlaps(
@@ -243,14 +326,17 @@ def count_overlaps(
     output_type: str = "polars.LazyFrame",
     streaming: bool = False,
     naive_query: bool = True,
+    contig_dtype: Union[str, None] = None,
+    chromsizes: Union[str, dict[str, int], None] = None,
+    batch_size: Union[int, None] = None,
 ) -> Union[pl.LazyFrame, pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
     """
     Count pairs of overlapping genomic intervals.
     Bioframe inspired API.
 
     Parameters:
-        df1: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV with a header, BED and Parquet are supported.
-        df2: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table. CSV with a header, BED  and Parquet are supported.
+        df1: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table (see [register_vcf](api.md#polars_bio.register_vcf)). CSV/TSV (see `CsvReadOptions`), BED and Parquet are supported.
+        df2: Can be a path to a file, a polars DataFrame, or a pandas DataFrame or a registered table. CSV/TSV, BED and Parquet are supported.
         overlap_filter: FilterOp, optional. The type of overlap to consider(Weak or Strict). Strict for **0-based**, Weak for **1-based** coordinate systems.
         suffixes: Suffixes for the columns of the two overlapped sets.
         cols1: The names of columns containing the chromosome, start and end of the
@@ -261,6 +347,10 @@ def count_overlaps(
         output_type: Type of the output. default is "polars.LazyFrame", "polars.DataFrame", or "pandas.DataFrame" or "datafusion.DataFrame" are also supported.
         naive_query: If True, use naive query for counting overlaps based on overlaps.
         streaming: **EXPERIMENTAL** If True, use Polars [streaming](features.md#streaming) engine.
+        contig_dtype: See [overlap](api.md#polars_bio.overlap).
+        chromsizes: See [overlap](api.md#polars_bio.overlap).
+        batch_size: Number of rows of the chunks the `polars.LazyFrame` output of the naive query is streamed in. The small record batches produced by DataFusion are coalesced up to this size (or 64 MiB). If not provided, the batch size requested by the Polars engine is used, or 65536 rows.
+
     Returns:
         **polars.LazyFrame** or polars.DataFrame or pandas.DataFrame of the overlapping intervals.
 
@@ -301,6 +391,7 @@ def count_overlaps(
     on_cols = [] if on_cols is None else on_cols
     cols1 = DEFAULT_INTERVAL_COLUMNS if cols1 is None else cols1
     cols2 = DEFAULT_INTERVAL_COLUMNS if cols2 is None else cols2
+    dtype = _contig_dtype([(df1, cols1[0]), (df2, cols2[0])], contig_dtype, chromsizes)
     if naive_query:
         range_options = RangeOptions(
             range_op=RangeOp.CountOverlapsNaive,
@@ -310,97 +401,112 @@ def count_overlaps(
             columns_2=cols2,
             streaming=streaming,
         )
-        return range_operation(df2, df1, range_options, output_type, ctx)
-    df1 = read_df_to_datafusion(my_ctx, df1)
-    df2 = read_df_to_datafusion(my_ctx, df2)
-
-    # TODO: guarantee no collisions
-    s1start_s2end = "s1starts2end"
-    s1end_s2start = "s1ends2start"
-    contig = "contig"
-    count = "count"
-    starts = "starts"
-    ends = "ends"
-    is_s1 = "is_s1"
-    suff, _ = suffixes
-    df1, df2 = df2, df1
-    df1 = df1.select(
-        *(
-            [
-                literal(1).alias(is_s1),
-                col(cols1[1]).alias(s1start_s2end),
-                col(cols1[2]).alias(s1end_s2start),
-                col(cols1[0]).alias(contig),
-            ]
-            + on_cols
+        result = range_operation(
+            df2, df1, range_options, output_type, ctx, batch_size=batch_size
         )
-    )
-    df2 = df2.select(
-        *(
-            [
-                literal(0).alias(is_s1),
-                col(cols2[2]).alias(s1end_s2start),
-                col(cols2[1]).alias(s1start_s2end),
-                col(cols2[0]).alias(contig),
-            ]
-            + on_cols
+        return _apply_contig_dtype(
+            result,
+            [cols1[0], cols2[0]],
+            dtype,
+        )
+    with _lazy_parquet_inputs(df1, df2, catalog_dir=ctx.catalog_dir) as (
+        df1,
+        df2,
+    ):
+        df1 = read_df_to_datafusion(my_ctx, df1)
+        df2 = read_df_to_datafusion(my_ctx, df2)
+
+        # TODO: guarantee no collisions
+        s1start_s2end = "s1starts2end"
+        s1end_s2start = "s1ends2start"
+        contig = "contig"
+        count = "count"
+        starts = "starts"
+        ends = "ends"
+        is_s1 = "is_s1"
+        suff, _ = suffixes
+        df1, df2 = df2, df1
+        df1 = df1.select(
+            *(
+                [
+                    literal(1).alias(is_s1),
+                    col(cols1[1]).alias(s1start_s2end),
+                    col(cols1[2]).alias(s1end_s2start),
+                    col(cols1[0]).alias(contig),
+                ]
+                + on_cols
+            )
+        )
+        df2 = df2.select(
+            *(
+                [
+                    literal(0).alias(is_s1),
+                    col(cols2[2]).alias(s1end_s2start),
+                    col(cols2[1]).alias(s1start_s2end),
+                    col(cols2[0]).alias(contig),
+                ]
+                + on_cols
+            )
         )
-    )
 
-    df = df1.union(df2)
-
-    partitioning = [col(contig)] + [col(c) for c in on_cols]
-    df = df.select(
-        *(
-            [
-                s1start_s2end,
-                s1end_s2start,
-                contig,
-                is_s1,
-                datafusion.functions.sum(col(is_s1))
-                .over(
-                    datafusion.expr.Window(
-                        partition_by=partitioning,
-                        order_by=[
-                            col(s1start_s2end).sort(),
-                            col(is_s1).sort(
-                                ascending=(overlap_filter == FilterOp.Strict)
-                            ),
-                        ],
+        df = df1.union(df2)
+
+        partitioning = [col(contig)] + [col(c) for c in on_cols]
+        df = df.select(
+            *(
+                [
+                    s1start_s2end,
+                    s1end_s2start,
+                    contig,
+                    is_s1,
+                    datafusion.functions.sum(col(is_s1))
+                    .over(
+                        datafusion.expr.Window(
+                            partition_by=partitioning,
+                            order_by=[
+                                col(s1start_s2end).sort(),
+                                col(is_s1).sort(
+                                    ascending=(overlap_filter == FilterOp.Strict)
+                                ),
+                            ],
+                        )
                     )
-                )
-                .alias(starts),
-                datafusion.functions.sum(col(is_s1))
-                .over(
-                    datafusion.expr.Window(
-                        partition_by=partitioning,
-                        order_by=[
-                            col(s1end_s2start).sort(),
-                            col(is_s1).sort(
-                                ascending=(overlap_filter == FilterOp.Weak)
-                            ),
-                        ],
+                    .alias(starts),
+                    datafusion.functions.sum(col(is_s1))
+                    .over(
+                        datafusion.expr.Window(
+                            partition_by=partitioning,
+                            order_by=[
+                                col(s1end_s2start).sort(),
+                                col(is_s1).sort(
+                                    ascending=(overlap_filter == FilterOp.Weak)
+                                ),
+                            ],
+                        )
                     )
-                )
-                .alias(ends),
-            ]
-            + on_cols
+                    .alias(ends),
+                ]
+                + on_cols
+            )
         )
-    )
-    df = df.filter(col(is_s1) == 0)
-    df = df.select(
-        *(
-            [
-                col(contig).alias(cols1[0] + suff),
-                col(s1end_s2start).alias(cols1[1] + suff),
-                col(s1start_s2end).alias(cols1[2] + suff),
-            ]
-            + on_cols
-            + [(col(starts) - col(ends)).alias(count)]
+        df = df.filter(col(is_s1) == 0)
+        df = df.select(
+            *(
+                [
+                    col(contig).alias(cols1[0] + suff),
+                    col(s1end_s2start).alias(cols1[1] + suff),
+                    col(s1start_s2end).alias(cols1[2] + suff),
+                ]
+                + on_cols
+                + [(col(starts) - col(ends)).alias(count)]
+            )
         )
-    )
 
-    return convert_result(df, output_type, streaming)
+        return _apply_contig_dtype(
+            convert_result(df, output_type, streaming),
+            [cols1[0] + suff],
+            dtype,
+        )
 
 
 def merge(
@@ -411,19 +517,23 @@ def merge(
     on_cols: Union[list[str], None] = None,
     output_type: str = "polars.LazyFrame",
     streaming: bool = False,
+    contig_dtype: Union[str, None] = None,
+    chromsizes: Union[str, dict[str, int], None] = None,
 ) -> Union[pl.LazyFrame, pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
     """
     Merge overlapping intervals. It is assumed that start < end.
 
 
     Parameters:
-        df: Can be a path to a file, a polars DataFrame, or a pandas DataFrame. CSV with a header, BED  and Parquet are supported.
+        df: Can be a path to a file, a polars DataFrame, or a pandas DataFrame. CSV/TSV, BED and Parquet are supported.
         overlap_filter: FilterOp, optional. The type of overlap to consider(Weak or Strict). Strict for **0-based**, Weak for **1-based** coordinate systems.
         cols: The names of columns containing the chromosome, start and end of the
             genomic intervals, provided separately for each set.
         on_cols: List of additional column names for clustering. default is None.
         output_type: Type of the output. default is "polars.LazyFrame", "polars.DataFrame", or "pandas.DataFrame" or "datafusion.DataFrame" are also supported.
         streaming: **EXPERIMENTAL** If True, use Polars [streaming](features.md#streaming) engine.
+        contig_dtype: See [overlap](api.md#polars_bio.overlap).
+        chromsizes: See [overlap](api.md#polars_bio.overlap).
 
     Returns:
         **polars.LazyFrame** or polars.DataFrame or pandas.DataFrame of the overlapping intervals.
@@ -438,6 +548,7 @@ def merge(
 
     my_ctx = get_py_ctx()
     cols = DEFAULT_INTERVAL_COLUMNS if cols is None else cols
+    dtype = _contig_dtype([(df, cols[0])], contig_dtype, chromsizes)
     contig = cols[0]
     start = cols[1]
     end = cols[2]
@@ -445,102 +556,110 @@ def merge(
     on_cols = [] if on_cols is None else on_cols
     on_cols = [contig] + on_cols
 
-    df = read_df_to_datafusion(my_ctx, df)
-    df_schema = df.schema()
-    start_type = df_schema.field(start).type
-    end_type = df_schema.field(end).type
-    # TODO: make sure to avoid conflicting column names
-    start_end = "start_end"
-    is_start_end = "is_start_or_end"
-    current_intervals = "current_intervals"
-    n_intervals = "n_intervals"
-
-    end_positions = df.select(
-        *(
-            [(col(end) + min_dist).alias(start_end), literal(-1).alias(is_start_end)]
-            + on_cols
+    with _lazy_parquet_inputs(df, catalog_dir=ctx.catalog_dir) as (df,):
+        df = read_df_to_datafusion(my_ctx, df)
+        df_schema = df.schema()
+        start_type = df_schema.field(start).type
+        end_type = df_schema.field(end).type
+        # TODO: make sure to avoid conflicting column names
+        start_end = "start_end"
+        is_start_end = "is_start_or_end"
+        current_intervals = "current_intervals"
+        n_intervals = "n_intervals"
+
+        end_positions = df.select(
+            *(
+                [
+                    (col(end) + min_dist).alias(start_end),
+                    literal(-1).alias(is_start_end),
+                ]
+                + on_cols
+            )
+        )
+        start_positions = df.select(
+            *([col(start).alias(start_end), literal(1).alias(is_start_end)] + on_cols)
+        )
+        all_positions = start_positions.union(end_positions)
+        start_end_type = all_positions.schema().field(start_end).type
+        all_positions = all_positions.select(
+            *([col(start_end).cast(start_end_type), col(is_start_end)] + on_cols)
         )
-    )
-    start_positions = df.select(
-        *([col(start).alias(start_end), literal(1).alias(is_start_end)] + on_cols)
-    )
-    all_positions = start_positions.union(end_positions)
-    start_end_type = all_positions.schema().field(start_end).type
-    all_positions = all_positions.select(
-        *([col(start_end).cast(start_end_type), col(is_start_end)] + on_cols)
-    )
 
-    sorting = [
-        col(start_end).sort(),
-        col(is_start_end).sort(ascending=(overlap_filter == FilterOp.Strict)),
-    ]
-    all_positions = all_positions.sort(*sorting)
+        sorting = [
+            col(start_end).sort(),
+            col(is_start_end).sort(ascending=(overlap_filter == FilterOp.Strict)),
+        ]
+        all_positions = all_positions.sort(*sorting)
 
-    on_cols_expr = [col(c) for c in on_cols]
+        on_cols_expr = [col(c) for c in on_cols]
 
-    win = datafusion.expr.Window(
-        partition_by=on_cols_expr,
-        order_by=sorting,
-    )
-    all_positions = all_positions.select(
-        *(
-            [
-                start_end,
-                is_start_end,
-                datafusion.functions.sum(col(is_start_end))
-                .over(win)
-                .alias(current_intervals),
-            ]
-            + on_cols
-            + [
-                datafusion.functions.row_number(
-                    partition_by=on_cols_expr, order_by=sorting
-                ).alias(n_intervals)
-            ]
+        win = datafusion.expr.Window(
+            partition_by=on_cols_expr,
+            order_by=sorting,
         )
-    )
-    all_positions = all_positions.filter(
-        ((col(current_intervals) == 0) & (col(is_start_end) == -1))
-        | ((col(current_intervals) == 1) & (col(is_start_end) == 1))
-    )
-    all_positions = all_positions.select(
-        *(
-            [start_end, is_start_end]
-            + on_cols
-            + [
-                (
+        all_positions = all_positions.select(
+            *(
+                [
+                    start_end,
+                    is_start_end,
+                    datafusion.functions.sum(col(is_start_end))
+                    .over(win)
+                    .alias(current_intervals),
+                ]
+                + on_cols
+                + [
+                    datafusion.functions.row_number(
+                        partition_by=on_cols_expr, order_by=sorting
+                    ).alias(n_intervals)
+                ]
+            )
+        )
+        all_positions = all_positions.filter(
+            ((col(current_intervals) == 0) & (col(is_start_end) == -1))
+            | ((col(current_intervals) == 1) & (col(is_start_end) == 1))
+        )
+        all_positions = all_positions.select(
+            *(
+                [start_end, is_start_end]
+                + on_cols
+                + [
                     (
-                        col(n_intervals)
-                        - datafusion.functions.lag(
-                            col(n_intervals), partition_by=on_cols_expr
+                        (
+                            col(n_intervals)
+                            - datafusion.functions.lag(
+                                col(n_intervals), partition_by=on_cols_expr
+                            )
+                            + 1
                         )
-                        + 1
-                    )
-                    / 2
-                ).alias(n_intervals)
-            ]
+                        / 2
+                    ).alias(n_intervals)
+                ]
+            )
         )
-    )
-    result = all_positions.select(
-        *(
-            [
-                (col(start_end) - min_dist).alias(end),
-                is_start_end,
-                datafusion.functions.lag(
-                    col(start_end), partition_by=on_cols_expr
-                ).alias(start),
-            ]
-            + on_cols
-            + [n_intervals]
+        result = all_positions.select(
+            *(
+                [
+                    (col(start_end) - min_dist).alias(end),
+                    is_start_end,
+                    datafusion.functions.lag(
+                        col(start_end), partition_by=on_cols_expr
+                    ).alias(start),
+                ]
+                + on_cols
+                + [n_intervals]
+            )
         )
-    )
-    result = result.filter(col(is_start_end) == -1)
-    result = result.select(
-        *(
-            [contig, col(start).cast(start_type), col(end).cast(end_type)]
-            + on_cols[1:]
-            + [n_intervals]
+        result = result.filter(col(is_start_end) == -1)
+        result = result.select(
+            *(
+                [contig, col(start).cast(start_type), col(end).cast(end_type)]
+                + on_cols[1:]
+                + [n_intervals]
+            )
         )
-    )
 
-    return convert_result(result, output_type, streaming)
+        return _apply_contig_dtype(
+            convert_result(result, output_type, streaming),
+            [contig],
+            dtype,
+        )
@@ -0,0 +1,154 @@
+import asyncio
+import functools
+from typing import AsyncIterator, Callable
+
+import datafusion
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+from typing_extensions import Union
+
+from polars_bio.polars_bio import py_read_sql
+
+from .context import ctx
+from .range_op import count_overlaps, coverage, merge, nearest, overlap
+
+__all__ = [
+    "overlap_async",
+    "nearest_async",
+    "count_overlaps_async",
+    "coverage_async",
+    "merge_async",
+    "sql_async",
+    "iter_batches_async",
+]
+
+
+async def _run(func: Callable, *args, **kwargs):
+    # the range operations prepare their inputs in Python (conversions, table registration)
+    # before executing natively, so they run in the default executor of the loop rather than
+    # as Tokio futures; the native calls release the GIL, so concurrent awaits run in parallel
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def _eager(kwargs: dict) -> dict:
+    output_type = kwargs.setdefault("output_type", "polars.DataFrame")
+    if output_type == "polars.LazyFrame":
+        raise ValueError(
+            "polars.LazyFrame is not supported by the asynchronous API, use polars.DataFrame instead"
+        )
+    return kwargs
+
+
+async def overlap_async(
+    df1, df2, **kwargs
+) -> Union[pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
+    """
+    Asynchronous version of [overlap](api.md#polars_bio.overlap), which does not block the event loop.
+    Takes the same parameters, `output_type` defaults to `polars.DataFrame`.
+
+    !!! Example
+        ```python
+        import asyncio
+        import polars_bio as pb
+
+        async def main():
+            return await asyncio.gather(
+                pb.overlap_async("/tmp/reads.parquet", "/tmp/targets.parquet"),
+                pb.overlap_async("/tmp/reads.parquet", "/tmp/exons.parquet"),
+            )
+
+        asyncio.run(main())
+        ```
+    """
+    return await _run(overlap, df1, df2, **_eager(kwargs))
+
+
+async def nearest_async(
+    df1, df2, **kwargs
+) -> Union[pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
+    """
+    Asynchronous version of [nearest](api.md#polars_bio.nearest).
+    Takes the same parameters, `output_type` defaults to `polars.DataFrame`.
+    """
+    return await _run(nearest, df1, df2, **_eager(kwargs))
+
+
+async def count_overlaps_async(
+    df1, df2, **kwargs
+) -> Union[pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
+    """
+    Asynchronous version of [count_overlaps](api.md#polars_bio.count_overlaps).
+    Takes the same parameters, `output_type` defaults to `polars.DataFrame`.
+    """
+    return await _run(count_overlaps, df1, df2, **_eager(kwargs))
+
+
+async def coverage_async(
+    df1, df2, **kwargs
+) -> Union[pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
+    """
+    Asynchronous version of [coverage](api.md#polars_bio.coverage).
+    Takes the same parameters, `output_type` defaults to `polars.DataFrame`.
+    """
+    return await _run(coverage, df1, df2, **_eager(kwargs))
+
+
+async def merge_async(
+    df, **kwargs
+) -> Union[pl.DataFrame, pd.DataFrame, datafusion.DataFrame]:
+    """
+    Asynchronous version of [merge](api.md#polars_bio.merge).
+    Takes the same parameters, `output_type` defaults to `polars.DataFrame`.
+    """
+    return await _run(merge, df, **_eager(kwargs))
+
+
+async def sql_async(query: str) -> pl.DataFrame:
+    """
+    Execute a SQL query on the registered tables (see [sql](api.md#polars_bio.sql)) without blocking the event loop.
+
+    Parameters:
+        query: The SQL query.
+    """
+    df = py_read_sql(ctx, query)
+    batches = [batch async for batch in _arrow_batches(df)]
+    return pl.from_arrow(pa.Table.from_batches(batches, df.schema()))
+
+
+async def iter_batches_async(df: datafusion.DataFrame) -> AsyncIterator[pl.DataFrame]:
+    """
+    Iterate asynchronously over the record batches of a DataFusion DataFrame, e.g. the result of a range operation
+    with `output_type="datafusion.DataFrame"`. Batches are computed one at a time, while awaiting the next one.
+
+    Parameters:
+        df: The DataFusion DataFrame to execute.
+
+    !!! Example
+        ```python
+        import polars_bio as pb
+
+        async def count_rows():
+            df = await pb.overlap_async("/tmp/reads.parquet", "/tmp/targets.parquet", output_type="datafusion.DataFrame")
+            return sum([len(batch) async for batch in pb.iter_batches_async(df)])
+        ```
+    """
+    async for batch in _arrow_batches(df):
+        yield pl.DataFrame(batch)
+
+
+async def _arrow_batches(df: datafusion.DataFrame) -> AsyncIterator[pa.RecordBatch]:
+    stream = await _run(df.execute_stream)
+    if not hasattr(stream, "__anext__"):
+        # streams without native awaiting are advanced in the executor
+        while (batch := await _run(next, stream, None)) is not None:
+            yield batch.to_pyarrow()
+        return
+    # the next batch is awaited on the Tokio runtime of DataFusion, without a thread per batch
+    while True:
+        try:
+            batch = await stream.__anext__()
+        except StopAsyncIteration:
+            return
+        yield batch.to_pyarrow()
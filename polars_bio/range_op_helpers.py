@@ -1,3 +1,4 @@
+import glob
 from pathlib import Path
 from typing import Union
 
@@ -6,38 +7,56 @@ import polars as pl
 
 from polars_bio.polars_bio import (
     BioSessionContext,
+    InputFormat,
     RangeOp,
     RangeOptions,
     ReadOptions,
+    WriteOptions,
+    py_register_table,
+    py_register_view,
+    range_operation_sink,
     stream_range_operation_scan,
 )
 
+from . import parquet_cache
 from .constants import TMP_CATALOG_DIR
 from .logging import logger
-from .range_op_io import _df_to_arrow, _get_schema, _rename_columns, range_lazy_scan
+from .range_op_io import (
+    _df_to_arrow,
+    _get_schema,
+    _lazy_parquet_inputs,
+    _native_overlap,
+    _native_overlap_supported,
+    _overlap_schema,
+    _rename_columns,
+    range_lazy_scan,
+)
 from .range_wrappers import range_operation_frame_wrapper, range_operation_scan_wrapper
 
 
 def range_operation(
-    df1: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
-    df2: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df1: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df2: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
     range_options: RangeOptions,
     output_type: str,
     ctx: BioSessionContext,
     read_options1: Union[ReadOptions, None] = None,
     read_options2: Union[ReadOptions, None] = None,
+    batch_size: Union[int, None] = None,
 ) -> Union[pl.LazyFrame, pl.DataFrame, pd.DataFrame]:
     ctx.sync_options()
+    df1 = _materialized_table(_files_view(df1, ctx, read_options1), ctx, read_options1)
+    df2 = _materialized_table(_files_view(df2, ctx, read_options2), ctx, read_options2)
     if isinstance(df1, str) and isinstance(df2, str):
-        supported_exts = set([".parquet", ".csv", ".bed", ".vcf"])
+        supported_exts = set([".parquet", ".csv", ".tsv", ".bed", ".vcf"])
         ext1 = set(Path(df1).suffixes)
         assert (
             len(supported_exts.intersection(ext1)) > 0 or len(ext1) == 0
-        ), "Dataframe1 must be a Parquet, a BED or CSV or VCF file"
+        ), "Dataframe1 must be a Parquet, a BED or CSV/TSV or VCF file"
         ext2 = set(Path(df2).suffixes)
         assert (
             len(supported_exts.intersection(ext2)) > 0 or len(ext2) == 0
-        ), "Dataframe2 must be a Parquet, a BED or CSV or VCF file"
+        ), "Dataframe2 must be a Parquet, a BED or CSV/TSV or VCF file"
         # use suffixes to avoid column name conflicts
         if range_options.streaming:
             # FIXME: Parallelism is not supported
@@ -66,6 +85,8 @@ def range_operation(
             df_schema1 = _get_schema(df1, ctx, range_options.suffixes[0], read_options1)
             df_schema2 = _get_schema(df2, ctx, range_options.suffixes[1], read_options2)
             merged_schema = pl.Schema({**df_schema1, **df_schema2})
+            if range_options.range_op == RangeOp.Overlap:
+                merged_schema = _overlap_schema(merged_schema, range_options)
         if output_type == "polars.LazyFrame":
             return range_lazy_scan(
                 df1,
@@ -75,6 +96,7 @@ def range_operation(
                 ctx=ctx,
                 read_options1=read_options1,
                 read_options2=read_options2,
+                batch_size=batch_size,
             )
         elif output_type == "polars.DataFrame":
             return range_operation_scan_wrapper(
@@ -111,11 +133,25 @@ def range_operation(
                     **_rename_columns(df2, range_options.suffixes[1]).schema,
                 }
             )
-            return range_lazy_scan(df1, df2, merged_schema, range_options, ctx)
+            if range_options.range_op == RangeOp.Overlap:
+                merged_schema = _overlap_schema(merged_schema, range_options)
+            return range_lazy_scan(
+                df1, df2, merged_schema, range_options, ctx, batch_size=batch_size
+            )
         elif output_type == "polars.DataFrame":
+            if _native_overlap_supported(df1, df2, range_options):
+                return _native_overlap(df1, df2, range_options)
             if isinstance(df1, pl.DataFrame) and isinstance(df2, pl.DataFrame):
                 df1 = df1.to_arrow().to_reader()
                 df2 = df2.to_arrow().to_reader()
+            elif isinstance(df1, pl.LazyFrame) and isinstance(df2, pl.LazyFrame):
+                with _lazy_parquet_inputs(df1, df2, catalog_dir=ctx.catalog_dir) as (
+                    path1,
+                    path2,
+                ):
+                    return range_operation_scan_wrapper(
+                        ctx, path1, path2, range_options
+                    ).to_polars()
             else:
                 raise ValueError(
                     "Input and output dataframes must be of the same type: either polars or pandas"
@@ -141,6 +177,101 @@ def range_operation(
         )
 
 
+def sink_range_operation(
+    df1: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df2: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    range_options: RangeOptions,
+    ctx: BioSessionContext,
+    sink: str,
+    write_options: Union[WriteOptions, None] = None,
+    read_options1: Union[ReadOptions, None] = None,
+    read_options2: Union[ReadOptions, None] = None,
+) -> None:
+    """
+    Execute a range operation and write its result from DataFusion directly to `sink`,
+    without converting the output batches to Polars. DataFrame inputs are written to
+    temporary Parquet files in the session catalog directory first.
+    """
+    ctx.sync_options()
+
+    def _to_input(
+        df: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+        read_options: Union[ReadOptions, None],
+    ) -> Union[str, pl.LazyFrame]:
+        if isinstance(df, (str, list)):
+            df = _files_view(df, ctx, read_options)
+            return _materialized_table(df, ctx, read_options)
+        if isinstance(df, pd.DataFrame):
+            df = pl.from_pandas(df)
+        return df.lazy()
+
+    with _lazy_parquet_inputs(
+        _to_input(df1, read_options1),
+        _to_input(df2, read_options2),
+        catalog_dir=ctx.catalog_dir,
+    ) as (path1, path2):
+        range_operation_sink(
+            ctx,
+            path1,
+            path2,
+            range_options,
+            sink,
+            write_options,
+            read_options1,
+            read_options2,
+        )
+
+
+def _materialized_table(
+    df: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    ctx: BioSessionContext,
+    read_options: Union[ReadOptions, None] = None,
+) -> Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame]:
+    """
+    Replace the path of a [materialized](api.md#polars_bio.materialize) file with a table
+    registered on its Parquet copy, if the file has not changed since. Paths read with
+    explicit read options (e.g. VCF INFO fields) are kept, as they may change the schema.
+    """
+    if not isinstance(df, str) or read_options is not None:
+        return df
+    manifest = parquet_cache.lookup(df)
+    if manifest is None:
+        return df
+    table = parquet_cache.table_name(manifest)
+    py_register_table(ctx, manifest["out_dir"], table, InputFormat.Parquet, None)
+    return table
+
+
+def _files_view(
+    df: Union[str, list[str], pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    ctx: BioSessionContext,
+    read_options: Union[ReadOptions, None] = None,
+) -> Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame]:
+    """
+    Register a list of paths or a local glob pattern (e.g. per-chromosome VCF shards) as a view
+    of the UNION ALL of its files, each scanned as a separate, concurrently executed partition,
+    and return the name of the view. Other inputs are returned unchanged.
+    """
+    if isinstance(df, str) and ("://" in df or not glob.has_magic(df)):
+        return df
+    if not isinstance(df, (str, list)):
+        return df
+    # imported here, as io imports this module
+    from .io import (
+        _expand_paths,
+        _file_tables,
+        _input_format,
+        _table_digest,
+        _union_query,
+    )
+
+    paths = _expand_paths(df)
+    tables = _file_tables(paths, _input_format(paths[0]), read_options)
+    name = f"files_{_table_digest(paths[0], tuple(paths))}"
+    py_register_view(ctx, name, _union_query(tables))
+    return name
+
+
 def _validate_overlap_input(col1, col2, on_cols, suffixes, output_type, how):
     # TODO: Add support for on_cols ()
     assert on_cols is None, "on_cols is not supported yet"
@@ -159,9 +290,10 @@ def stream_wrapper(pyldf):
 
 
 def tmp_cleanup(session_catalog_path: str):
-    # remove temp parquet files
+    # remove temp parquet files and decompressed inputs
     logger.info(f"Cleaning up temp files for catalog path: '{session_catalog_path}'")
     path = Path(session_catalog_path)
-    for path in path.glob("*.parquet"):
-        path.unlink(missing_ok=True)
+    for file in path.glob("*"):
+        if file.is_file():
+            file.unlink(missing_ok=True)
     path.rmdir()
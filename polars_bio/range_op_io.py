@@ -1,3 +1,5 @@
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterator, Union
 
@@ -13,12 +15,20 @@ from tqdm.auto import tqdm
 from polars_bio.polars_bio import (
     BioSessionContext,
     InputFormat,
+    RangeOp,
     RangeOptions,
     ReadOptions,
     py_read_table,
     py_register_table,
+    range_operation_frame_native,
 )
 
+from .constants import (
+    DEFAULT_OUTPUT_BATCH_BYTES,
+    DEFAULT_OUTPUT_BATCH_SIZE,
+    NATIVE_OVERLAP_MAX_ROWS,
+)
+from .logging import logger
 from .range_wrappers import range_operation_frame_wrapper, range_operation_scan_wrapper
 
 
@@ -30,7 +40,21 @@ def range_lazy_scan(
     ctx: BioSessionContext,
     read_options1: Union[ReadOptions, None] = None,
     read_options2: Union[ReadOptions, None] = None,
+    batch_size: Union[int, None] = None,
 ) -> pl.LazyFrame:
+    if _native_overlap_supported(df_1, df_2, range_options):
+
+        def _native_source(
+            with_columns: Union[pl.Expr, None],
+            predicate: Union[pl.Expr, None],
+            _n_rows: Union[int, None],
+            _batch_size: Union[int, None],
+        ) -> Iterator[pl.DataFrame]:
+            df = _native_overlap(df_1, df_2, range_options)
+            yield df if _n_rows is None else df.head(_n_rows)
+
+        return register_io_source(_native_source, schema=schema)
+
     range_function = None
     if isinstance(df_1, str) and isinstance(df_2, str):
         range_function = range_operation_scan_wrapper
@@ -43,9 +67,8 @@ def range_lazy_scan(
         df_1 = _df_to_arrow(df_1, range_options.columns_1[0]).to_reader()
         df_2 = _df_to_arrow(df_2, range_options.columns_2[0]).to_reader()
     elif isinstance(df_1, pl.LazyFrame) and isinstance(df_2, pl.LazyFrame):
-        range_function = range_operation_frame_wrapper
-        df_1 = df_1.collect().to_arrow().to_reader()
-        df_2 = df_2.collect().to_arrow().to_reader()
+        # LazyFrames are streamed to Parquet when the query runs, see _lazy_to_parquet
+        range_function = range_operation_scan_wrapper
     else:
         raise ValueError("Only polars and pandas dataframes are supported")
 
@@ -55,33 +78,155 @@ def range_lazy_scan(
         _n_rows: Union[int, None],
         _batch_size: Union[int, None],
     ) -> Iterator[pl.DataFrame]:
-        df_lazy: datafusion.DataFrame = (
-            range_function(
-                ctx, df_1, df_2, range_options, read_options1, read_options2, _n_rows
-            )
-            if isinstance(df_1, str) and isinstance(df_2, str)
-            else range_function(ctx, df_1, df_2, range_options, _n_rows)
-        )
-        df_lazy.schema()
-        df_stream = df_lazy.execute_stream()
-        progress_bar = tqdm(unit="rows")
-        for r in df_stream:
-            py_df = r.to_pyarrow()
-            df = pl.DataFrame(py_df)
-            # # TODO: We can push predicates down to the DataFusion plan in the future,
-            # #  but for now we'll do it here.
-            # if predicate is not None:
-            #     df = df.filter(predicate)
-            # # TODO: We can push columns down to the DataFusion plan in the future,
-            # #  but for now we'll do it here.
-            # if with_columns is not None:
-            #     df = df.select(with_columns)
-            progress_bar.update(len(df))
-            yield df
+        with _lazy_parquet_inputs(df_1, df_2, catalog_dir=ctx.catalog_dir) as (
+            input_1,
+            input_2,
+        ):
+            if isinstance(df_1, pl.LazyFrame):
+                df_lazy: datafusion.DataFrame = range_function(
+                    ctx, input_1, input_2, range_options, limit=_n_rows
+                )
+            elif isinstance(df_1, str) and isinstance(df_2, str):
+                df_lazy = range_function(
+                    ctx,
+                    df_1,
+                    df_2,
+                    range_options,
+                    read_options1,
+                    read_options2,
+                    _n_rows,
+                )
+            else:
+                df_lazy = range_function(ctx, df_1, df_2, range_options, _n_rows)
+            df_lazy.schema()
+            df_stream = df_lazy.execute_stream()
+            progress_bar = tqdm(unit="rows")
+            batch_rows = batch_size or _batch_size or DEFAULT_OUTPUT_BATCH_SIZE
+            for table in _coalesce_batches(
+                (r.to_pyarrow() for r in df_stream),
+                batch_rows,
+                DEFAULT_OUTPUT_BATCH_BYTES,
+            ):
+                df = pl.from_arrow(table)
+                # # TODO: We can push predicates down to the DataFusion plan in the future,
+                # #  but for now we'll do it here.
+                # if predicate is not None:
+                #     df = df.filter(predicate)
+                # # TODO: We can push columns down to the DataFusion plan in the future,
+                # #  but for now we'll do it here.
+                # if with_columns is not None:
+                #     df = df.select(with_columns)
+                progress_bar.update(len(df))
+                yield df
 
     return register_io_source(_range_source, schema=schema)
 
 
+def _coalesce_batches(
+    batches: Iterator[pa.RecordBatch], batch_rows: int, batch_bytes: int
+) -> Iterator[pa.Table]:
+    """
+    Regroup the record batches streamed by DataFusion, which are small and uneven as
+    `coalesce_batches` is disabled in the session, into tables of `batch_rows` rows,
+    or fewer once they reach `batch_bytes` bytes. Larger batches are sliced (zero-copy).
+    """
+    pending, rows, nbytes = [], 0, 0
+    for batch in batches:
+        while batch.num_rows > 0:
+            head = batch.slice(0, batch_rows - rows)
+            batch = batch.slice(head.num_rows)
+            pending.append(head)
+            rows += head.num_rows
+            nbytes += head.nbytes
+            if rows >= batch_rows or nbytes >= batch_bytes:
+                yield pa.Table.from_batches(pending)
+                pending, rows, nbytes = [], 0, 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def _native_overlap_supported(
+    df_1: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    df_2: Union[str, pl.DataFrame, pl.LazyFrame, pd.DataFrame],
+    range_options: RangeOptions,
+) -> bool:
+    return (
+        range_options.range_op == RangeOp.Overlap
+        and (range_options.overlap_alg or "coitrees").lower() == "coitrees"
+        and isinstance(df_1, pl.DataFrame)
+        and isinstance(df_2, pl.DataFrame)
+        and len(df_1) + len(df_2) <= NATIVE_OVERLAP_MAX_ROWS
+    )
+
+
+def _native_overlap(
+    df_1: pl.DataFrame, df_2: pl.DataFrame, range_options: RangeOptions
+) -> pl.DataFrame:
+    # coitrees join run directly on the exported Arrow buffers - no DataFusion tables
+    df = pl.from_arrow(
+        range_operation_frame_native(
+            df_1.to_arrow().to_reader(), df_2.to_arrow().to_reader(), range_options
+        )
+    )
+    return df.select(_overlap_columns(df.columns, range_options))
+
+
+def _overlap_columns(columns: list[str], range_options: RangeOptions) -> list[str]:
+    """
+    Reorder the suffixed output columns of an overlap (all columns of the first
+    input, then all of the second one) the way the DataFusion query emits them:
+    the interval columns of both inputs first, then the remaining ones.
+    """
+    suffix_1, suffix_2 = range_options.suffixes
+    interval_columns = [f"{c}{suffix_1}" for c in range_options.columns_1] + [
+        f"{c}{suffix_2}" for c in range_options.columns_2
+    ]
+    return interval_columns + [c for c in columns if c not in interval_columns]
+
+
+def _overlap_schema(schema: pl.Schema, range_options: RangeOptions) -> pl.Schema:
+    return pl.Schema(
+        {c: schema[c] for c in _overlap_columns(schema.names(), range_options)}
+    )
+
+
+def _lazy_to_parquet(df: pl.LazyFrame, catalog_dir: str) -> str:
+    """
+    Stream a LazyFrame into a Parquet file in the session catalog, so that
+    the upstream pipeline is never fully materialized in memory.
+    """
+    path = f"{catalog_dir}/{uuid.uuid4().hex}.parquet"
+    try:
+        df.sink_parquet(path)
+    except pl.exceptions.InvalidOperationError:
+        logger.warning(
+            "The LazyFrame input is not supported by the Polars streaming engine, "
+            "it is collected in memory before the range operation"
+        )
+        df.collect(streaming=True).write_parquet(path)
+    return path
+
+
+@contextmanager
+def _lazy_parquet_inputs(*dfs, catalog_dir: str) -> Iterator[list]:
+    """
+    Stream the LazyFrames among `dfs` to temporary Parquet files (see `_lazy_to_parquet`),
+    which are removed when the context exits. Other inputs are passed through.
+    """
+    paths = []
+    try:
+        inputs = []
+        for df in dfs:
+            if isinstance(df, pl.LazyFrame):
+                df = _lazy_to_parquet(df, catalog_dir)
+                paths.append(df)
+            inputs.append(df)
+        yield inputs
+    finally:
+        for path in paths:
+            Path(path).unlink(missing_ok=True)
+
+
 def _rename_columns_pl(df: pl.DataFrame, suffix: str) -> pl.DataFrame:
     return df.rename({col: f"{col}{suffix}" for col in df.columns})
 
@@ -118,10 +263,14 @@ def _get_schema(
 
     elif ext[-1] == ".parquet":
         df = pl.read_parquet(path)
-    elif ".csv" in ext:
-        df = pl.read_csv(path)
-    elif ".vcf" in ext:
-        table = py_register_table(ctx, path, None, InputFormat.Vcf, read_options)
+    elif ".csv" in ext or ".tsv" in ext or ".vcf" in ext or ".bed" in ext:
+        if ".vcf" in ext:
+            input_format = InputFormat.Vcf
+        elif ".bed" in ext:
+            input_format = InputFormat.Bed
+        else:
+            input_format = InputFormat.Csv
+        table = py_register_table(ctx, path, None, input_format, read_options)
         df: DataFrame = py_read_table(ctx, table.name)
         arrow_schema = df.schema()
         empty_table = pa.Table.from_arrays(
@@ -130,7 +279,7 @@ def _get_schema(
         )
         df = pl.from_arrow(empty_table)
     else:
-        raise ValueError("Only CSV and Parquet files are supported")
+        raise ValueError("Only CSV, BED, VCF and Parquet files are supported")
     if suffix is not None:
         df = _rename_columns(df, suffix)
     return df.schema
@@ -143,9 +292,24 @@ def _df_to_arrow(df: pd.DataFrame, col: str) -> pa.Table:
 
 # since there is an error when Pandas DF are converted to Arrow, we need to use the following function
 # to change the type of the columns to largestring (the problem is with the string type for
-# larger datasets)
+# larger datasets). Columns that are already large_string/string_view (e.g. `string[pyarrow]`)
+# and dictionary-encoded (categorical) columns are passed through without a copy.
 def _string_to_largestring(table: pa.Table, column_name: str) -> pa.Table:
     index = _get_column_index(table, column_name)
+    field_type = table.schema.field(index).type
+    if pa.types.is_dictionary(field_type):
+        value_type = field_type.value_type
+        if not (
+            pa.types.is_string(value_type)
+            or pa.types.is_large_string(value_type)
+            or pa.types.is_string_view(value_type)
+        ):
+            raise ValueError(
+                f"Column '{column_name}' must be dictionary-encoded with string values, got {value_type}."
+            )
+        return table
+    if pa.types.is_large_string(field_type) or pa.types.is_string_view(field_type):
+        return table
     return table.set_column(
         index,  # Index of the column to replace
         table.schema.field(index).name,  # Name of the column
@@ -0,0 +1,187 @@
+use std::fs::File;
+use std::io::{BufRead, BufReader, Read};
+use std::path::Path;
+
+use arrow_schema::{DataType, Field, Schema};
+use datafusion::datasource::file_format::file_compression_type::FileCompressionType;
+use datafusion::functions::expr_fn::{nullif, starts_with};
+use datafusion::prelude::{cast, lit, Expr};
+use flate2::read::MultiGzDecoder;
+
+// column names follow bioframe.SCHEMAS, so that BED files can be read with the default interval columns
+const BED_COLUMNS: [(&str, DataType); 12] = [
+    ("chrom", DataType::Utf8),
+    ("start", DataType::Int64),
+    ("end", DataType::Int64),
+    ("name", DataType::Utf8),
+    ("score", DataType::Int64),
+    ("strand", DataType::Utf8),
+    ("thickStart", DataType::Int64),
+    ("thickEnd", DataType::Int64),
+    ("itemRgb", DataType::Utf8),
+    ("blockCount", DataType::Int64),
+    ("blockSizes", DataType::Utf8),
+    ("blockStarts", DataType::Utf8),
+];
+
+// header lines of UCSC BED files, which precede the records
+const BED_HEADER_PREFIXES: [&str; 2] = ["track", "browser"];
+
+const BEDGRAPH_COLUMNS: [(&str, DataType); 1] = [("value", DataType::Float64)];
+
+const NARROWPEAK_COLUMNS: [(&str, DataType); 4] = [
+    ("fc", DataType::Float64),
+    ("-log10p", DataType::Float64),
+    ("-log10q", DataType::Float64),
+    ("relSummit", DataType::Int64),
+];
+
+/// Returns the schema of a BED flavour: `bed3`..`bed12`, `bedGraph` or `narrowPeak`.
+pub(crate) fn bed_schema(preset: &str) -> Result<Schema, String> {
+    let columns: Vec<(&str, DataType)> = match preset {
+        "bedGraph" => BED_COLUMNS[..3]
+            .iter()
+            .chain(BEDGRAPH_COLUMNS.iter())
+            .cloned()
+            .collect(),
+        "narrowPeak" => BED_COLUMNS[..6]
+            .iter()
+            .chain(NARROWPEAK_COLUMNS.iter())
+            .cloned()
+            .collect(),
+        _ => match preset.strip_prefix("bed").map(|n| n.parse::<usize>()) {
+            Some(Ok(n)) if (3..=12).contains(&n) => BED_COLUMNS[..n].to_vec(),
+            _ => return Err(format!("Unsupported BED schema: {}", preset)),
+        },
+    };
+    Ok(Schema::new(
+        columns
+            .into_iter()
+            .map(|(name, data_type)| Field::new(name, data_type, true))
+            .collect::<Vec<Field>>(),
+    ))
+}
+
+/// Returns the compression of a BED file based on its extension. BGZF is a
+/// series of gzip members, so it is read with the gzip decoder.
+pub(crate) fn bed_compression(path: &str) -> FileCompressionType {
+    let lower_path = path.to_lowercase();
+    if [".gz", ".bgz", ".bgzf"]
+        .iter()
+        .any(|ext| lower_path.ends_with(ext))
+    {
+        FileCompressionType::GZIP
+    } else {
+        FileCompressionType::UNCOMPRESSED
+    }
+}
+
+/// Layout of a BED file: the number of columns of its first record, and whether
+/// it starts with `track`/`browser` lines, which the CSV reader cannot skip.
+/// Remote files are assumed to be `bed3` without such lines.
+pub(crate) fn inspect_bed(path: &str) -> Result<(usize, bool), String> {
+    if !Path::new(path).exists() {
+        return Ok((3, false));
+    }
+    let file = File::open(path).map_err(|e| e.to_string())?;
+    let reader: Box<dyn Read> = match bed_compression(path) {
+        FileCompressionType::GZIP => Box::new(MultiGzDecoder::new(file)),
+        _ => Box::new(file),
+    };
+    let mut header_lines = false;
+    for line in BufReader::new(reader).lines() {
+        let line = line.map_err(|e| e.to_string())?;
+        if line.is_empty() || line.starts_with('#') {
+            continue;
+        }
+        if BED_HEADER_PREFIXES.iter().any(|p| line.starts_with(p)) {
+            header_lines = true;
+            continue;
+        }
+        return Ok((
+            line.trim_end_matches('\r').split('\t').count(),
+            header_lines,
+        ));
+    }
+    Ok((3, header_lines))
+}
+
+/// Picks the BED schema of `path`: the `preset` if provided, otherwise `bedN`
+/// where N is the number of columns of the first record of a local file
+/// (`bed3` for remote files). Columns beyond the 12 BED ones are read as
+/// strings, named `column_<N>` as the columns of headerless CSV files.
+pub(crate) fn detect_bed_schema(path: &str, preset: Option<&str>) -> Result<Schema, String> {
+    if let Some(preset) = preset {
+        return bed_schema(preset);
+    }
+    let (num_columns, _) = inspect_bed(path)?;
+    let schema = bed_schema(&format!("bed{}", num_columns.clamp(3, 12)))?;
+    let extra_columns =
+        (13..=num_columns).map(|i| Field::new(format!("column_{}", i), DataType::Utf8, true));
+    Ok(Schema::new(
+        schema
+            .fields()
+            .iter()
+            .map(|f| f.as_ref().clone())
+            .chain(extra_columns)
+            .collect::<Vec<Field>>(),
+    ))
+}
+
+/// Schema of the CSV scan of a BED file with `schema`: the optional numeric
+/// columns (e.g. `score`, `thickStart`, `blockCount`) are read as strings, so
+/// that their `.` placeholder can be mapped to null by `bed_projection`.
+pub(crate) fn bed_scan_schema(schema: &Schema) -> Schema {
+    Schema::new(
+        schema
+            .fields()
+            .iter()
+            .enumerate()
+            .map(|(i, f)| {
+                if is_optional_numeric(i, f) {
+                    f.as_ref().clone().with_data_type(DataType::Utf8)
+                } else {
+                    f.as_ref().clone()
+                }
+            })
+            .collect::<Vec<Field>>(),
+    )
+}
+
+/// Projection of a BED scan onto `schema`, where `value(i, field)` is the raw
+/// value of the i-th column (a CSV column, or a field split from the line).
+/// `.` is null in the optional numeric columns.
+pub(crate) fn bed_projection(schema: &Schema, value: impl Fn(usize, &Field) -> Expr) -> Vec<Expr> {
+    schema
+        .fields()
+        .iter()
+        .enumerate()
+        .map(|(i, f)| {
+            let expr = value(i, f);
+            let expr = match f.data_type() {
+                DataType::Utf8 => expr,
+                data_type if is_optional_numeric(i, f) => {
+                    cast(nullif(expr, lit(".")), data_type.clone())
+                },
+                data_type => cast(expr, data_type.clone()),
+            };
+            expr.alias(f.name())
+        })
+        .collect()
+}
+
+/// Filters out the `track`, `browser` and comment lines of a BED file read
+/// line by line.
+pub(crate) fn bed_record_filter(line: Expr) -> Expr {
+    let skipped = BED_HEADER_PREFIXES
+        .iter()
+        .chain(["#"].iter())
+        .map(|prefix| starts_with(line.clone(), lit(*prefix)))
+        .reduce(Expr::or)
+        .unwrap();
+    !skipped
+}
+
+fn is_optional_numeric(index: usize, field: &Field) -> bool {
+    index >= 3 && field.data_type() != &DataType::Utf8
+}
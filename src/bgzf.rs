@@ -0,0 +1,465 @@
+use std::collections::HashMap;
+use std::fs::File;
+use std::io::{BufReader, Error, ErrorKind, Read, Result, Seek, SeekFrom, Write};
+use std::ops::Range;
+use std::sync::RwLock;
+use std::{fmt, thread};
+
+use async_trait::async_trait;
+use bytes::Bytes;
+use chrono::{DateTime, Utc};
+use flate2::read::DeflateDecoder;
+use flate2::write::DeflateEncoder;
+use flate2::{Compression, Crc};
+use futures::channel::mpsc;
+use futures::stream::BoxStream;
+use futures::{SinkExt, StreamExt};
+use object_store::path::Path;
+use object_store::{
+    GetOptions, GetRange, GetResult, GetResultPayload, ListResult, MultipartUpload, ObjectMeta,
+    ObjectStore, PutMultipartOpts, PutOptions, PutPayload, PutResult,
+};
+
+/// Number of BGZF blocks (up to 64 KiB each) (de)compressed per thread in a single round.
+const BLOCKS_PER_THREAD: usize = 64;
+const BGZF_MAGIC: [u8; 4] = [0x1f, 0x8b, 0x08, 0x04];
+/// Maximum number of uncompressed bytes in a block, as in htslib.
+const MAX_BLOCK_DATA: usize = 0xff00;
+/// Gzip header with the BC extra subfield, followed by the 2-byte BSIZE.
+const BLOCK_HEADER: [u8; 16] = [
+    0x1f, 0x8b, 0x08, 0x04, 0, 0, 0, 0, 0, 0xff, 0x06, 0, b'B', b'C', 0x02, 0,
+];
+const BGZF_EOF: [u8; 28] = [
+    0x1f, 0x8b, 0x08, 0x04, 0, 0, 0, 0, 0, 0xff, 0x06, 0, b'B', b'C', 0x02, 0, 0x1b, 0, 0x03, 0, 0,
+    0, 0, 0, 0, 0, 0, 0,
+];
+/// URL of the object store serving BGZF-compressed files decompressed, see [`BgzfStore`].
+pub(crate) const BGZF_STORE_URL: &str = "bgzf://";
+
+/// Returns true if `path` is a local file starting with a BGZF block header.
+pub(crate) fn is_bgzf(path: &str) -> bool {
+    let mut header = [0u8; 4];
+    match File::open(path) {
+        Ok(mut f) => f.read_exact(&mut header).is_ok() && header == BGZF_MAGIC,
+        Err(_) => false,
+    }
+}
+
+/// Inflates the blocks of a BGZF file from the compressed offset `offset` with `thread_num`
+/// threads. Blocks are read sequentially, inflated in parallel in rounds of
+/// `thread_num * BLOCKS_PER_THREAD` and passed to `sink` in order, so the memory usage
+/// does not depend on the file size. Stops early when `sink` returns false.
+pub(crate) fn inflate_blocks(
+    path: &str,
+    offset: u64,
+    thread_num: usize,
+    mut sink: impl FnMut(Vec<u8>) -> bool,
+) -> Result<()> {
+    let thread_num = thread_num.max(1);
+    let mut file = File::open(path)?;
+    file.seek(SeekFrom::Start(offset))?;
+    let mut reader = BufReader::new(file);
+    loop {
+        let mut blocks = Vec::with_capacity(thread_num * BLOCKS_PER_THREAD);
+        while blocks.len() < thread_num * BLOCKS_PER_THREAD {
+            match read_block(&mut reader)? {
+                Some(block) => blocks.push(block),
+                None => break,
+            }
+        }
+        if blocks.is_empty() {
+            return Ok(());
+        }
+        let chunk_size = blocks.len().div_ceil(thread_num);
+        let inflated = thread::scope(|s| {
+            let handles: Vec<_> = blocks
+                .chunks(chunk_size)
+                .map(|chunk| s.spawn(move || chunk.iter().map(inflate).collect::<Vec<_>>()))
+                .collect();
+            handles
+                .into_iter()
+                .flat_map(|h| h.join().unwrap())
+                .collect::<Vec<_>>()
+        });
+        for data in inflated {
+            if !sink(data?) {
+                return Ok(());
+            }
+        }
+    }
+}
+
+/// Reads the compressed and uncompressed offsets of every block of a BGZF file, and its
+/// uncompressed size, from the block headers and ISIZE trailers, without inflating the blocks.
+pub(crate) fn scan_blocks(path: &str) -> Result<(Vec<(u64, u64)>, u64)> {
+    let mut reader = BufReader::new(File::open(path)?);
+    let mut blocks = Vec::new();
+    let (mut coffset, mut uoffset) = (0u64, 0u64);
+    while let Some((xlen, bsize)) = read_header(&mut reader)? {
+        // skip the compressed data and the CRC32
+        reader.seek_relative((bsize + 1 - 12 - xlen - 4) as i64)?;
+        let mut isize = [0u8; 4];
+        reader.read_exact(&mut isize)?;
+        blocks.push((coffset, uoffset));
+        coffset += (bsize + 1) as u64;
+        uoffset += u32::from_le_bytes(isize) as u64;
+    }
+    Ok((blocks, uoffset))
+}
+
+/// A compressed block: its raw deflate payload, CRC32 and uncompressed size.
+struct Block {
+    cdata: Vec<u8>,
+    crc32: u32,
+    isize: usize,
+}
+
+/// Reads the header of the next block, returning the size of its extra field and its BSIZE.
+fn read_header<R: Read>(reader: &mut R) -> Result<Option<(usize, usize)>> {
+    let mut header = [0u8; 12];
+    match reader.read_exact(&mut header) {
+        Ok(_) => {},
+        Err(e) if e.kind() == ErrorKind::UnexpectedEof => return Ok(None),
+        Err(e) => return Err(e),
+    }
+    if header[..4] != BGZF_MAGIC {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            "Invalid BGZF block header",
+        ));
+    }
+    let xlen = u16::from_le_bytes([header[10], header[11]]) as usize;
+    let mut extra = vec![0u8; xlen];
+    reader.read_exact(&mut extra)?;
+    let mut bsize = None;
+    let mut i = 0;
+    while i + 4 <= xlen {
+        let slen = u16::from_le_bytes([extra[i + 2], extra[i + 3]]) as usize;
+        if extra[i] == b'B' && extra[i + 1] == b'C' && slen == 2 && i + 6 <= xlen {
+            bsize = Some(u16::from_le_bytes([extra[i + 4], extra[i + 5]]) as usize);
+        }
+        i += 4 + slen;
+    }
+    let bsize = bsize.ok_or_else(|| Error::new(ErrorKind::InvalidData, "Missing BSIZE field"))?;
+    // BSIZE is the total block size - 1, the block ends with CRC32 and ISIZE
+    if bsize + 1 < 12 + xlen + 8 {
+        return Err(Error::new(ErrorKind::InvalidData, "Invalid BSIZE field"));
+    }
+    Ok(Some((xlen, bsize)))
+}
+
+fn read_block<R: Read>(reader: &mut R) -> Result<Option<Block>> {
+    let (xlen, bsize) = match read_header(reader)? {
+        Some(header) => header,
+        None => return Ok(None),
+    };
+    let mut cdata = vec![0u8; bsize + 1 - 12 - xlen - 8];
+    reader.read_exact(&mut cdata)?;
+    let mut trailer = [0u8; 8];
+    reader.read_exact(&mut trailer)?;
+    Ok(Some(Block {
+        cdata,
+        crc32: u32::from_le_bytes([trailer[0], trailer[1], trailer[2], trailer[3]]),
+        isize: u32::from_le_bytes([trailer[4], trailer[5], trailer[6], trailer[7]]) as usize,
+    }))
+}
+
+/// Inflates a block, checking its data against the CRC32 and ISIZE of the trailer.
+fn inflate(block: &Block) -> Result<Vec<u8>> {
+    let mut data = Vec::with_capacity(block.isize);
+    DeflateDecoder::new(block.cdata.as_slice()).read_to_end(&mut data)?;
+    let mut crc = Crc::new();
+    crc.update(&data);
+    if data.len() != block.isize || crc.sum() != block.crc32 {
+        return Err(Error::new(
+            ErrorKind::InvalidData,
+            "BGZF block does not match its CRC32 or ISIZE",
+        ));
+    }
+    Ok(data)
+}
+
+/// A local BGZF-compressed file served decompressed by [`BgzfStore`].
+#[derive(Debug)]
+struct BgzfSource {
+    path: String,
+    thread_num: usize,
+    /// The compressed and uncompressed offsets of every block, see [`scan_blocks`].
+    blocks: Vec<(u64, u64)>,
+    meta: ObjectMeta,
+}
+
+/// Object store serving local BGZF-compressed files decompressed, so that the readers of
+/// plain text formats (FASTQ, FASTA, BED, GFF, GTF), which inflate on one thread, read them
+/// while their blocks are inflated on `thread_num` threads, in bounded rounds, without
+/// writing a decompressed copy. Ranged reads start at the block containing the range, so
+/// the decompressed files can also be split into byte ranges and scanned in parallel.
+#[derive(Debug, Default)]
+pub(crate) struct BgzfStore {
+    sources: RwLock<HashMap<Path, BgzfSource>>,
+}
+
+impl BgzfStore {
+    /// Serves `path` decompressed and returns its URL, e.g. `bgzf:///data/reads.fastq.gz/reads.fastq`
+    /// for `/data/reads.fastq.gz`. The name of the object keeps the format extension of the
+    /// file, without the compression one, which readers use to pick their decompression.
+    pub(crate) fn insert(&self, path: &str, file_name: &str, thread_num: usize) -> Result<String> {
+        let path = std::fs::canonicalize(path)?.to_string_lossy().to_string();
+        let location = Path::from(format!("{}/{}", path, file_name));
+        let (blocks, size) = scan_blocks(&path)?;
+        let meta = ObjectMeta {
+            location: location.clone(),
+            last_modified: DateTime::<Utc>::from(std::fs::metadata(&path)?.modified()?),
+            size: size as usize,
+            e_tag: None,
+            version: None,
+        };
+        self.sources.write().unwrap().insert(
+            location.clone(),
+            BgzfSource {
+                path,
+                thread_num,
+                blocks,
+                meta,
+            },
+        );
+        Ok(format!("{}/{}", BGZF_STORE_URL, location))
+    }
+
+    fn not_found(location: &Path) -> object_store::Error {
+        object_store::Error::NotFound {
+            path: location.to_string(),
+            source: "not a registered BGZF file".into(),
+        }
+    }
+}
+
+/// Returns the local BGZF-compressed file served by [`BgzfStore`] under `url`, if any.
+pub(crate) fn bgzf_source(url: &str) -> Option<String> {
+    let location = url.strip_prefix(BGZF_STORE_URL)?;
+    let (path, _) = location.rsplit_once('/')?;
+    Some(path.to_string())
+}
+
+impl fmt::Display for BgzfStore {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        write!(f, "BgzfStore")
+    }
+}
+
+#[async_trait]
+impl ObjectStore for BgzfStore {
+    async fn put_opts(
+        &self,
+        _location: &Path,
+        _payload: PutPayload,
+        _opts: PutOptions,
+    ) -> object_store::Result<PutResult> {
+        Err(object_store::Error::NotImplemented)
+    }
+
+    async fn put_multipart_opts(
+        &self,
+        _location: &Path,
+        _opts: PutMultipartOpts,
+    ) -> object_store::Result<Box<dyn MultipartUpload>> {
+        Err(object_store::Error::NotImplemented)
+    }
+
+    async fn get_opts(
+        &self,
+        location: &Path,
+        options: GetOptions,
+    ) -> object_store::Result<GetResult> {
+        let sources = self.sources.read().unwrap();
+        let source = sources
+            .get(location)
+            .ok_or_else(|| Self::not_found(location))?;
+        let size = source.meta.size;
+        let range: Range<usize> = match options.range {
+            Some(GetRange::Bounded(r)) => r.start.min(size)..r.end.min(size),
+            Some(GetRange::Offset(o)) => o.min(size)..size,
+            Some(GetRange::Suffix(n)) => size.saturating_sub(n)..size,
+            None => 0..size,
+        };
+        let (tx, rx) = mpsc::channel(1);
+        if !options.head && !range.is_empty() {
+            // the block containing the start of the range
+            let first = source
+                .blocks
+                .partition_point(|(_, uoffset)| *uoffset <= range.start as u64)
+                .saturating_sub(1);
+            let (coffset, uoffset) = source.blocks[first];
+            let (path, thread_num) = (source.path.clone(), source.thread_num);
+            let mut skip = range.start - uoffset as usize;
+            let mut remaining = range.len();
+            thread::spawn(move || {
+                let mut tx = tx;
+                let result = inflate_blocks(&path, coffset, thread_num, |data| {
+                    let data = Bytes::from(data);
+                    let start = skip.min(data.len());
+                    skip -= start;
+                    let end = data.len().min(start + remaining);
+                    remaining -= end - start;
+                    // the channel holds a single block, so at most one round is inflated ahead
+                    (end == start
+                        || futures::executor::block_on(tx.send(Ok(data.slice(start..end)))).is_ok())
+                        && remaining > 0
+                });
+                if let Err(e) = result {
+                    let _ =
+                        futures::executor::block_on(tx.send(Err(object_store::Error::Generic {
+                            store: "BgzfStore",
+                            source: Box::new(e),
+                        })));
+                }
+            });
+        }
+        Ok(GetResult {
+            payload: GetResultPayload::Stream(rx.boxed()),
+            meta: source.meta.clone(),
+            range,
+            attributes: Default::default(),
+        })
+    }
+
+    async fn delete(&self, _location: &Path) -> object_store::Result<()> {
+        Err(object_store::Error::NotImplemented)
+    }
+
+    fn list(&self, prefix: Option<&Path>) -> BoxStream<'_, object_store::Result<ObjectMeta>> {
+        let prefix = prefix.map(|p| p.to_string()).unwrap_or_default();
+        let objects: Vec<_> = self
+            .sources
+            .read()
+            .unwrap()
+            .values()
+            .filter(|s| s.meta.location.as_ref().starts_with(&prefix))
+            .map(|s| Ok(s.meta.clone()))
+            .collect();
+        futures::stream::iter(objects).boxed()
+    }
+
+    async fn list_with_delimiter(&self, prefix: Option<&Path>) -> object_store::Result<ListResult> {
+        let objects = self.list(prefix).collect::<Vec<_>>().await;
+        Ok(ListResult {
+            common_prefixes: vec![],
+            objects: objects
+                .into_iter()
+                .collect::<object_store::Result<Vec<_>>>()?,
+        })
+    }
+
+    async fn copy(&self, _from: &Path, _to: &Path) -> object_store::Result<()> {
+        Err(object_store::Error::NotImplemented)
+    }
+
+    async fn copy_if_not_exists(&self, _from: &Path, _to: &Path) -> object_store::Result<()> {
+        Err(object_store::Error::NotImplemented)
+    }
+}
+
+/// BGZF writer compressing full blocks with `thread_num` threads in rounds of
+/// `thread_num * BLOCKS_PER_THREAD`. It keeps the compressed offset of every
+/// written block, so that uncompressed positions can be turned into the
+/// virtual offsets used by tabix/CSI indexes.
+pub(crate) struct BgzfWriter<W: Write> {
+    inner: W,
+    buffer: Vec<u8>,
+    thread_num: usize,
+    block_offsets: Vec<u64>,
+    compressed_offset: u64,
+}
+
+impl<W: Write> BgzfWriter<W> {
+    pub(crate) fn new(inner: W, thread_num: usize) -> Self {
+        BgzfWriter {
+            inner,
+            buffer: Vec::new(),
+            thread_num: thread_num.max(1),
+            block_offsets: Vec::new(),
+            compressed_offset: 0,
+        }
+    }
+
+    /// Number of uncompressed bytes written so far.
+    pub(crate) fn position(&self) -> u64 {
+        (self.block_offsets.len() * MAX_BLOCK_DATA + self.buffer.len()) as u64
+    }
+
+    /// Virtual offset of the uncompressed position `pos`, or None if its block
+    /// has not been compressed yet.
+    pub(crate) fn virtual_offset(&self, pos: u64) -> Option<u64> {
+        let block = (pos / MAX_BLOCK_DATA as u64) as usize;
+        let within = pos % MAX_BLOCK_DATA as u64;
+        match self.block_offsets.get(block) {
+            Some(offset) => Some(offset << 16 | within),
+            None if block == self.block_offsets.len() && self.buffer.is_empty() => {
+                Some(self.compressed_offset << 16)
+            },
+            None => None,
+        }
+    }
+
+    pub(crate) fn write_all(&mut self, data: &[u8]) -> Result<()> {
+        self.buffer.extend_from_slice(data);
+        if self.buffer.len() >= self.thread_num * BLOCKS_PER_THREAD * MAX_BLOCK_DATA {
+            let full_blocks = self.buffer.len() / MAX_BLOCK_DATA * MAX_BLOCK_DATA;
+            let data: Vec<u8> = self.buffer.drain(..full_blocks).collect();
+            self.write_blocks(&data)?;
+        }
+        Ok(())
+    }
+
+    /// Writes the remaining data and the BGZF end-of-file marker.
+    pub(crate) fn finish(&mut self) -> Result<()> {
+        let data = std::mem::take(&mut self.buffer);
+        if !data.is_empty() {
+            self.write_blocks(&data)?;
+        }
+        self.inner.write_all(&BGZF_EOF)?;
+        self.inner.flush()
+    }
+
+    fn write_blocks(&mut self, data: &[u8]) -> Result<()> {
+        let blocks: Vec<&[u8]> = data.chunks(MAX_BLOCK_DATA).collect();
+        let chunk_size = blocks.len().div_ceil(self.thread_num);
+        let compressed = thread::scope(|s| {
+            let handles: Vec<_> = blocks
+                .chunks(chunk_size)
+                .map(|chunk| s.spawn(move || chunk.iter().map(|b| deflate(b)).collect::<Vec<_>>()))
+                .collect();
+            handles
+                .into_iter()
+                .flat_map(|h| h.join().unwrap())
+                .collect::<Vec<_>>()
+        });
+        for block in compressed {
+            let block = block?;
+            self.block_offsets.push(self.compressed_offset);
+            self.inner.write_all(&block)?;
+            self.compressed_offset += block.len() as u64;
+        }
+        Ok(())
+    }
+}
+
+fn deflate(data: &[u8]) -> Result<Vec<u8>> {
+    let mut encoder = DeflateEncoder::new(Vec::with_capacity(data.len()), Compression::default());
+    encoder.write_all(data)?;
+    let cdata = encoder.finish()?;
+    let mut crc = Crc::new();
+    crc.update(data);
+    // BSIZE is the total block size - 1: header, BSIZE, payload, CRC32 and ISIZE
+    let bsize = BLOCK_HEADER.len() + 2 + cdata.len() + 8 - 1;
+    if bsize > u16::MAX as usize {
+        return Err(Error::new(ErrorKind::InvalidData, "BGZF block too large"));
+    }
+    let mut block = Vec::with_capacity(bsize + 1);
+    block.extend_from_slice(&BLOCK_HEADER);
+    block.extend_from_slice(&(bsize as u16).to_le_bytes());
+    block.extend_from_slice(&cdata);
+    block.extend_from_slice(&crc.sum().to_le_bytes());
+    block.extend_from_slice(&(data.len() as u32).to_le_bytes());
+    Ok(block)
+}
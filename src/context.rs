@@ -1,6 +1,9 @@
 use std::collections::HashMap;
+use std::sync::{Arc, Mutex};
 
 use datafusion::config::ConfigOptions;
+use datafusion::datasource::TableProvider;
+use datafusion::execution::object_store::ObjectStoreUrl;
 use datafusion::prelude::SessionConfig;
 use exon::config::ExonConfigExtension;
 use exon::ExonSession;
@@ -8,6 +11,9 @@ use log::debug;
 use pyo3::{pyclass, pymethods, PyResult};
 use sequila_core::session_context::SequilaConfig;
 
+use crate::bgzf::{BgzfStore, BGZF_STORE_URL};
+use crate::option::{InputFormat, ReadOptions};
+
 #[pyclass(name = "BioSessionContext")]
 // #[derive(Clone)]
 pub struct PyBioSessionContext {
@@ -15,7 +21,10 @@ pub struct PyBioSessionContext {
     pub session_config: HashMap<String, String>,
     #[pyo3(get, set)]
     pub seed: String,
+    #[pyo3(get)]
     pub catalog_dir: String,
+    pub table_registry: TableRegistry,
+    pub bgzf_store: Arc<BgzfStore>,
 }
 
 #[pymethods]
@@ -25,12 +34,19 @@ impl PyBioSessionContext {
     pub fn new(seed: String, catalog_dir: String) -> PyResult<Self> {
         let ctx = create_context().unwrap();
         let session_config: HashMap<String, String> = HashMap::new();
+        let bgzf_store = Arc::new(BgzfStore::default());
+        ctx.session.runtime_env().register_object_store(
+            ObjectStoreUrl::parse(BGZF_STORE_URL).unwrap().as_ref(),
+            bgzf_store.clone(),
+        );
 
         Ok(PyBioSessionContext {
             ctx,
             session_config,
             seed,
             catalog_dir,
+            table_registry: TableRegistry::default(),
+            bgzf_store,
         })
     }
     #[pyo3(signature = (key, value, temporary=Some(false)))]
@@ -47,6 +63,13 @@ impl PyBioSessionContext {
         self.session_config.get(key).map(|v| v.as_str())
     }
 
+    /// Drops the cached table providers, e.g. after a remote file was replaced.
+    /// Tables registered from them keep working until they are replaced.
+    #[pyo3(signature = ())]
+    pub fn clear_table_cache(&self) {
+        self.table_registry.clear();
+    }
+
     #[pyo3(signature = ())]
     pub fn sync_options(&mut self) {
         for (key, value) in self.session_config.iter() {
@@ -56,6 +79,64 @@ impl PyBioSessionContext {
     }
 }
 
+/// Table providers of registered files, keyed by path, format, read options and
+/// file version, so that registering the same file again (e.g. as the input of
+/// repeated range operations) skips reading headers and inferring schemas.
+#[derive(Default)]
+pub struct TableRegistry {
+    providers: Mutex<HashMap<String, Arc<dyn TableProvider>>>,
+}
+
+impl TableRegistry {
+    /// Returns the cache key of a file, or None for files that are not cached
+    /// (e.g. the temporary files of the session catalog).
+    pub(crate) fn key(
+        &self,
+        path: &str,
+        format: &InputFormat,
+        read_options: &Option<ReadOptions>,
+        catalog_dir: &str,
+    ) -> Option<String> {
+        if path.starts_with(catalog_dir) {
+            return None;
+        }
+        let version = match std::fs::metadata(path) {
+            Ok(metadata) => format!("{:?}:{}", metadata.modified().ok(), metadata.len()),
+            // object store files are cached for the lifetime of the session,
+            // see clear_table_cache
+            Err(_) => String::new(),
+        };
+        Some(format!(
+            "{}|{:?}|{:?}|{}",
+            path, format, read_options, version
+        ))
+    }
+
+    /// Registers the cached provider of `key` as `table_name`. Returns false on a miss.
+    pub(crate) fn register_cached(&self, ctx: &ExonSession, key: &str, table_name: &str) -> bool {
+        let provider = match self.providers.lock().unwrap().get(key) {
+            Some(provider) => provider.clone(),
+            None => return false,
+        };
+        ctx.session.deregister_table(table_name).unwrap();
+        ctx.session.register_table(table_name, provider).unwrap();
+        debug!("Reusing the cached provider of table {}", table_name);
+        true
+    }
+
+    /// Drops the cached providers.
+    pub(crate) fn clear(&self) {
+        self.providers.lock().unwrap().clear();
+    }
+
+    /// Caches the provider registered as `table_name` under `key`.
+    pub(crate) async fn insert(&self, ctx: &ExonSession, key: String, table_name: &str) {
+        if let Ok(provider) = ctx.session.table_provider(table_name).await {
+            self.providers.lock().unwrap().insert(key, provider);
+        }
+    }
+}
+
 pub fn set_option_internal(ctx: &ExonSession, key: &str, value: &str) {
     let state = ctx.session.state_ref();
     state
@@ -0,0 +1,115 @@
+use std::sync::Arc;
+
+use arrow::compute::{concat_batches, take};
+use arrow::error::ArrowError;
+use arrow_array::{ArrayRef, RecordBatch, UInt32Array};
+use arrow_schema::{Field, Schema, SchemaRef};
+use coitrees::{COITree, Interval, IntervalTree};
+use fnv::FnvHashMap;
+
+use crate::option::{FilterOp, RangeOptions};
+use crate::udtf::get_join_col_arrays;
+use crate::utils::default_cols_to_string;
+use crate::DEFAULT_COLUMN_NAMES;
+
+/// Overlaps two in-memory frames directly on their Arrow buffers, bypassing
+/// table registration and SQL planning. Intervals of the second frame are
+/// indexed with coitrees and probed with every row of the first one.
+pub(crate) fn overlap_batches(
+    schema_1: SchemaRef,
+    batches_1: Vec<RecordBatch>,
+    schema_2: SchemaRef,
+    batches_2: Vec<RecordBatch>,
+    range_options: RangeOptions,
+) -> Result<RecordBatch, ArrowError> {
+    let columns_1 = range_options
+        .columns_1
+        .unwrap_or(default_cols_to_string(&DEFAULT_COLUMN_NAMES));
+    let columns_2 = range_options
+        .columns_2
+        .unwrap_or(default_cols_to_string(&DEFAULT_COLUMN_NAMES));
+    let (suffix_1, suffix_2) = range_options
+        .suffixes
+        .unwrap_or(("_1".to_string(), "_2".to_string()));
+    let filter_op = range_options.filter_op.unwrap_or(FilterOp::Strict);
+
+    let left = concat_batches(&schema_1, &batches_1)?;
+    let right = concat_batches(&schema_2, &batches_2)?;
+
+    let trees = build_indexed_coitrees(
+        &right,
+        (
+            columns_2[0].clone(),
+            columns_2[1].clone(),
+            columns_2[2].clone(),
+        ),
+    );
+
+    let mut left_idx: Vec<u32> = Vec::new();
+    let mut right_idx: Vec<u32> = Vec::new();
+    let (contig_arr, start_arr, end_arr) = get_join_col_arrays(
+        &left,
+        (
+            columns_1[0].clone(),
+            columns_1[1].clone(),
+            columns_1[2].clone(),
+        ),
+    );
+    let contig_trees = contig_arr.resolve(&trees, left.num_rows());
+    for i in 0..left.num_rows() {
+        let tree = match contig_trees[i] {
+            Some(tree) => tree,
+            None => continue,
+        };
+        let (pos_start, pos_end) = match filter_op {
+            FilterOp::Strict => (start_arr.value(i) + 1, end_arr.value(i) - 1),
+            FilterOp::Weak => (start_arr.value(i), end_arr.value(i)),
+        };
+        tree.query(pos_start, pos_end, |node| {
+            left_idx.push(i as u32);
+            right_idx.push(*node.metadata);
+        });
+    }
+
+    let left_idx = UInt32Array::from(left_idx);
+    let right_idx = UInt32Array::from(right_idx);
+    let num_columns = left.num_columns() + right.num_columns();
+    let mut fields: Vec<Field> = Vec::with_capacity(num_columns);
+    let mut columns: Vec<ArrayRef> = Vec::with_capacity(num_columns);
+    for (batch, idx, suffix) in [
+        (&left, &left_idx, &suffix_1),
+        (&right, &right_idx, &suffix_2),
+    ] {
+        for (field, column) in batch.schema().fields().iter().zip(batch.columns()) {
+            fields.push(
+                field
+                    .as_ref()
+                    .clone()
+                    .with_name(format!("{}{}", field.name(), suffix)),
+            );
+            columns.push(take(column.as_ref(), idx, None)?);
+        }
+    }
+    RecordBatch::try_new(Arc::new(Schema::new(fields)), columns)
+}
+
+fn build_indexed_coitrees(
+    batch: &RecordBatch,
+    columns: (String, String, String),
+) -> FnvHashMap<String, COITree<u32, u32>> {
+    let mut nodes = FnvHashMap::<String, Vec<Interval<u32>>>::default();
+    let (contig_arr, start_arr, end_arr) = get_join_col_arrays(batch, columns);
+    for i in 0..batch.num_rows() {
+        let interval = Interval::new(start_arr.value(i), end_arr.value(i), i as u32);
+        match nodes.get_mut(contig_arr.value(i)) {
+            Some(node_arr) => node_arr.push(interval),
+            None => {
+                nodes.insert(contig_arr.value(i).to_string(), vec![interval]);
+            },
+        }
+    }
+    nodes
+        .into_iter()
+        .map(|(contig, contig_nodes)| (contig, COITree::new(&contig_nodes)))
+        .collect()
+}
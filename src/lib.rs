@@ -1,43 +1,78 @@
+mod bed;
+mod bgzf;
 mod context;
+mod interval_join;
 mod operation;
 mod option;
 mod query;
 mod scan;
 mod streaming;
+mod tabix;
 mod udtf;
 mod utils;
+mod write;
 
 use std::string::ToString;
+use std::sync::atomic::{AtomicU64, Ordering};
 use std::sync::{Arc, Mutex};
 
+use datafusion::arrow::array::RecordBatch;
+use datafusion::arrow::error::ArrowError;
 use datafusion::arrow::ffi_stream::ArrowArrayStreamReader;
 use datafusion::arrow::pyarrow::PyArrowType;
+use datafusion::arrow::record_batch::RecordBatchReader;
 use datafusion::datasource::MemTable;
 use datafusion_python::dataframe::PyDataFrame;
 use datafusion_vcf::storage::VcfReader;
+use exon::ExonSession;
 use log::{debug, error, info};
 use polars_lazy::prelude::{LazyFrame, ScanArgsAnonymous};
 use polars_python::error::PyPolarsErr;
 use polars_python::lazyframe::PyLazyFrame;
+use pyo3::exceptions::{PyRuntimeError, PyValueError};
 use pyo3::prelude::*;
 use tokio::runtime::Runtime;
 
 use crate::context::PyBioSessionContext;
+use crate::interval_join::overlap_batches;
 use crate::operation::do_range_operation;
 use crate::option::{
-    BioTable, FilterOp, InputFormat, RangeOp, RangeOptions, ReadOptions, VcfReadOptions,
+    BedReadOptions, BioTable, CsvReadOptions, FilterOp, InputFormat, RangeOp, RangeOptions,
+    ReadOptions, VcfReadOptions, WriteOptions,
 };
-use crate::scan::{maybe_register_table, register_frame, register_table};
+use crate::scan::{maybe_register_table, register_cached_table, register_frame};
 use crate::streaming::RangeOperationScan;
-use crate::utils::convert_arrow_rb_schema_to_polars_df_schema;
+use crate::tabix::IndexPreset;
+use crate::utils::RecordBatchConverter;
+use crate::write::{write_bgzf_records, write_dataframe};
 
 const LEFT_TABLE: &str = "s1";
 const RIGHT_TABLE: &str = "s2";
 const DEFAULT_COLUMN_NAMES: [&str; 3] = ["contig", "start", "end"];
 
+static TABLE_ID: AtomicU64 = AtomicU64::new(0);
+
+/// Returns unique names for the input tables of a range operation, so that
+/// concurrent operations on one session do not replace each other's inputs.
+fn input_table_names() -> (String, String) {
+    let id = TABLE_ID.fetch_add(1, Ordering::Relaxed);
+    (
+        format!("{}_{}", LEFT_TABLE, id),
+        format!("{}_{}", RIGHT_TABLE, id),
+    )
+}
+
+/// Deregisters the input tables of a planned range operation, whose plan keeps
+/// references to the table providers.
+fn deregister_input_tables(ctx: &ExonSession, tables: &(String, String)) {
+    ctx.session.deregister_table(&tables.0).unwrap();
+    ctx.session.deregister_table(&tables.1).unwrap();
+}
+
 #[pyfunction]
 #[pyo3(signature = (py_ctx, df1, df2, range_options, limit=None))]
 fn range_operation_frame(
+    py: Python<'_>,
     py_ctx: &PyBioSessionContext,
     df1: PyArrowType<ArrowArrayStreamReader>,
     df2: PyArrowType<ArrowArrayStreamReader>,
@@ -45,38 +80,53 @@ fn range_operation_frame(
     limit: Option<usize>,
 ) -> PyResult<PyDataFrame> {
     #[allow(clippy::useless_conversion)]
-    let rt = Runtime::new().unwrap();
-    let ctx = &py_ctx.ctx;
-    register_frame(py_ctx, df1, LEFT_TABLE.to_string());
-    register_frame(py_ctx, df2, RIGHT_TABLE.to_string());
-    match limit {
-        Some(l) => Ok(PyDataFrame::new(
-            do_range_operation(
-                ctx,
-                &rt,
-                range_options,
-                LEFT_TABLE.to_string(),
-                RIGHT_TABLE.to_string(),
-            )
-            .limit(0, Some(l))?,
-        )),
-        _ => {
-            let df = do_range_operation(
-                ctx,
-                &rt,
-                range_options,
-                LEFT_TABLE.to_string(),
-                RIGHT_TABLE.to_string(),
-            );
-            let py_df = PyDataFrame::new(df);
-            Ok(py_df)
-        },
+    py.allow_threads(|| {
+        let rt = Runtime::new()?;
+        let ctx = &py_ctx.ctx;
+        let tables = input_table_names();
+        register_frame(py_ctx, df1, tables.0.clone());
+        register_frame(py_ctx, df2, tables.1.clone());
+        let df = do_range_operation(ctx, &rt, range_options, tables.0.clone(), tables.1.clone());
+        deregister_input_tables(ctx, &tables);
+        match limit {
+            Some(l) => Ok(PyDataFrame::new(df.limit(0, Some(l))?)),
+            _ => Ok(PyDataFrame::new(df)),
+        }
+    })
+}
+
+#[pyfunction]
+#[pyo3(signature = (df1, df2, range_options))]
+fn range_operation_frame_native(
+    py: Python<'_>,
+    df1: PyArrowType<ArrowArrayStreamReader>,
+    df2: PyArrowType<ArrowArrayStreamReader>,
+    range_options: RangeOptions,
+) -> PyResult<PyArrowType<RecordBatch>> {
+    if range_options.range_op != RangeOp::Overlap {
+        return Err(PyValueError::new_err(format!(
+            "{} operation is not supported for in-process frames",
+            range_options.range_op
+        )));
     }
+    py.allow_threads(|| {
+        let schema_1 = df1.0.schema();
+        let batches_1 = df1.0.collect::<Result<Vec<RecordBatch>, ArrowError>>();
+        let schema_2 = df2.0.schema();
+        let batches_2 = df2.0.collect::<Result<Vec<RecordBatch>, ArrowError>>();
+        batches_1
+            .and_then(|b1| batches_2.map(|b2| (b1, b2)))
+            .and_then(|(b1, b2)| overlap_batches(schema_1, b1, schema_2, b2, range_options))
+            .map(PyArrowType)
+            .map_err(|e| PyRuntimeError::new_err(e.to_string()))
+    })
 }
 
+#[allow(clippy::too_many_arguments)]
 #[pyfunction]
 #[pyo3(signature = (py_ctx, df_path_or_table1, df_path_or_table2, range_options, read_options1=None, read_options2=None, limit=None))]
 fn range_operation_scan(
+    py: Python<'_>,
     py_ctx: &PyBioSessionContext,
     df_path_or_table1: String,
     df_path_or_table2: String,
@@ -86,35 +136,92 @@ fn range_operation_scan(
     limit: Option<usize>,
 ) -> PyResult<PyDataFrame> {
     #[allow(clippy::useless_conversion)]
-    let rt = Runtime::new()?;
-    let ctx = &py_ctx.ctx;
-    let left_table = maybe_register_table(
-        df_path_or_table1,
-        &LEFT_TABLE.to_string(),
-        read_options1,
-        ctx,
-        &rt,
-    );
-    let right_table = maybe_register_table(
-        df_path_or_table2,
-        &RIGHT_TABLE.to_string(),
-        read_options2,
-        ctx,
-        &rt,
-    );
-    match limit {
-        Some(l) => Ok(PyDataFrame::new(
-            do_range_operation(ctx, &rt, range_options, left_table, right_table)
-                .limit(0, Some(l))?,
-        )),
-        _ => Ok(PyDataFrame::new(do_range_operation(
-            ctx,
-            &rt,
-            range_options,
-            left_table,
-            right_table,
-        ))),
+    py.allow_threads(|| {
+        let rt = Runtime::new()?;
+        let ctx = &py_ctx.ctx;
+        let tables = input_table_names();
+        let left_table =
+            maybe_register_table(df_path_or_table1, &tables.0, read_options1, py_ctx, &rt);
+        let right_table =
+            maybe_register_table(df_path_or_table2, &tables.1, read_options2, py_ctx, &rt);
+        let df = do_range_operation(ctx, &rt, range_options, left_table, right_table);
+        deregister_input_tables(ctx, &tables);
+        match limit {
+            Some(l) => Ok(PyDataFrame::new(df.limit(0, Some(l))?)),
+            _ => Ok(PyDataFrame::new(df)),
+        }
+    })
+}
+
+#[allow(clippy::too_many_arguments)]
+#[pyfunction]
+#[pyo3(signature = (py_ctx, df_path_or_table1, df_path_or_table2, range_options, path, write_options=None, read_options1=None, read_options2=None))]
+fn range_operation_sink(
+    py: Python<'_>,
+    py_ctx: &PyBioSessionContext,
+    df_path_or_table1: String,
+    df_path_or_table2: String,
+    range_options: RangeOptions,
+    path: String,
+    write_options: Option<WriteOptions>,
+    read_options1: Option<ReadOptions>,
+    read_options2: Option<ReadOptions>,
+) -> PyResult<()> {
+    py.allow_threads(|| {
+        let rt = Runtime::new()?;
+        let ctx = &py_ctx.ctx;
+        let tables = input_table_names();
+        let left_table =
+            maybe_register_table(df_path_or_table1, &tables.0, read_options1, py_ctx, &rt);
+        let right_table =
+            maybe_register_table(df_path_or_table2, &tables.1, read_options2, py_ctx, &rt);
+        let df = do_range_operation(ctx, &rt, range_options, left_table, right_table);
+        deregister_input_tables(ctx, &tables);
+        rt.block_on(write_dataframe(df, &path, write_options))
+            .map_err(|e| PyRuntimeError::new_err(e.to_string()))
+    })
+}
+
+#[pyfunction]
+#[pyo3(signature = (records, path, header, preset, index=None, thread_num=1))]
+fn py_write_bgzf(
+    py: Python<'_>,
+    records: PyArrowType<ArrowArrayStreamReader>,
+    path: String,
+    header: String,
+    preset: String,
+    index: Option<String>,
+    thread_num: usize,
+) -> PyResult<()> {
+    let preset = match preset.as_str() {
+        "vcf" => IndexPreset::Vcf,
+        "bed" => IndexPreset::Bed,
+        _ => {
+            return Err(PyValueError::new_err(format!(
+                "Unsupported preset: {}",
+                preset
+            )))
+        },
+    };
+    if let Some(index) = &index {
+        if index != "tbi" && index != "csi" {
+            return Err(PyValueError::new_err(format!(
+                "Unsupported index: {}, expected tbi or csi",
+                index
+            )));
+        }
     }
+    py.allow_threads(|| {
+        write_bgzf_records(
+            records.0,
+            &path,
+            &header,
+            preset,
+            index.as_deref(),
+            thread_num,
+        )
+        .map_err(|e| PyRuntimeError::new_err(e.to_string()))
+    })
 }
 
 #[pyfunction]
@@ -132,29 +239,19 @@ fn stream_range_operation_scan(
     py.allow_threads(|| {
         let rt = Runtime::new().unwrap();
         let ctx = &py_ctx.ctx;
-        // check if the input has an extension
-
-        let left_table = maybe_register_table(
-            df_path_or_table1,
-            &LEFT_TABLE.to_string(),
-            read_options1,
-            ctx,
-            &rt,
-        );
-        let right_table = maybe_register_table(
-            df_path_or_table2,
-            &RIGHT_TABLE.to_string(),
-            read_options2,
-            ctx,
-            &rt,
-        );
+        let tables = input_table_names();
+        let left_table =
+            maybe_register_table(df_path_or_table1, &tables.0, read_options1, py_ctx, &rt);
+        let right_table =
+            maybe_register_table(df_path_or_table2, &tables.1, read_options2, py_ctx, &rt);
 
         let df = do_range_operation(ctx, &rt, range_options, left_table, right_table);
-        let schema = df.schema().as_arrow();
-        let polars_schema = convert_arrow_rb_schema_to_polars_df_schema(schema).unwrap();
-        debug!("Schema: {:?}", polars_schema);
+        deregister_input_tables(ctx, &tables);
+        let converter =
+            RecordBatchConverter::try_new(df.schema().as_arrow()).map_err(PyPolarsErr::from)?;
+        debug!("Schema: {:?}", converter.schema());
         let args = ScanArgsAnonymous {
-            schema: Some(Arc::new(polars_schema)),
+            schema: Some(Arc::new(converter.schema().clone())),
             name: "SCAN polars-bio",
             ..ScanArgsAnonymous::default()
         };
@@ -171,6 +268,7 @@ fn stream_range_operation_scan(
         let scan = RangeOperationScan {
             df_iter: Arc::new(Mutex::new(stream)),
             rt: Runtime::new().unwrap(),
+            converter,
         };
         let function = Arc::new(scan);
         let lf = LazyFrame::anonymous_scan(function, args).map_err(PyPolarsErr::from)?;
@@ -205,8 +303,8 @@ fn py_register_table(
                 .replace(".", "_")
                 .replace("-", "_"),
         };
-        rt.block_on(register_table(
-            ctx,
+        rt.block_on(register_cached_table(
+            py_ctx,
             &path,
             &table_name,
             input_format.clone(),
@@ -261,11 +359,11 @@ fn py_scan_sql(
         let ctx = &py_ctx.ctx;
 
         let df = rt.block_on(ctx.session.sql(&sql_text))?;
-        let schema = df.schema().as_arrow();
-        let polars_schema = convert_arrow_rb_schema_to_polars_df_schema(schema).unwrap();
-        debug!("Schema: {:?}", polars_schema);
+        let converter =
+            RecordBatchConverter::try_new(df.schema().as_arrow()).map_err(PyPolarsErr::from)?;
+        debug!("Schema: {:?}", converter.schema());
         let args = ScanArgsAnonymous {
-            schema: Some(Arc::new(polars_schema)),
+            schema: Some(Arc::new(converter.schema().clone())),
             name: "SCAN polars-bio",
             ..ScanArgsAnonymous::default()
         };
@@ -282,6 +380,7 @@ fn py_scan_sql(
         let scan = RangeOperationScan {
             df_iter: Arc::new(Mutex::new(stream)),
             rt: Runtime::new().unwrap(),
+            converter,
         };
         let function = Arc::new(scan);
         let lf = LazyFrame::anonymous_scan(function, args).map_err(PyPolarsErr::from)?;
@@ -302,11 +401,11 @@ fn py_scan_table(
         let ctx = &py_ctx.ctx;
 
         let df = rt.block_on(ctx.session.table(&table_name))?;
-        let schema = df.schema().as_arrow();
-        let polars_schema = convert_arrow_rb_schema_to_polars_df_schema(schema).unwrap();
-        debug!("Schema: {:?}", polars_schema);
+        let converter =
+            RecordBatchConverter::try_new(df.schema().as_arrow()).map_err(PyPolarsErr::from)?;
+        debug!("Schema: {:?}", converter.schema());
         let args = ScanArgsAnonymous {
-            schema: Some(Arc::new(polars_schema)),
+            schema: Some(Arc::new(converter.schema().clone())),
             name: "SCAN polars-bio",
             ..ScanArgsAnonymous::default()
         };
@@ -323,6 +422,7 @@ fn py_scan_table(
         let scan = RangeOperationScan {
             df_iter: Arc::new(Mutex::new(stream)),
             rt: Runtime::new().unwrap(),
+            converter,
         };
         let function = Arc::new(scan);
         let lf = LazyFrame::anonymous_scan(function, args).map_err(PyPolarsErr::from)?;
@@ -407,8 +507,11 @@ fn py_from_polars(
 fn polars_bio(_py: Python, m: &Bound<PyModule>) -> PyResult<()> {
     pyo3_log::init();
     m.add_function(wrap_pyfunction!(range_operation_frame, m)?)?;
+    m.add_function(wrap_pyfunction!(range_operation_frame_native, m)?)?;
     m.add_function(wrap_pyfunction!(range_operation_scan, m)?)?;
     m.add_function(wrap_pyfunction!(stream_range_operation_scan, m)?)?;
+    m.add_function(wrap_pyfunction!(range_operation_sink, m)?)?;
+    m.add_function(wrap_pyfunction!(py_write_bgzf, m)?)?;
     m.add_function(wrap_pyfunction!(py_register_table, m)?)?;
     m.add_function(wrap_pyfunction!(py_read_table, m)?)?;
     m.add_function(wrap_pyfunction!(py_read_sql, m)?)?;
@@ -425,5 +528,8 @@ fn polars_bio(_py: Python, m: &Bound<PyModule>) -> PyResult<()> {
     m.add_class::<InputFormat>()?;
     m.add_class::<ReadOptions>()?;
     m.add_class::<VcfReadOptions>()?;
+    m.add_class::<BedReadOptions>()?;
+    m.add_class::<CsvReadOptions>()?;
+    m.add_class::<WriteOptions>()?;
     Ok(())
 }
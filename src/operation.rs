@@ -1,4 +1,4 @@
-use std::sync::Arc;
+use std::sync::{Arc, Mutex};
 
 use datafusion::catalog_common::TableReference;
 use exon::ExonSession;
@@ -13,6 +13,10 @@ use crate::udtf::CountOverlapsProvider;
 use crate::utils::default_cols_to_string;
 use crate::DEFAULT_COLUMN_NAMES;
 
+/// Serializes setting the session-wide interval join algorithm and planning the
+/// query, which snapshots the session configuration, across concurrent operations.
+static PLANNING_LOCK: Mutex<()> = Mutex::new(());
+
 pub(crate) struct QueryParams {
     pub sign: String,
     pub suffixes: (String, String),
@@ -30,6 +34,7 @@ pub(crate) fn do_range_operation(
     left_table: String,
     right_table: String,
 ) -> datafusion::dataframe::DataFrame {
+    let _planning = PLANNING_LOCK.lock().unwrap_or_else(|e| e.into_inner());
     // defaults
     match &range_options.overlap_alg {
         Some(alg) if alg == "coitreesnearest" => {
@@ -163,32 +168,24 @@ async fn do_count_overlaps_coverage_naive(
     let columns_1 = range_opts.columns_1.unwrap();
     let columns_2 = range_opts.columns_2.unwrap();
     let session = &ctx.session;
-    let right_table_ref = TableReference::from(right_table.clone());
-    let right_schema = session
-        .table(right_table_ref.clone())
-        .await
-        .unwrap()
-        .schema()
-        .as_arrow()
-        .clone();
+    // the provider keeps the input tables, which may be deregistered once planned
+    let left_provider = session.table_provider(left_table).await.unwrap();
+    let right_provider = session.table_provider(right_table).await.unwrap();
+    let right_schema = right_provider.schema().as_ref().clone();
     let count_overlaps_provider = CountOverlapsProvider::new(
         Arc::new(session.clone()),
-        left_table,
-        right_table,
+        left_provider,
+        right_provider,
         right_schema,
         columns_1,
         columns_2,
         range_opts.filter_op.unwrap(),
         coverage,
     );
-    let table_name = "count_overlaps_coverage".to_string();
-    session.deregister_table(table_name.clone()).unwrap();
+    // read without registering, so that concurrent operations do not share a table name
     session
-        .register_table(table_name.clone(), Arc::new(count_overlaps_provider))
-        .unwrap();
-    let query = format!("SELECT * FROM {}", table_name);
-    debug!("Query: {}", query);
-    ctx.sql(&query).await.unwrap()
+        .read_table(Arc::new(count_overlaps_provider))
+        .unwrap()
 }
 
 async fn get_non_join_columns(
@@ -1,6 +1,11 @@
 use std::fmt;
+use std::str::FromStr;
 
-use pyo3::{pyclass, pymethods};
+use arrow::pyarrow::PyArrowType;
+use arrow_schema::Schema;
+use datafusion::datasource::file_format::file_compression_type::FileCompressionType;
+use pyo3::exceptions::PyValueError;
+use pyo3::{pyclass, pymethods, PyResult};
 
 #[pyclass(name = "RangeOptions")]
 #[derive(Clone, Debug)]
@@ -138,14 +143,133 @@ impl fmt::Display for InputFormat {
 pub struct ReadOptions {
     #[pyo3(get, set)]
     pub vcf_read_options: Option<VcfReadOptions>,
+    /// Number of threads used to decompress BGZF blocks of local files.
+    #[pyo3(get, set)]
+    pub thread_num: Option<usize>,
+    #[pyo3(get, set)]
+    pub bed_read_options: Option<BedReadOptions>,
+    #[pyo3(get, set)]
+    pub csv_read_options: Option<CsvReadOptions>,
 }
 
 #[pymethods]
 impl ReadOptions {
     #[new]
-    #[pyo3(signature = (vcf_read_options=None))]
-    pub fn new(vcf_read_options: Option<VcfReadOptions>) -> Self {
-        ReadOptions { vcf_read_options }
+    #[pyo3(signature = (vcf_read_options=None, thread_num=None, bed_read_options=None, csv_read_options=None))]
+    pub fn new(
+        vcf_read_options: Option<VcfReadOptions>,
+        thread_num: Option<usize>,
+        bed_read_options: Option<BedReadOptions>,
+        csv_read_options: Option<CsvReadOptions>,
+    ) -> Self {
+        ReadOptions {
+            vcf_read_options,
+            thread_num,
+            bed_read_options,
+            csv_read_options,
+        }
+    }
+}
+
+#[pyclass(name = "BedReadOptions")]
+#[derive(Clone, Debug, Default)]
+pub struct BedReadOptions {
+    /// One of `bed3`..`bed12`, `bedGraph` or `narrowPeak`. Detected from the
+    /// number of columns of local files if not provided.
+    #[pyo3(get, set)]
+    pub schema: Option<String>,
+}
+
+#[pymethods]
+impl BedReadOptions {
+    #[new]
+    #[pyo3(signature = (schema=None))]
+    pub fn new(schema: Option<String>) -> Self {
+        BedReadOptions { schema }
+    }
+}
+
+#[pyclass(name = "CsvReadOptions")]
+#[derive(Clone, Debug, Default)]
+pub struct CsvReadOptions {
+    /// Field delimiter, `,` by default (`\t` for `.tsv` files).
+    #[pyo3(get, set)]
+    pub delimiter: Option<String>,
+    #[pyo3(get, set)]
+    pub has_header: Option<bool>,
+    /// Explicit schema, skips type inference.
+    pub schema: Option<Schema>,
+    /// One of `gzip`, `bzip2`, `xz` or `zstd`. Inferred from the extension if not provided.
+    #[pyo3(get, set)]
+    pub compression: Option<String>,
+    /// Lines starting with this character are skipped.
+    #[pyo3(get, set)]
+    pub comment: Option<String>,
+}
+
+#[pymethods]
+impl CsvReadOptions {
+    #[new]
+    #[pyo3(signature = (delimiter=None, has_header=None, schema=None, compression=None, comment=None))]
+    pub fn new(
+        delimiter: Option<String>,
+        has_header: Option<bool>,
+        schema: Option<PyArrowType<Schema>>,
+        compression: Option<String>,
+        comment: Option<String>,
+    ) -> PyResult<Self> {
+        for (name, value) in [("delimiter", &delimiter), ("comment", &comment)] {
+            if let Some(value) = value {
+                if value.len() != 1 {
+                    return Err(PyValueError::new_err(format!(
+                        "{} must be a single ASCII character, got: '{}'",
+                        name, value
+                    )));
+                }
+            }
+        }
+        if let Some(compression) = &compression {
+            FileCompressionType::from_str(compression)
+                .map_err(|e| PyValueError::new_err(e.to_string()))?;
+        }
+        Ok(CsvReadOptions {
+            delimiter,
+            has_header,
+            schema: schema.map(|s| s.0),
+            compression,
+            comment,
+        })
+    }
+}
+
+#[pyclass(name = "WriteOptions")]
+#[derive(Clone, Debug, Default)]
+pub struct WriteOptions {
+    /// Maximum number of rows per Parquet row group.
+    #[pyo3(get, set)]
+    pub row_group_size: Option<usize>,
+    /// Parquet compression, e.g. `snappy` or `zstd(3)`.
+    #[pyo3(get, set)]
+    pub compression: Option<String>,
+    /// Columns to sort the output by, recorded as `sorting_columns` in Parquet files.
+    #[pyo3(get, set)]
+    pub sort_by: Option<Vec<String>>,
+}
+
+#[pymethods]
+impl WriteOptions {
+    #[new]
+    #[pyo3(signature = (row_group_size=None, compression=None, sort_by=None))]
+    pub fn new(
+        row_group_size: Option<usize>,
+        compression: Option<String>,
+        sort_by: Option<Vec<String>>,
+    ) -> Self {
+        WriteOptions {
+            row_group_size,
+            compression,
+            sort_by,
+        }
     }
 }
 
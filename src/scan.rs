@@ -1,21 +1,48 @@
+use std::any::Any;
+use std::path::Path;
+use std::str::FromStr;
 use std::sync::Arc;
 
 use arrow::array::RecordBatch;
 use arrow::error::ArrowError;
 use arrow::ffi_stream::ArrowArrayStreamReader;
 use arrow::pyarrow::PyArrowType;
+use arrow_schema::{DataType, Field, Schema, SchemaRef};
+use async_trait::async_trait;
+use datafusion::catalog::{Session, TableProvider};
+use datafusion::common::Statistics;
 use datafusion::dataframe::DataFrameWriteOptions;
-use datafusion::datasource::MemTable;
-use datafusion::prelude::{CsvReadOptions, ParquetReadOptions};
+use datafusion::datasource::file_format::file_compression_type::FileCompressionType;
+use datafusion::datasource::{MemTable, TableType};
+use datafusion::functions::expr_fn::split_part;
+use datafusion::logical_expr::TableProviderFilterPushDown;
+use datafusion::physical_plan::ExecutionPlan;
+use datafusion::prelude::{col, ident, lit, CsvReadOptions, Expr, ParquetReadOptions};
 use datafusion_vcf::table_provider::VcfTableProvider;
 use exon::ExonSession;
 use tokio::runtime::Runtime;
-use tracing::debug;
+use tracing::{debug, warn};
 
+use crate::bed::{
+    bed_compression, bed_projection, bed_record_filter, bed_scan_schema, detect_bed_schema,
+    inspect_bed,
+};
+use crate::bgzf::{bgzf_source, is_bgzf, BgzfStore};
 use crate::context::PyBioSessionContext;
 use crate::option::{InputFormat, ReadOptions, VcfReadOptions};
 
 const MAX_IN_MEMORY_ROWS: usize = 1024 * 1024;
+// separator and quote bytes that do not occur in BED files, to read them line by line
+const BED_LINE_DELIMITER: u8 = 0x1f;
+const BED_LINE_QUOTE: u8 = 0x1e;
+const COMPRESSION_EXTENSIONS: [(&str, FileCompressionType); 6] = [
+    (".gz", FileCompressionType::GZIP),
+    (".bgz", FileCompressionType::GZIP),
+    (".bgzf", FileCompressionType::GZIP),
+    (".bz2", FileCompressionType::BZIP2),
+    (".xz", FileCompressionType::XZ),
+    (".zst", FileCompressionType::ZSTD),
+];
 
 pub(crate) fn register_frame(
     py_ctx: &PyBioSessionContext,
@@ -48,21 +75,115 @@ pub(crate) fn register_frame(
             InputFormat::Parquet,
             None,
         ));
+        // the spill file is removed with the provider, i.e. once the table is
+        // deregistered and the plans reading it have been dropped
+        let provider = rt
+            .block_on(ctx.session.table_provider(&table_name))
+            .unwrap();
+        ctx.session.deregister_table(&table_name).unwrap();
+        ctx.session
+            .register_table(&table_name, Arc::new(SpilledTable { provider, path }))
+            .unwrap();
+    }
+}
+
+/// Table provider of a frame spilled to Parquet, which removes the file when dropped.
+#[derive(Debug)]
+struct SpilledTable {
+    provider: Arc<dyn TableProvider>,
+    path: String,
+}
+
+impl Drop for SpilledTable {
+    fn drop(&mut self) {
+        let path = Path::new(&self.path);
+        let result = if path.is_dir() {
+            std::fs::remove_dir_all(path)
+        } else {
+            std::fs::remove_file(path)
+        };
+        if let Err(e) = result {
+            debug!("Could not remove {}: {}", self.path, e);
+        }
     }
 }
 
+#[async_trait]
+impl TableProvider for SpilledTable {
+    fn as_any(&self) -> &dyn Any {
+        self
+    }
+
+    fn schema(&self) -> SchemaRef {
+        self.provider.schema()
+    }
+
+    fn table_type(&self) -> TableType {
+        self.provider.table_type()
+    }
+
+    async fn scan(
+        &self,
+        state: &dyn Session,
+        projection: Option<&Vec<usize>>,
+        filters: &[Expr],
+        limit: Option<usize>,
+    ) -> datafusion::common::Result<Arc<dyn ExecutionPlan>> {
+        self.provider.scan(state, projection, filters, limit).await
+    }
+
+    fn supports_filters_pushdown(
+        &self,
+        filters: &[&Expr],
+    ) -> datafusion::common::Result<Vec<TableProviderFilterPushDown>> {
+        self.provider.supports_filters_pushdown(filters)
+    }
+
+    fn statistics(&self) -> Option<Statistics> {
+        self.provider.statistics()
+    }
+}
+
+/// Returns the lowercased `path` without its compression extension, if any.
+fn strip_compression_extension(path: &str) -> String {
+    let lower_path = path.to_lowercase();
+    COMPRESSION_EXTENSIONS
+        .iter()
+        .find_map(|(ext, _)| lower_path.strip_suffix(ext))
+        .unwrap_or(&lower_path)
+        .to_string()
+}
+
+fn compression_from_extension(path: &str) -> FileCompressionType {
+    let lower_path = path.to_lowercase();
+    COMPRESSION_EXTENSIONS
+        .iter()
+        .find(|(ext, _)| lower_path.ends_with(ext))
+        .map(|(_, compression)| *compression)
+        .unwrap_or(FileCompressionType::UNCOMPRESSED)
+}
+
 pub(crate) fn get_input_format(path: &str) -> InputFormat {
-    let path = path.to_lowercase();
-    if path.ends_with(".parquet") {
+    // the format is given by the extension before the compression one, if any
+    let name = strip_compression_extension(path);
+    if name.ends_with(".parquet") {
         InputFormat::Parquet
-    } else if path.ends_with(".csv") {
+    } else if name.ends_with(".csv") || name.ends_with(".tsv") {
         InputFormat::Csv
-    } else if path.ends_with(".bed") {
+    } else if name.ends_with(".bed") {
         InputFormat::Bed
-    } else if path.ends_with(".vcf") || path.ends_with(".vcf.gz") || path.ends_with(".vcf.bgz") {
+    } else if name.ends_with(".vcf") {
         InputFormat::Vcf
+    } else if name.ends_with(".bam") {
+        InputFormat::Bam
+    } else if name.ends_with(".fastq") || name.ends_with(".fq") {
+        InputFormat::Fastq
+    } else if name.ends_with(".fasta") || name.ends_with(".fa") {
+        InputFormat::Fasta
+    } else if name.ends_with(".gff") || name.ends_with(".gff3") {
+        InputFormat::Gff
     } else {
-        panic!("Unsupported format")
+        panic!("Unsupported format: {}", path)
     }
 }
 
@@ -81,22 +202,100 @@ pub(crate) async fn register_table(
             .await
             .unwrap(),
         InputFormat::Csv => {
-            let csv_read_options = CsvReadOptions::new() //FIXME: expose
-                .delimiter(b',')
-                .has_header(true);
+            let options = read_options
+                .as_ref()
+                .and_then(|o| o.csv_read_options.clone())
+                .unwrap_or_default();
+            let default_delimiter = if strip_compression_extension(path).ends_with(".tsv") {
+                "\t"
+            } else {
+                ","
+            };
+            let compression = match &options.compression {
+                Some(compression) => FileCompressionType::from_str(compression).unwrap(),
+                None => compression_from_extension(path),
+            };
+            let mut csv_read_options = CsvReadOptions::new()
+                .delimiter(options.delimiter.as_deref().unwrap_or(default_delimiter).as_bytes()[0])
+                .has_header(options.has_header.unwrap_or(true))
+                .file_extension("")
+                .file_compression_type(compression);
+            if let Some(comment) = &options.comment {
+                csv_read_options = csv_read_options.comment(comment.as_bytes()[0]);
+            }
+            // an explicit schema skips type inference, which samples the file
+            if let Some(schema) = &options.schema {
+                csv_read_options = csv_read_options.schema(schema);
+            }
             ctx.session
                 .register_csv(table_name, path, csv_read_options)
                 .await
                 .unwrap()
         },
+        InputFormat::Bed => {
+            let preset = read_options
+                .as_ref()
+                .and_then(|o| o.bed_read_options.as_ref())
+                .and_then(|o| o.schema.clone());
+            // files served decompressed by the BgzfStore are inspected from the local file
+            let local_path = bgzf_source(path).unwrap_or_else(|| path.to_string());
+            let schema = detect_bed_schema(&local_path, preset.as_deref()).unwrap();
+            let (_, header_lines) = inspect_bed(&local_path).unwrap();
+            let df = if header_lines {
+                // track/browser lines do not have the columns of the records, so every
+                // line is read as a single field and split into the columns
+                let line_schema = Schema::new(vec![Field::new("line", DataType::Utf8, true)]);
+                let line_read_options = CsvReadOptions::new()
+                    .delimiter(BED_LINE_DELIMITER)
+                    .quote(BED_LINE_QUOTE)
+                    .has_header(false)
+                    .schema(&line_schema)
+                    .file_extension("")
+                    .file_compression_type(bed_compression(path));
+                let line = col("line");
+                ctx.session
+                    .read_csv(path, line_read_options)
+                    .await
+                    .unwrap()
+                    .filter(bed_record_filter(line.clone()))
+                    .unwrap()
+                    .select(bed_projection(&schema, |i, _| {
+                        split_part(line.clone(), lit("\t"), lit(i as i64 + 1))
+                    }))
+                    .unwrap()
+            } else {
+                // uncompressed files are split into byte ranges and parsed in parallel
+                // (see datafusion.optimizer.repartition_file_scans)
+                let scan_schema = bed_scan_schema(&schema);
+                let bed_read_options = CsvReadOptions::new()
+                    .delimiter(b'\t')
+                    .has_header(false)
+                    .comment(b'#')
+                    .schema(&scan_schema)
+                    .file_extension("")
+                    .file_compression_type(bed_compression(path));
+                ctx.session
+                    .read_csv(path, bed_read_options)
+                    .await
+                    .unwrap()
+                    .select(bed_projection(&schema, |_, f| ident(f.name())))
+                    .unwrap()
+            };
+            ctx.session
+                .register_table(table_name, df.into_view())
+                .unwrap();
+        },
         InputFormat::Vcf => {
-            let vcf_read_options = match &read_options {
+            let mut vcf_read_options = match &read_options {
                 Some(options) => match options.clone().vcf_read_options {
                     Some(vcf_read_options) => vcf_read_options,
                     _ => VcfReadOptions::default(),
                 },
                 _ => VcfReadOptions::default(),
             };
+            if let Some(thread_num) = read_options.as_ref().and_then(|o| o.thread_num) {
+                vcf_read_options.thread_num = Some(thread_num);
+            }
             let table_provider = VcfTableProvider::new(
                 path.to_string(),
                 vcf_read_options.info_fields,
@@ -114,24 +313,65 @@ pub(crate) async fn register_table(
         | InputFormat::Cram
         | InputFormat::Fastq
         | InputFormat::Fasta
-        | InputFormat::Bed
         | InputFormat::Gff
-        | InputFormat::Gtf => ctx
+        | InputFormat::Gtf
+        // indexed tables prune BGZF blocks using the .tbi/.csi/.bai index when queried
+        // with the exon region filter UDFs (vcf_region_filter/bam_region_filter)
+        | InputFormat::IndexedVcf
+        | InputFormat::IndexedBam => ctx
             .register_exon_table(table_name, path, &format.to_string())
             .await
             .unwrap(),
-        InputFormat::IndexedVcf | InputFormat::IndexedBam => {
-            todo!("Indexed formats are not supported")
-        },
     };
     table_name.to_string()
 }
 
+/// Serves local BGZF-compressed text files (FASTQ, FASTA, BED, GFF, GTF) through the
+/// session [`BgzfStore`], which inflates their blocks with `ReadOptions.thread_num`
+/// threads while they are scanned, since their readers inflate on a single thread.
+/// Returns the path or URL of the file to register. BAM is not served decompressed,
+/// as its reader requires BGZF input.
+pub(crate) fn maybe_decompress_bgzf(
+    path: &str,
+    format: &InputFormat,
+    read_options: &Option<ReadOptions>,
+    store: &BgzfStore,
+) -> String {
+    let thread_num = read_options
+        .as_ref()
+        .and_then(|o| o.thread_num)
+        .unwrap_or(1);
+    let lower_path = path.to_lowercase();
+    let compressed = lower_path.ends_with(".gz") || lower_path.ends_with(".bgz");
+    let text_format = matches!(
+        format,
+        InputFormat::Fastq
+            | InputFormat::Fasta
+            | InputFormat::Bed
+            | InputFormat::Gff
+            | InputFormat::Gtf
+    );
+    if thread_num < 2 || !compressed || !text_format || !is_bgzf(path) {
+        return path.to_string();
+    }
+    let file_name = Path::new(path).file_stem().unwrap().to_string_lossy();
+    match store.insert(path, &file_name, thread_num) {
+        Ok(url) => {
+            debug!("Serving {} as {} with {} threads", path, url, thread_num);
+            url
+        },
+        Err(e) => {
+            warn!("Parallel BGZF decompression of {} failed: {}", path, e);
+            path.to_string()
+        },
+    }
+}
+
 pub(crate) fn maybe_register_table(
     df_path_or_table: String,
     default_table: &String,
     read_options: Option<ReadOptions>,
-    ctx: &ExonSession,
+    py_ctx: &PyBioSessionContext,
     rt: &Runtime,
 ) -> String {
     let ext: Vec<&str> = df_path_or_table.split('.').collect();
@@ -141,8 +381,8 @@ pub(crate) fn maybe_register_table(
     }
     match ext.last() {
         Some(_ext) => {
-            rt.block_on(register_table(
-                ctx,
+            rt.block_on(register_cached_table(
+                py_ctx,
                 &df_path_or_table,
                 default_table,
                 get_input_format(&df_path_or_table),
@@ -154,3 +394,28 @@ pub(crate) fn maybe_register_table(
     }
     .to_string()
 }
+
+/// Registers `path` as `table_name`, reusing the table provider of a previous
+/// registration of the same, unmodified file with the same read options.
+pub(crate) async fn register_cached_table(
+    py_ctx: &PyBioSessionContext,
+    path: &str,
+    table_name: &str,
+    format: InputFormat,
+    read_options: Option<ReadOptions>,
+) -> String {
+    let ctx = &py_ctx.ctx;
+    let registry = &py_ctx.table_registry;
+    let key = registry.key(path, &format, &read_options, &py_ctx.catalog_dir);
+    if let Some(key) = &key {
+        if registry.register_cached(ctx, key, table_name) {
+            return table_name.to_string();
+        }
+    }
+    let source_path = maybe_decompress_bgzf(path, &format, &read_options, &py_ctx.bgzf_store);
+    register_table(ctx, &source_path, table_name, format, read_options).await;
+    if let Some(key) = key {
+        registry.insert(ctx, key, table_name).await;
+    }
+    table_name.to_string()
+}
@@ -6,11 +6,12 @@ use polars::prelude::PolarsResult;
 use polars_plan::plans::{AnonymousScan, AnonymousScanArgs};
 use tokio::runtime::Runtime;
 
-use crate::utils::{convert_arrow_rb_schema_to_polars_df_schema, convert_arrow_rb_to_polars_df};
+use crate::utils::RecordBatchConverter;
 
 pub struct RangeOperationScan {
     pub(crate) df_iter: Arc<Mutex<SendableRecordBatchStream>>,
     pub(crate) rt: Runtime,
+    pub(crate) converter: RecordBatchConverter,
 }
 
 impl AnonymousScan for RangeOperationScan {
@@ -32,9 +33,7 @@ impl AnonymousScan for RangeOperationScan {
         match result {
             Some(batch) => {
                 let rb = batch.unwrap();
-                let schema_polars = convert_arrow_rb_schema_to_polars_df_schema(&rb.schema())?;
-                let df = convert_arrow_rb_to_polars_df(&rb, &schema_polars)?;
-                Ok(Some(df))
+                Ok(Some(self.converter.convert(&rb)?))
             },
             None => Ok(None),
         }
@@ -0,0 +1,221 @@
+use std::collections::BTreeMap;
+use std::io::{Error, ErrorKind, Result};
+
+/// Size of linear index windows (16 kbp) and of the smallest bins.
+const MIN_SHIFT: u32 = 14;
+/// Number of levels of the binning scheme, as in tabix.
+const DEPTH: u32 = 5;
+const UNSET_OFFSET: u64 = u64::MAX;
+
+/// Tabix header fields of the indexed text format.
+#[derive(Clone, Copy, Debug)]
+pub(crate) enum IndexPreset {
+    Vcf,
+    Bed,
+}
+
+impl IndexPreset {
+    /// format, col_seq, col_beg, col_end, meta and skip.
+    fn header(&self) -> [i32; 6] {
+        match self {
+            IndexPreset::Vcf => [2, 1, 2, 0, b'#' as i32, 0],
+            // generic format with 0-based, half-open coordinates
+            IndexPreset::Bed => [0x10000, 1, 2, 3, b'#' as i32, 0],
+        }
+    }
+}
+
+#[derive(Default)]
+struct ReferenceIndex {
+    bins: BTreeMap<u32, Vec<(u64, u64)>>,
+    linear: Vec<u64>,
+}
+
+/// Builds a tabix (`.tbi`) or CSI (`.csi`) index from records added in the order
+/// they are written, i.e. sorted by position and grouped by contig.
+pub(crate) struct TabixIndexer {
+    preset: IndexPreset,
+    names: Vec<String>,
+    references: Vec<ReferenceIndex>,
+    last_begin: i64,
+}
+
+impl TabixIndexer {
+    pub(crate) fn new(preset: IndexPreset) -> Self {
+        TabixIndexer {
+            preset,
+            names: Vec::new(),
+            references: Vec::new(),
+            last_begin: 0,
+        }
+    }
+
+    /// Adds a record spanning the 0-based, half-open interval `[begin, end)`
+    /// stored between the virtual offsets `start_offset` and `end_offset`.
+    pub(crate) fn add(
+        &mut self,
+        contig: &str,
+        begin: i64,
+        end: i64,
+        start_offset: u64,
+        end_offset: u64,
+    ) -> Result<()> {
+        if self.names.last().map(|n| n != contig).unwrap_or(true) {
+            if self.names.iter().any(|n| n == contig) {
+                return Err(unsorted(contig, begin));
+            }
+            self.names.push(contig.to_string());
+            self.references.push(ReferenceIndex::default());
+        } else if begin < self.last_begin {
+            return Err(unsorted(contig, begin));
+        }
+        self.last_begin = begin;
+        let begin = begin.max(0);
+        let end = end.max(begin + 1);
+        let reference = self.references.last_mut().unwrap();
+        let chunks = reference.bins.entry(reg2bin(begin, end)).or_default();
+        match chunks.last_mut() {
+            // merge chunks ending in the block the record starts in
+            Some(chunk) if chunk.1 >> 16 == start_offset >> 16 => chunk.1 = end_offset,
+            _ => chunks.push((start_offset, end_offset)),
+        }
+        let first_window = (begin >> MIN_SHIFT) as usize;
+        let last_window = ((end - 1) >> MIN_SHIFT) as usize;
+        if reference.linear.len() <= last_window {
+            reference.linear.resize(last_window + 1, UNSET_OFFSET);
+        }
+        for offset in &mut reference.linear[first_window..=last_window] {
+            if *offset == UNSET_OFFSET {
+                *offset = start_offset;
+            }
+        }
+        Ok(())
+    }
+
+    /// Serializes the index in the tabix format (before BGZF compression).
+    pub(crate) fn to_tbi(&self) -> Vec<u8> {
+        let mut data = b"TBI\x01".to_vec();
+        data.extend_from_slice(&(self.names.len() as i32).to_le_bytes());
+        data.extend_from_slice(&self.header());
+        for reference in &self.references {
+            let linear = filled_linear_index(&reference.linear);
+            data.extend_from_slice(&(reference.bins.len() as i32).to_le_bytes());
+            for (bin, chunks) in &reference.bins {
+                data.extend_from_slice(&bin.to_le_bytes());
+                push_chunks(&mut data, chunks);
+            }
+            data.extend_from_slice(&(linear.len() as i32).to_le_bytes());
+            for offset in linear {
+                data.extend_from_slice(&offset.to_le_bytes());
+            }
+        }
+        data
+    }
+
+    /// Serializes the index in the CSI format (before BGZF compression), with
+    /// the tabix header stored in the auxiliary data.
+    pub(crate) fn to_csi(&self) -> Vec<u8> {
+        let header = self.header();
+        let mut data = b"CSI\x01".to_vec();
+        data.extend_from_slice(&(MIN_SHIFT as i32).to_le_bytes());
+        data.extend_from_slice(&(DEPTH as i32).to_le_bytes());
+        data.extend_from_slice(&(header.len() as i32).to_le_bytes());
+        data.extend_from_slice(&header);
+        data.extend_from_slice(&(self.names.len() as i32).to_le_bytes());
+        for reference in &self.references {
+            let linear = filled_linear_index(&reference.linear);
+            data.extend_from_slice(&(reference.bins.len() as i32).to_le_bytes());
+            for (bin, chunks) in &reference.bins {
+                data.extend_from_slice(&bin.to_le_bytes());
+                // smallest offset of the records overlapping the start of the bin
+                let loffset = linear
+                    .get(bin_first_window(*bin))
+                    .copied()
+                    .unwrap_or(chunks[0].0);
+                data.extend_from_slice(&loffset.min(chunks[0].0).to_le_bytes());
+                push_chunks(&mut data, chunks);
+            }
+        }
+        data
+    }
+
+    /// Tabix header fields followed by the contig names.
+    fn header(&self) -> Vec<u8> {
+        let names: Vec<u8> = self
+            .names
+            .iter()
+            .flat_map(|n| n.bytes().chain(std::iter::once(0)))
+            .collect();
+        let mut header: Vec<u8> = self
+            .preset
+            .header()
+            .iter()
+            .flat_map(|v| v.to_le_bytes())
+            .collect();
+        header.extend_from_slice(&(names.len() as i32).to_le_bytes());
+        header.extend_from_slice(&names);
+        header
+    }
+}
+
+/// Bin of the smallest level containing `[begin, end)`, see hts_reg2bin.
+fn reg2bin(begin: i64, end: i64) -> u32 {
+    let end = end - 1;
+    let mut shift = MIN_SHIFT;
+    let mut offset = ((1 << (DEPTH * 3)) - 1) / 7;
+    for level in (1..=DEPTH).rev() {
+        if begin >> shift == end >> shift {
+            return (offset + (begin >> shift)) as u32;
+        }
+        shift += 3;
+        offset -= 1 << ((level - 1) * 3);
+    }
+    0
+}
+
+/// Linear index window of the first position of `bin`.
+fn bin_first_window(bin: u32) -> usize {
+    let mut shift = MIN_SHIFT + DEPTH * 3;
+    let mut first_bin = 0;
+    for level in 0..=DEPTH {
+        let next_first_bin = first_bin + (1 << (level * 3));
+        if bin < next_first_bin {
+            return (((bin - first_bin) as usize) << shift) >> MIN_SHIFT;
+        }
+        first_bin = next_first_bin;
+        shift -= 3;
+    }
+    0
+}
+
+/// Replaces the windows without records with the offset of the previous window.
+fn filled_linear_index(linear: &[u64]) -> Vec<u64> {
+    let mut previous = 0;
+    linear
+        .iter()
+        .map(|&offset| {
+            if offset != UNSET_OFFSET {
+                previous = offset;
+            }
+            previous
+        })
+        .collect()
+}
+
+fn push_chunks(data: &mut Vec<u8>, chunks: &[(u64, u64)]) {
+    data.extend_from_slice(&(chunks.len() as i32).to_le_bytes());
+    for (start, end) in chunks {
+        data.extend_from_slice(&start.to_le_bytes());
+        data.extend_from_slice(&end.to_le_bytes());
+    }
+}
+
+fn unsorted(contig: &str, begin: i64) -> Error {
+    Error::new(
+        ErrorKind::InvalidInput,
+        format!(
+            "Records must be sorted by contig and start to be indexed, found {}:{} out of order",
+            contig, begin
+        ),
+    )
+}
@@ -3,8 +3,9 @@ use std::cmp::{max, min};
 use std::fmt::{Debug, Formatter};
 use std::sync::Arc;
 
+use arrow_array::cast::AsArray;
 use arrow_array::{
-    Array, GenericStringArray, Int32Array, Int64Array, RecordBatch, StringViewArray,
+    Array, ArrayRef, GenericStringArray, Int32Array, Int64Array, RecordBatch, StringViewArray,
 };
 use arrow_schema::{DataType, Field, FieldRef, Schema, SchemaRef};
 use async_trait::async_trait;
@@ -28,8 +29,8 @@ use crate::option::FilterOp;
 
 pub struct CountOverlapsProvider {
     session: Arc<SessionContext>,
-    left_table: String,
-    right_table: String,
+    left_table: Arc<dyn TableProvider>,
+    right_table: Arc<dyn TableProvider>,
     columns_1: (String, String, String),
     columns_2: (String, String, String),
     filter_op: FilterOp,
@@ -40,8 +41,8 @@ pub struct CountOverlapsProvider {
 impl CountOverlapsProvider {
     pub fn new(
         session: Arc<SessionContext>,
-        left_table: String,
-        right_table: String,
+        left_table: Arc<dyn TableProvider>,
+        right_table: Arc<dyn TableProvider>,
         right_table_schema: Schema,
         columns_1: Vec<String>,
         columns_2: Vec<String>,
@@ -112,8 +113,7 @@ impl TableProvider for CountOverlapsProvider {
             .target_partitions;
         let left_table = self
             .session
-            .table(self.left_table.clone())
-            .await?
+            .read_table(Arc::clone(&self.left_table))?
             .collect()
             .await?;
         let trees = Arc::new(build_coitree_from_batches(
@@ -125,7 +125,7 @@ impl TableProvider for CountOverlapsProvider {
             schema: self.schema().clone(),
             session: Arc::clone(&self.session),
             trees,
-            right_table: self.right_table.clone(),
+            right_table: Arc::clone(&self.right_table),
             columns_1: self.columns_1.clone(),
             columns_2: self.columns_2.clone(),
             filter_op: self.filter_op.clone(),
@@ -143,7 +143,7 @@ struct CountOverlapsExec {
     schema: SchemaRef,
     session: Arc<SessionContext>,
     trees: Arc<FnvHashMap<String, COITree<(), u32>>>,
-    right_table: String,
+    right_table: Arc<dyn TableProvider>,
     columns_1: (String, String, String),
     columns_2: (String, String, String),
     filter_op: FilterOp,
@@ -197,7 +197,7 @@ impl ExecutionPlan for CountOverlapsExec {
         let fut = get_stream(
             Arc::clone(&self.session),
             self.trees.clone(),
-            self.right_table.clone(),
+            Arc::clone(&self.right_table),
             self.schema.clone(),
             self.columns_1.clone(),
             self.columns_2.clone(),
@@ -256,13 +256,13 @@ fn build_coitree_from_batches(
         let (contig_arr, start_arr, end_arr) = get_join_col_arrays(&batch, columns.clone());
 
         for i in 0..batch.num_rows() {
-            let contig = contig_arr.value(i).to_string();
+            let contig = contig_arr.value(i);
             let pos_start = start_arr.value(i) as i32;
             let pos_end = end_arr.value(i) as i32;
-            let node_arr = if let Some(node_arr) = nodes.get_mut(&contig) {
+            let node_arr = if let Some(node_arr) = nodes.get_mut(contig) {
                 node_arr
             } else {
-                nodes.entry(contig).or_insert(Vec::new())
+                nodes.entry(contig.to_string()).or_insert(Vec::new())
             };
             node_arr.push(Interval::new(pos_start, pos_end, ()));
         }
@@ -278,29 +278,85 @@ fn build_coitree_from_batches(
     trees
 }
 
-enum ContigArray<'a> {
+pub(crate) enum ContigArray<'a> {
     GenericString(&'a GenericStringArray<i64>),
     Utf8View(&'a StringViewArray),
     Utf8(&'a GenericStringArray<i32>),
+    /// Dictionary-encoded contigs: normalized keys and the dictionary values.
+    Dictionary(Vec<usize>, Box<ContigArray<'a>>),
 }
 
 impl ContigArray<'_> {
-    fn value(&self, i: usize) -> &str {
+    pub(crate) fn value(&self, i: usize) -> &str {
         match self {
             ContigArray::GenericString(arr) => arr.value(i),
             ContigArray::Utf8View(arr) => arr.value(i),
             ContigArray::Utf8(arr) => arr.value(i),
+            ContigArray::Dictionary(keys, values) => values.value(keys[i]),
         }
     }
+
+    /// Looks up the entry of every row in `map`. For dictionary-encoded
+    /// contigs each distinct value is hashed only once.
+    pub(crate) fn resolve<'t, T>(
+        &self,
+        map: &'t FnvHashMap<String, T>,
+        num_rows: usize,
+    ) -> Vec<Option<&'t T>> {
+        match self {
+            ContigArray::Dictionary(keys, values) => {
+                let resolved = values.resolve(map, values.len());
+                keys.iter().map(|k| resolved[*k]).collect()
+            },
+            _ => (0..num_rows).map(|i| map.get(self.value(i))).collect(),
+        }
+    }
+
+    fn len(&self) -> usize {
+        match self {
+            ContigArray::GenericString(arr) => arr.len(),
+            ContigArray::Utf8View(arr) => arr.len(),
+            ContigArray::Utf8(arr) => arr.len(),
+            ContigArray::Dictionary(keys, _) => keys.len(),
+        }
+    }
+}
+
+fn get_contig_array(array: &ArrayRef) -> ContigArray {
+    match array.data_type() {
+        DataType::LargeUtf8 => ContigArray::GenericString(
+            array
+                .as_any()
+                .downcast_ref::<GenericStringArray<i64>>()
+                .unwrap(),
+        ),
+        DataType::Utf8View => {
+            ContigArray::Utf8View(array.as_any().downcast_ref::<StringViewArray>().unwrap())
+        },
+        DataType::Utf8 => ContigArray::Utf8(
+            array
+                .as_any()
+                .downcast_ref::<GenericStringArray<i32>>()
+                .unwrap(),
+        ),
+        DataType::Dictionary(_, _) => {
+            let dict = array.as_any_dictionary();
+            ContigArray::Dictionary(
+                dict.normalized_keys(),
+                Box::new(get_contig_array(dict.values())),
+            )
+        },
+        _ => todo!(),
+    }
 }
 
-enum PosArray<'a> {
+pub(crate) enum PosArray<'a> {
     Int32(&'a Int32Array),
     Int64(&'a Int64Array),
 }
 
 impl PosArray<'_> {
-    fn value(&self, i: usize) -> i32 {
+    pub(crate) fn value(&self, i: usize) -> i32 {
         match self {
             PosArray::Int32(arr) => arr.value(i),
             PosArray::Int64(arr) => arr.value(i) as i32,
@@ -308,40 +364,11 @@ impl PosArray<'_> {
     }
 }
 
-fn get_join_col_arrays(
+pub(crate) fn get_join_col_arrays(
     batch: &RecordBatch,
     columns: (String, String, String),
 ) -> (ContigArray, PosArray, PosArray) {
-    let contig_arr = match batch.column_by_name(&columns.0).unwrap().data_type() {
-        DataType::LargeUtf8 => {
-            let contig_arr = batch
-                .column_by_name(&columns.0)
-                .unwrap()
-                .as_any()
-                .downcast_ref::<GenericStringArray<i64>>()
-                .unwrap();
-            ContigArray::GenericString(contig_arr)
-        },
-        DataType::Utf8View => {
-            let contig_arr = batch
-                .column_by_name(&columns.0)
-                .unwrap()
-                .as_any()
-                .downcast_ref::<StringViewArray>()
-                .unwrap();
-            ContigArray::Utf8View(contig_arr)
-        },
-        DataType::Utf8 => {
-            let contig_arr = batch
-                .column_by_name(&columns.0)
-                .unwrap()
-                .as_any()
-                .downcast_ref::<GenericStringArray<i32>>()
-                .unwrap();
-            ContigArray::Utf8(contig_arr)
-        },
-        _ => todo!(),
-    };
+    let contig_arr = get_contig_array(batch.column_by_name(&columns.0).unwrap());
 
     let start_arr = match batch.column_by_name(&columns.1).unwrap().data_type() {
         DataType::Int32 => {
@@ -402,7 +429,7 @@ fn get_coverage(tree: &COITree<(), u32>, start: i32, end: i32) -> i32 {
 async fn get_stream(
     session: Arc<SessionContext>,
     trees: Arc<FnvHashMap<String, COITree<(), u32>>>,
-    right_table: String,
+    right_table: Arc<dyn TableProvider>,
     new_schema: SchemaRef,
     _columns_1: (String, String, String),
     columns_2: (String, String, String),
@@ -412,8 +439,7 @@ async fn get_stream(
     partition: usize,
     context: Arc<TaskContext>,
 ) -> Result<SendableRecordBatchStream> {
-    let right_table = session.table(right_table);
-    let table_stream = right_table.await?;
+    let table_stream = session.read_table(right_table)?;
     let plan = table_stream.create_physical_plan().await?;
     let repartition_stream =
         RepartitionExec::try_new(plan, Partitioning::RoundRobinBatch(target_partitions))?;
@@ -426,11 +452,11 @@ async fn get_stream(
             let (contig, pos_start, pos_end) = get_join_col_arrays(&rb, columns_2.clone());
             let mut count_arr = Vec::with_capacity(rb.num_rows());
             let num_rows = rb.num_rows();
+            let contig_trees = contig.resolve(&trees, num_rows);
             for i in 0..num_rows {
-                let contig = contig.value(i).to_string();
                 let pos_start = pos_start.value(i);
                 let pos_end = pos_end.value(i);
-                let tree = trees.get(&contig);
+                let tree = contig_trees[i];
                 if tree.is_none() {
                     count_arr.push(0);
                     continue;
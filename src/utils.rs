@@ -1,9 +1,11 @@
 use std::mem;
 use std::sync::Arc;
 
+use arrow::compute::cast;
+use arrow_array::{ArrayRef, StructArray};
 use datafusion::arrow::array::RecordBatch;
 use polars::prelude::{PlSmallStr, PolarsError};
-use polars_core::prelude::{CompatLevel, DataFrame, Series};
+use polars_core::prelude::{DataFrame, Series};
 
 pub(crate) fn default_cols_to_string(s: &[&str; 3]) -> Vec<String> {
     s.iter().map(|x| x.to_string()).collect()
@@ -46,24 +48,93 @@ fn convert_arrow_rs_array_to_polars_arrow_array(
     Ok(unsafe { polars_arrow::ffi::import_array_from_c(polars_c_array, polars_arrow_dtype) }?)
 }
 
-pub fn convert_arrow_rb_to_polars_df(
-    arrow_rb: &RecordBatch,
-    polars_schema: &polars::prelude::Schema,
-) -> Result<DataFrame, PolarsError> {
-    let mut columns: Vec<Series> = Vec::with_capacity(arrow_rb.num_columns());
+/// Polars categoricals are always UInt32-keyed, so dictionary columns (e.g.
+/// contigs) are re-keyed without decoding their values.
+fn polars_dictionary_type() -> arrow_schema::DataType {
+    arrow_schema::DataType::Dictionary(
+        Box::new(arrow_schema::DataType::UInt32),
+        Box::new(arrow_schema::DataType::LargeUtf8),
+    )
+}
+
+/// Converts the record batches of a stream to Polars DataFrames. The Polars schema
+/// and the C data interface type are derived once per stream, and every batch
+/// crosses the C data interface as a single struct array. String columns keep
+/// their Arrow type (`Utf8`, `LargeUtf8` or `Utf8View`), so no offsets are rewritten.
+pub(crate) struct RecordBatchConverter {
+    arrow_schema: arrow_schema::SchemaRef,
+    polars_schema: polars::prelude::Schema,
+    polars_struct_dtype: polars::datatypes::ArrowDataType,
+}
 
-    for (i, column) in arrow_rb.columns().iter().enumerate() {
-        let polars_df_dtype = polars_schema.try_get_at_index(i)?.1;
-        let mut polars_arrow_dtype = polars_df_dtype.to_arrow(CompatLevel::oldest());
-        if polars_arrow_dtype == polars::datatypes::ArrowDataType::LargeUtf8 {
-            polars_arrow_dtype = polars::datatypes::ArrowDataType::Utf8;
-        }
-        let polars_array =
-            convert_arrow_rs_array_to_polars_arrow_array(column, polars_arrow_dtype)?;
-        let series =
-            Series::from_arrow(polars_schema.try_get_at_index(i)?.0.clone(), polars_array)?;
-        columns.push(series);
+impl RecordBatchConverter {
+    pub(crate) fn try_new(arrow_schema: &arrow_schema::Schema) -> Result<Self, PolarsError> {
+        let fields: Vec<arrow_schema::Field> = arrow_schema
+            .fields()
+            .iter()
+            .map(|f| {
+                // the struct array rejects nulls in children declared as non-nullable
+                let field = f.as_ref().clone().with_nullable(true);
+                match f.data_type() {
+                    arrow_schema::DataType::Dictionary(_, _) => {
+                        field.with_data_type(polars_dictionary_type())
+                    },
+                    _ => field,
+                }
+            })
+            .collect();
+        let arrow_schema = Arc::new(arrow_schema::Schema::new(fields));
+        let struct_field = arrow_schema::Field::new(
+            "",
+            arrow_schema::DataType::Struct(arrow_schema.fields().clone()),
+            false,
+        );
+        let polars_struct_field = convert_arrow_rs_field_to_polars_arrow_field(&struct_field)
+            .map_err(|e| PolarsError::ComputeError(e.to_string().into()))?;
+        Ok(RecordBatchConverter {
+            polars_schema: convert_arrow_rb_schema_to_polars_df_schema(&arrow_schema)?,
+            polars_struct_dtype: polars_struct_field.dtype().clone(),
+            arrow_schema,
+        })
     }
 
-    Ok(DataFrame::from_iter(columns))
+    pub(crate) fn schema(&self) -> &polars::prelude::Schema {
+        &self.polars_schema
+    }
+
+    pub(crate) fn convert(&self, arrow_rb: &RecordBatch) -> Result<DataFrame, PolarsError> {
+        let to_polars_err =
+            |e: arrow_schema::ArrowError| PolarsError::ComputeError(e.to_string().into());
+        let columns = arrow_rb
+            .columns()
+            .iter()
+            .zip(self.arrow_schema.fields())
+            .map(|(column, field)| {
+                if column.data_type() == field.data_type() {
+                    Ok(Arc::clone(column))
+                } else {
+                    cast(column, field.data_type())
+                }
+            })
+            .collect::<Result<Vec<ArrayRef>, arrow_schema::ArrowError>>()
+            .map_err(to_polars_err)?;
+        let struct_array = StructArray::try_new(self.arrow_schema.fields().clone(), columns, None)
+            .map_err(to_polars_err)?;
+        let struct_array: ArrayRef = Arc::new(struct_array);
+        let polars_array = convert_arrow_rs_array_to_polars_arrow_array(
+            &struct_array,
+            self.polars_struct_dtype.clone(),
+        )?;
+        let polars_struct = polars_array
+            .as_any()
+            .downcast_ref::<polars_arrow::array::StructArray>()
+            .ok_or_else(|| PolarsError::ComputeError("Expected a struct array".into()))?;
+        let series = polars_struct
+            .values()
+            .iter()
+            .zip(self.polars_schema.iter_names())
+            .map(|(array, name)| Series::from_arrow(name.clone(), array.clone()))
+            .collect::<Result<Vec<Series>, PolarsError>>()?;
+        Ok(DataFrame::from_iter(series))
+    }
 }
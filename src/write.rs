@@ -0,0 +1,238 @@
+use std::collections::VecDeque;
+use std::fs::File;
+use std::io::{BufWriter, Error, ErrorKind};
+use std::str::FromStr;
+use std::sync::Arc;
+
+use arrow::array::{Array, AsArray};
+use arrow::compute::cast;
+use arrow::datatypes::{DataType, Int64Type};
+use arrow::ffi_stream::ArrowArrayStreamReader;
+use arrow::record_batch::RecordBatchReader;
+use datafusion::common::config::{CsvOptions, TableParquetOptions};
+use datafusion::common::parsers::CompressionTypeVariant;
+use datafusion::dataframe::DataFrameWriteOptions;
+use datafusion::error::{DataFusionError, Result};
+use datafusion::parquet::arrow::ArrowWriter;
+use datafusion::parquet::basic::Compression;
+use datafusion::parquet::file::properties::WriterProperties;
+use datafusion::parquet::format::SortingColumn;
+use datafusion::prelude::{ident, DataFrame};
+use futures_util::StreamExt;
+
+use crate::bgzf::BgzfWriter;
+use crate::option::WriteOptions;
+use crate::tabix::{IndexPreset, TabixIndexer};
+
+/// Writes the result of a DataFusion plan to a Parquet, BED or CSV/TSV file
+/// (picked by the extension of `path`) without converting batches to Polars.
+pub(crate) async fn write_dataframe(
+    df: DataFrame,
+    path: &str,
+    write_options: Option<WriteOptions>,
+) -> Result<()> {
+    let options = write_options.unwrap_or_default();
+    let df = match &options.sort_by {
+        Some(columns) => df.sort(columns.iter().map(|c| ident(c).sort(true, false)).collect())?,
+        None => df,
+    };
+    let lower_path = path.to_lowercase();
+    let compression = if lower_path.ends_with(".gz") || lower_path.ends_with(".bgz") {
+        CompressionTypeVariant::GZIP
+    } else {
+        CompressionTypeVariant::UNCOMPRESSED
+    };
+    let name = lower_path
+        .strip_suffix(".gz")
+        .or_else(|| lower_path.strip_suffix(".bgz"))
+        .unwrap_or(&lower_path);
+    let (delimiter, has_header) = if name.ends_with(".parquet") {
+        return match &options.sort_by {
+            Some(columns) => write_sorted_parquet(df, path, &options, columns).await,
+            None => write_parquet(df, path, &options).await,
+        };
+    } else if name.ends_with(".bed") {
+        (b'\t', false)
+    } else if name.ends_with(".tsv") {
+        (b'\t', true)
+    } else if name.ends_with(".csv") {
+        (b',', true)
+    } else {
+        return Err(DataFusionError::Configuration(format!(
+            "Unsupported output format: {}, expected .parquet, .bed, .tsv or .csv",
+            path
+        )));
+    };
+    let csv_options = CsvOptions {
+        delimiter,
+        has_header: Some(has_header),
+        compression,
+        ..Default::default()
+    };
+    df.write_csv(
+        path,
+        DataFrameWriteOptions::new().with_single_file_output(true),
+        Some(csv_options),
+    )
+    .await?;
+    Ok(())
+}
+
+/// Writes with the DataFusion Parquet sink, which serializes row groups of
+/// all partitions in parallel.
+async fn write_parquet(df: DataFrame, path: &str, options: &WriteOptions) -> Result<()> {
+    let mut parquet_options = TableParquetOptions::default();
+    if let Some(row_group_size) = options.row_group_size {
+        parquet_options.global.max_row_group_size = row_group_size;
+    }
+    if let Some(compression) = &options.compression {
+        parquet_options.global.compression = Some(compression.clone());
+    }
+    df.write_parquet(
+        path,
+        DataFrameWriteOptions::new().with_single_file_output(true),
+        Some(parquet_options),
+    )
+    .await?;
+    Ok(())
+}
+
+/// Writes a sorted result with the Arrow Parquet writer, which records the sort
+/// order in the `sorting_columns` metadata of every row group (not supported by
+/// the DataFusion Parquet sink). The sort already merges partitions into one.
+async fn write_sorted_parquet(
+    df: DataFrame,
+    path: &str,
+    options: &WriteOptions,
+    sort_by: &[String],
+) -> Result<()> {
+    let schema = Arc::new(df.schema().as_arrow().clone());
+    let sorting_columns = sort_by
+        .iter()
+        .map(|c| {
+            Ok(SortingColumn {
+                column_idx: schema.index_of(c)? as i32,
+                descending: false,
+                nulls_first: false,
+            })
+        })
+        .collect::<Result<Vec<SortingColumn>>>()?;
+    let mut properties = WriterProperties::builder().set_sorting_columns(Some(sorting_columns));
+    if let Some(row_group_size) = options.row_group_size {
+        properties = properties.set_max_row_group_size(row_group_size);
+    }
+    if let Some(compression) = &options.compression {
+        properties = properties.set_compression(Compression::from_str(compression)?);
+    }
+    let mut writer = ArrowWriter::try_new(File::create(path)?, schema, Some(properties.build()))?;
+    let mut stream = df.execute_stream().await?;
+    while let Some(batch) = stream.next().await {
+        writer.write(&batch?)?;
+    }
+    writer.close()?;
+    Ok(())
+}
+
+/// A written record waiting for the virtual offsets of its start and end.
+struct PendingRecord {
+    contig: String,
+    begin: i64,
+    end: i64,
+    start: u64,
+    end_position: u64,
+}
+
+/// Writes text records to a BGZF-compressed file with `thread_num` compression
+/// threads and, if `index` is `tbi` or `csi`, builds the index while writing.
+/// Batches must have the `line`, `contig`, `begin` and `end` (0-based,
+/// half-open) columns and be sorted by contig and begin to be indexed.
+pub(crate) fn write_bgzf_records(
+    reader: ArrowArrayStreamReader,
+    path: &str,
+    header: &str,
+    preset: IndexPreset,
+    index: Option<&str>,
+    thread_num: usize,
+) -> std::io::Result<()> {
+    let invalid_data = |e: arrow::error::ArrowError| Error::new(ErrorKind::InvalidData, e);
+    let schema = reader.schema();
+    let columns = ["line", "contig", "begin", "end"]
+        .iter()
+        .map(|c| schema.index_of(c).map_err(invalid_data))
+        .collect::<std::io::Result<Vec<usize>>>()?;
+    let mut writer = BgzfWriter::new(BufWriter::new(File::create(path)?), thread_num);
+    let mut indexer = index.map(|_| TabixIndexer::new(preset));
+    let mut pending = VecDeque::new();
+    writer.write_all(header.as_bytes())?;
+    for batch in reader {
+        let batch = batch.map_err(invalid_data)?;
+        let lines = cast(batch.column(columns[0]), &DataType::LargeUtf8).map_err(invalid_data)?;
+        let lines = lines.as_string::<i64>();
+        let contigs = cast(batch.column(columns[1]), &DataType::LargeUtf8).map_err(invalid_data)?;
+        let contigs = contigs.as_string::<i64>();
+        let begins = cast(batch.column(columns[2]), &DataType::Int64).map_err(invalid_data)?;
+        let begins = begins.as_primitive::<Int64Type>();
+        let ends = cast(batch.column(columns[3]), &DataType::Int64).map_err(invalid_data)?;
+        let ends = ends.as_primitive::<Int64Type>();
+        for i in 0..batch.num_rows() {
+            let start = writer.position();
+            writer.write_all(lines.value(i).as_bytes())?;
+            writer.write_all(b"\n")?;
+            if indexer.is_some() {
+                if contigs.is_null(i) || begins.is_null(i) {
+                    return Err(Error::new(
+                        ErrorKind::InvalidInput,
+                        "Records without contig or start cannot be indexed",
+                    ));
+                }
+                pending.push_back(PendingRecord {
+                    contig: contigs.value(i).to_string(),
+                    begin: begins.value(i),
+                    end: if ends.is_null(i) {
+                        begins.value(i) + 1
+                    } else {
+                        ends.value(i)
+                    },
+                    start,
+                    end_position: writer.position(),
+                });
+            }
+        }
+        if let Some(indexer) = indexer.as_mut() {
+            index_pending(&writer, indexer, &mut pending)?;
+        }
+    }
+    writer.finish()?;
+    if let (Some(indexer), Some(index)) = (indexer.as_mut(), index) {
+        index_pending(&writer, indexer, &mut pending)?;
+        let data = match index {
+            "csi" => indexer.to_csi(),
+            _ => indexer.to_tbi(),
+        };
+        let mut index_writer = BgzfWriter::new(File::create(format!("{}.{}", path, index))?, 1);
+        index_writer.write_all(&data)?;
+        index_writer.finish()?;
+    }
+    Ok(())
+}
+
+/// Adds the pending records whose blocks are already compressed to the index.
+fn index_pending<W: std::io::Write>(
+    writer: &BgzfWriter<W>,
+    indexer: &mut TabixIndexer,
+    pending: &mut VecDeque<PendingRecord>,
+) -> std::io::Result<()> {
+    while let Some(record) = pending.front() {
+        match (
+            writer.virtual_offset(record.start),
+            writer.virtual_offset(record.end_position),
+        ) {
+            (Some(start), Some(end)) => {
+                indexer.add(&record.contig, record.begin, record.end, start, end)?;
+                pending.pop_front();
+            },
+            _ => break,
+        }
+    }
+    Ok(())
+}
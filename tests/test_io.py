@@ -1,8 +1,23 @@
+import gzip
+import os
+import shutil
+
 import bioframe as bf
 import pandas as pd
+import polars as pl
+import pytest
 from _expected import DATA_DIR
 
 import polars_bio as pb
+from polars_bio import bgzf_index, parquet_cache
+from polars_bio.io import (
+    _indexed_bam_query,
+    _indexed_vcf_query,
+    _parse_region,
+    _predicate_regions,
+    _region_query,
+    py_register_table,
+)
 
 
 class TestIOBAM:
@@ -17,6 +32,45 @@ class TestIOBAM:
         assert self.df["cigar"][4] == "101M"
 
 
+class TestIOIndexedBAM:
+    bam = f"{DATA_DIR}/io/bam/test.bam"
+    df_region = pb.read_indexed_bam(bam, region="chr1").collect()
+    df_regions = pb.read_indexed_bam(bam, region=["chr1", "chr2:1-1000"]).collect()
+    df_none = pb.read_indexed_bam(bam, region="chr2").collect()
+    df_parallel = pb.read_indexed_bam(bam, parallel=True).collect()
+
+    def test_count(self):
+        assert len(self.df_region) == 2333
+        assert len(self.df_parallel) == 2333
+        assert len(self.df_regions) == 2333
+        assert len(self.df_none) == 0
+
+    def test_fields(self):
+        assert self.df_region["reference"][0] == "chr1"
+
+    def test_unplaced_reads(self):
+        assert bgzf_index.bam_unplaced_reads(self.bam) == 0
+        assert len(self.df_parallel) == len(pb.read_indexed_bam(self.bam).collect())
+
+    def test_predicate_regions(self, monkeypatch):
+        regions = []
+
+        def _query(path, region):
+            regions.append(region)
+            return _indexed_bam_query(path, region)
+
+        monkeypatch.setattr("polars_bio.io._indexed_bam_query", _query)
+        reference = pl.col("reference")
+        df = pb.read_indexed_bam(self.bam).filter(reference == "chr1").collect()
+        assert regions == [[("chr1", None, None)]]
+        assert df.equals(self.df_region)
+        df = pb.read_indexed_bam(self.bam).filter(reference.is_in(["chr2"])).collect()
+        assert len(df) == 0
+        assert (
+            len(pb.read_indexed_bam(self.bam).filter(pl.col("flag") > 0).collect()) > 0
+        )
+
+
 class TestIOVCFInfo:
     vcf_big = "gs://gcp-public-data--gnomad/release/2.1.1/liftover_grch38/vcf/genomes/gnomad.genomes.r2.1.1.sites.liftover_grch38.vcf.bgz"
     vcf_infos_mixed_cases = (
@@ -79,6 +133,209 @@ class TestIOVCF:
         assert self.df_bgz["ref"][0] == "G" and self.df_none["ref"][0] == "G"
 
 
+class TestIOVCFProjectedInfos:
+    vcf = f"{DATA_DIR}/io/vcf/vep.vcf.bgz"
+    df_all = pb.read_vcf(vcf).collect()
+    df_projected = pb.read_vcf(vcf).select("chrom", "start", "csq").collect()
+    df_base = pb.read_vcf(vcf).select("chrom", "start", "ref").collect()
+
+    def test_schema(self):
+        assert "csq" in pb.read_vcf(self.vcf).collect_schema().names()
+        assert self.df_projected.columns == ["chrom", "start", "csq"]
+
+    def test_values(self):
+        assert self.df_projected["csq"].equals(self.df_all["csq"])
+        assert self.df_base["ref"].equals(self.df_all["ref"])
+
+    def test_collect(self):
+        lf = pb.read_vcf(self.vcf)
+        assert lf.head(1).collect().equals(self.df_all.head(1))
+        # the same query collected again reuses its table
+        assert lf.collect().equals(self.df_all)
+        assert lf.collect().equals(self.df_all)
+
+    def test_fixed_columns(self):
+        assert "csq" not in pb.read_vcf(self.vcf, info_fields=[]).collect_schema()
+
+
+class TestIOVCFFormat:
+    vcf = f"{DATA_DIR}/io/vcf/multisample.vcf"
+    df = pb.read_vcf(vcf, format_fields=["GT", "DP"]).collect()
+
+    def test_schema(self):
+        for sample in ["NA00001", "NA00002", "NA00003"]:
+            assert f"{sample}_GT" in self.df.columns
+            assert f"{sample}_DP" in self.df.columns
+        assert "NA00001_GQ" not in self.df.columns
+
+    def test_values(self):
+        assert self.df["NA00001_GT"].to_list() == ["0|0", "0|0", "0|1"]
+        assert self.df["NA00003_GT"].to_list() == ["1/1", "0/0", "1/1"]
+        assert self.df["NA00002_DP"].to_list() == [8, 5, 0]
+
+    def test_projected_fields(self, monkeypatch):
+        format_fields = []
+
+        def _register(ctx, path, name, input_format, read_options):
+            format_fields.append(read_options.vcf_read_options.format_fields)
+            return py_register_table(ctx, path, name, input_format, read_options)
+
+        lf = pb.read_vcf(self.vcf, format_fields=["GT", "DP"])
+        monkeypatch.setattr("polars_bio.io.py_register_table", _register)
+        df = lf.select("start", "NA00002_DP").collect()
+        # GT is not projected, so it is not decoded
+        assert format_fields == [["DP"]]
+        assert df["NA00002_DP"].equals(self.df["NA00002_DP"])
+        lf.select("start", "ns").collect()
+        assert format_fields[-1] is None
+
+    def test_samples(self):
+        df = pb.read_vcf(self.vcf, format_fields=["GT"], samples=["NA00002"]).collect()
+        assert df.columns[-1] == "NA00002_GT"
+        assert "NA00001_GT" not in df.columns and "NA00003_GT" not in df.columns
+        assert df["NA00002_GT"].to_list() == ["1|0", "0|1", "1|0"]
+        with pytest.raises(ValueError):
+            pb.read_vcf(self.vcf, format_fields=["GT"], samples=["NA09999"])
+        with pytest.raises(ValueError):
+            pb.read_vcf(self.vcf, samples=["NA00002"])
+
+    def test_register_samples(self):
+        pb.register_vcf(
+            self.vcf, "multisample", format_fields=["GT"], samples=["NA00003"]
+        )
+        df = pb.sql("SELECT * FROM multisample").collect()
+        assert "NA00001_GT" not in df.columns
+        assert df["NA00003_GT"].to_list() == ["1/1", "0/0", "1/1"]
+
+
+class TestIOIndexedVCF:
+    vcf = f"{DATA_DIR}/io/vcf/vep.vcf.bgz"
+    df_region = pb.read_vcf(vcf, region="21:26965000-26966000").collect()
+    df_regions = pb.read_vcf(
+        vcf, region=["21:26960000-26960100", "21:26965000-26966000"]
+    ).collect()
+
+    df_parallel = pb.read_vcf(vcf, parallel=True).collect()
+
+    def test_count(self):
+        assert len(self.df_region) == 1
+        assert len(self.df_regions) == 2
+        assert len(self.df_parallel) == 2
+
+    def test_fields(self):
+        assert self.df_region["chrom"][0] == "21"
+        assert self.df_region["start"][0] == 26965148
+
+    def test_schema(self):
+        assert self.df_region.schema == pb.read_vcf(self.vcf).collect_schema()
+        df = pb.read_vcf(self.vcf, info_fields=["CSQ"], parallel=True).collect()
+        expected = pb.read_vcf(self.vcf, info_fields=["CSQ"]).collect()
+        assert df.sort("start").equals(expected)
+
+    def test_predicate_regions(self, monkeypatch):
+        regions = []
+
+        def _query(path, region, *args):
+            regions.append(region)
+            return _indexed_vcf_query(path, region, *args)
+
+        monkeypatch.setattr("polars_bio.io._indexed_vcf_query", _query)
+        df = pb.read_vcf(self.vcf).filter(pl.col("chrom") == "21").collect()
+        assert regions == [[("21", None, None)]]
+        assert df.sort("start").equals(self.df_parallel.sort("start"))
+        df = (
+            pb.read_vcf(self.vcf)
+            .filter(
+                pl.col("chrom") == "21",
+                pl.col("start").is_between(26965000, 26966000),
+            )
+            .collect()
+        )
+        assert regions[-1] == [("21", 26965000, 26966000)]
+        assert df.equals(self.df_region)
+        assert len(pb.read_vcf(self.vcf).filter(pl.col("chrom") == "22").collect()) == 0
+
+    def test_parallel_windows(self, monkeypatch):
+        windows = []
+
+        def _query(table, regions, *args):
+            windows.extend(regions)
+            return _region_query(table, regions, *args)
+
+        monkeypatch.setattr("polars_bio.io._region_query", _query)
+        pb.set_option("datafusion.execution.target_partitions", "4")
+        try:
+            df = pb.read_vcf(self.vcf, parallel=True).collect()
+        finally:
+            pb.set_option("datafusion.execution.target_partitions", "1")
+        # a single contig is split into position windows
+        assert [w[0] for w in windows] == ["21"] * 4
+        assert df.sort("start").equals(self.df_parallel.sort("start"))
+        assert bgzf_index.index_contig_lengths(self.vcf) == {"21": 26968064}
+
+    def test_parallel_unindexed(self):
+        vcf = f"{DATA_DIR}/io/vcf/vep.vcf"
+        df = pb.read_vcf(vcf, parallel=True).collect()
+        assert df.sort("start").equals(self.df_parallel.sort("start"))
+
+    def test_translate_predicate(self):
+        chrom, start = pl.col("chrom"), pl.col("start")
+        assert _predicate_regions(start > 10, "chrom", ["start"]) is None
+        assert _predicate_regions(
+            chrom.is_in(["1", "2"]) & (start > 10) | (chrom == "X"), "chrom", ["start"]
+        ) == [("1", 11, None), ("2", 11, None), ("X", None, None)]
+
+    def test_parse_region(self):
+        contig = "HLA-A*01:01:01:01"
+        assert _parse_region(f"{contig}:1-1,000") == (contig, 1, 1000)
+        assert _parse_region(contig, [contig]) == (contig, None, None)
+        assert _parse_region("chr1") == ("chr1", None, None)
+        with pytest.raises(ValueError):
+            _parse_region("chr1 ")
+
+
+class TestIOVCFMultiFile:
+    files = [f"{DATA_DIR}/io/vcf/vep.vcf.bgz", f"{DATA_DIR}/io/vcf/vep.vcf"]
+    df = pb.read_vcf(files).collect()
+    df_glob = pb.read_vcf(f"{DATA_DIR}/io/vcf/*.bgz").collect()
+
+    def test_count(self):
+        assert len(self.df) == 4
+        assert len(self.df_glob) == 2
+
+    def test_same_file_names(self, tmp_path):
+        paths = [f"{tmp_path}/{d}/vep.vcf.bgz" for d in ("1", "2")]
+        for p in paths:
+            os.makedirs(os.path.dirname(p))
+            shutil.copy(self.files[0], p)
+        assert len(pb.read_vcf(paths).collect()) == 4
+
+    def test_schema(self):
+        schema = pb.read_vcf(self.files[0]).collect_schema()
+        assert "csq" in schema
+        assert pb.read_vcf(self.files[:1]).collect_schema() == schema
+        assert self.df.schema == schema
+        streaming = pb.read_vcf(self.files[0], streaming=True).collect_schema()
+        assert streaming.names() == schema.names()
+
+    def test_projected_infos(self):
+        df = pb.read_vcf(self.files).select("chrom", "start", "csq").collect()
+        assert df.sort("start")["csq"].equals(self.df.sort("start")["csq"])
+
+    def test_region_pruning(self):
+        assert len(pb.read_vcf(self.files[:1], region="21").collect()) == 2
+        with pytest.raises(ValueError):
+            pb.read_vcf(self.files[:1], region="22")
+
+    def test_predicate_pruning(self):
+        # the bgzipped file is pruned from its index, the plain one is scanned
+        lf = pb.read_vcf(self.files)
+        assert len(lf.filter(pl.col("chrom") == "22").collect()) == 0
+        assert len(lf.filter(pl.col("chrom") == "21").collect()) == 4
+        lf = pb.read_vcf(self.files, info_fields=[])
+        assert len(lf.filter(pl.col("chrom").is_in(["21"])).collect()) == 4
+
+
 class TestIOBED:
     df = pb.read_table(f"{DATA_DIR}/io/bed/test.bed", schema="bed12").collect()
 
@@ -91,6 +348,150 @@ class TestIOBED:
         assert self.df["end"][2] == 8000
 
 
+class TestIOReadBED:
+    bed = f"{DATA_DIR}/io/bed/test.bed"
+    bed_gz = f"{DATA_DIR}/io/bed/ENCFF001XKR.bed.gz"
+    df = pb.read_bed(bed).collect()
+    df_gz = pb.read_bed(bed_gz, schema="bed9").collect()
+
+    def test_count(self):
+        assert len(self.df) == 3
+        assert len(self.df_gz) == 4409
+
+    def test_schema(self):
+        assert self.df.columns == bf.SCHEMAS["bed12"]
+        assert self.df.schema["start"] == pl.Int64
+        assert self.df_gz.schema["score"] == pl.Int64
+
+    def test_fields(self):
+        assert self.df["chrom"][2] == "chrX"
+        assert self.df["strand"][1] == "-"
+        assert self.df["blockSizes"][2] == "1000,500,300,200"
+
+    def test_missing_values(self):
+        # "." is null in the optional numeric columns
+        assert self.df_gz.schema["thickStart"] == pl.Int64
+        assert self.df_gz["thickStart"].null_count() == len(self.df_gz)
+
+    def test_ucsc_header_lines(self):
+        df = pb.read_bed(f"{DATA_DIR}/io/bed/ucsc.bed").collect()
+        assert df.columns == bf.SCHEMAS["bed12"] + ["column_13", "column_14"]
+        assert df["chrom"].to_list() == ["chr1", "chr2"]
+        assert df["score"].to_list() == [None, 900]
+        assert df["thickEnd"].to_list() == [None, 2400]
+        assert df["blockCount"].to_list() == [None, 2]
+        assert df["column_14"].to_list() == ["3.5", "."]
+
+    def test_compressed(self):
+        df = pb.read_table(self.bed_gz, schema="bed9").collect()
+        assert self.df_gz["start"].to_list() == df["start"].to_list()
+
+    def test_range_operation(self):
+        assert len(pb.overlap(self.bed, self.bed, output_type="polars.DataFrame")) == 3
+
+    def test_parallel_decompression(self, tmp_path):
+        path = f"{tmp_path}/test.bed.gz"
+        pb.write_bed(self.df, path, index=None)
+        files = set(os.listdir(pb.ctx.catalog_dir))
+        lf = pb.read_bed(path, thread_num=2)
+        assert lf.collect().equals(self.df)
+        # the file is inflated while scanned, without a decompressed copy
+        assert set(os.listdir(pb.ctx.catalog_dir)) == files
+        # clearing the cache does not break tables registered from it
+        pb.ctx.clear_table_cache()
+        assert lf.collect().equals(self.df)
+
+    def test_parallel_decompression_corrupted(self, tmp_path):
+        path = f"{tmp_path}/test.bed.gz"
+        pb.write_bed(pl.concat([self.df] * 2000), path, index=None)
+        with open(path, "r+b") as f:
+            data = f.read()
+            # flip the CRC32 of the second block, which precedes its ISIZE
+            end = int.from_bytes(data[16:18], "little") + 1
+            end += int.from_bytes(data[end + 16 : end + 18], "little") + 1
+            f.seek(end - 8)
+            f.write(bytes(b ^ 0xFF for b in data[end - 8 : end - 4]))
+        with pytest.raises(Exception):
+            pb.read_bed(path, thread_num=2).collect()
+
+    def test_parallel_decompression_same_names(self, tmp_path):
+        dfs = [self.df.head(1), self.df.tail(2)]
+        paths = [f"{tmp_path}/{d}/test.bed.gz" for d in ("1", "2")]
+        for df, path in zip(dfs, paths):
+            os.makedirs(os.path.dirname(path))
+            pb.write_bed(df, path, index=None)
+        lfs = [pb.read_bed(path, thread_num=2) for path in paths]
+        for df, lf in zip(dfs, lfs):
+            assert lf.collect().equals(df)
+
+
+class TestIOWrite:
+    vcf = f"{DATA_DIR}/io/vcf/vep.vcf.bgz"
+    bed = f"{DATA_DIR}/io/bed/test.bed"
+
+    def test_write_vcf(self, tmp_path):
+        path = f"{tmp_path}/vep.vcf.gz"
+        pb.write_vcf(pb.read_vcf(self.vcf), path, header=self.vcf, thread_num=2)
+        df = pb.read_vcf(path).collect()
+        expected = pb.read_vcf(self.vcf).collect()
+        assert df["start"].to_list() == expected["start"].to_list()
+        assert df["csq"].to_list() == expected["csq"].to_list()
+        assert len(pb.read_vcf(path, region="21:26965000-26966000").collect()) == 1
+
+    def test_write_vcf_info_header(self, tmp_path):
+        path = f"{tmp_path}/vep.vcf.gz"
+        df = pb.read_vcf(self.vcf, info_fields=["CSQ"]).with_columns(n=pl.lit(1))
+        pb.write_vcf(df, path, header=["##fileformat=VCFv4.3"], index=None)
+        with gzip.open(path, "rt") as f:
+            meta = [line for line in f if line.startswith("##INFO")]
+        assert [m.split(",")[0] for m in meta] == ["##INFO=<ID=csq", "##INFO=<ID=n"]
+
+    def test_write_bed(self, tmp_path):
+        path = f"{tmp_path}/test.bed.gz"
+        df = pb.read_bed(self.bed).collect()
+        pb.write_bed(df.sort("chrom", "start"), path, index="csi")
+        assert pb.read_bed(path).collect().equals(df)
+        assert bgzf_index.index_contigs(path) == ["chr1", "chr2", "chrX"]
+
+    def test_write_unsorted(self, tmp_path):
+        df = pb.read_bed(self.bed).collect().reverse()
+        with pytest.raises(RuntimeError):
+            pb.write_bed(df, f"{tmp_path}/unsorted.bed.gz")
+
+
+class TestIOMaterialize:
+    vcf = f"{DATA_DIR}/io/vcf/vep.vcf.bgz"
+    bed = f"{DATA_DIR}/io/bed/test.bed"
+
+    def test_materialize_vcf(self, tmp_path):
+        path = f"{tmp_path}/vep.vcf.bgz"
+        shutil.copy(self.vcf, path)
+        expected = pb.read_vcf(path).collect()
+        df = pb.materialize(path, f"{tmp_path}/vep").collect()
+        assert df.sort("start").equals(expected.sort("start"))
+        assert os.path.exists(f"{tmp_path}/vep/part-00000.parquet")
+        assert pb.read_vcf(path).collect().sort("start").equals(df.sort("start"))
+
+    def test_materialize_modified(self, tmp_path):
+        path = f"{tmp_path}/vep.vcf.bgz"
+        shutil.copy(self.vcf, path)
+        pb.materialize(path, f"{tmp_path}/vep")
+        assert parquet_cache.lookup(path) is not None
+        os.utime(path, ns=(0, 0))
+        assert parquet_cache.lookup(path) is None
+        assert len(pb.read_vcf(path).collect()) == 2
+
+    def test_materialize_bed(self, tmp_path):
+        path = f"{tmp_path}/test.bed"
+        shutil.copy(self.bed, path)
+        df = pb.materialize(path, f"{tmp_path}/test").collect()
+        assert df["chrom"].to_list() == ["chr1", "chr2", "chrX"]
+        manifest = parquet_cache.read_manifest(f"{tmp_path}/test")
+        values = [p["value"] for p in manifest["partitions"]]
+        assert values == ["chr1", "chr2", "chrX"]
+        assert len(pb.overlap(path, path, output_type="polars.DataFrame")) == 3
+
+
 class TestFastq:
     df = pb.read_fastq(f"{DATA_DIR}/io/fastq/test.fastq").collect()
 
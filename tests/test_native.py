@@ -1,10 +1,17 @@
+import asyncio
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
 import bioframe as bf
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from _expected import (
     BIO_DF_PATH1,
     BIO_DF_PATH2,
     BIO_PD_DF1,
     BIO_PD_DF2,
+    DATA_DIR,
     DF_COUNT_OVERLAPS_PATH1,
     DF_COUNT_OVERLAPS_PATH2,
     DF_MERGE_PATH,
@@ -43,6 +50,198 @@ class TestOverlapNative:
         pd.testing.assert_frame_equal(result_csv, expected)
 
 
+class TestOverlapNativeMultiFile:
+    def test_overlap_files(self, tmp_path):
+        reads = pd.read_csv(DF_OVER_PATH1)
+        paths = []
+        for contig, df in reads.groupby("contig"):
+            paths.append(f"{tmp_path}/reads_{contig}.csv")
+            df.to_csv(paths[-1], index=False)
+        for df1 in (f"{tmp_path}/reads_*.csv", paths):
+            result = pb.overlap(
+                df1,
+                DF_OVER_PATH2,
+                cols1=("contig", "pos_start", "pos_end"),
+                cols2=("contig", "pos_start", "pos_end"),
+                output_type="pandas.DataFrame",
+                overlap_filter=FilterOp.Weak,
+            )
+            result = result.sort_values(by=list(result.columns)).reset_index(drop=True)
+            pd.testing.assert_frame_equal(result, PD_DF_OVERLAP)
+
+
+class TestOverlapNativeTSV:
+    read_options1 = pb.ReadOptions(
+        csv_read_options=pb.CsvReadOptions(
+            has_header=False,
+            comment="#",
+            schema=pa.schema(
+                [
+                    ("contig", pa.string()),
+                    ("pos_start", pa.int64()),
+                    ("pos_end", pa.int64()),
+                ]
+            ),
+        )
+    )
+    result_tsv = pb.overlap(
+        f"{DATA_DIR}/overlap/reads.tsv",
+        f"{DATA_DIR}/overlap/targets.tsv.gz",
+        cols1=("contig", "pos_start", "pos_end"),
+        cols2=("contig", "pos_start", "pos_end"),
+        output_type="pandas.DataFrame",
+        overlap_filter=FilterOp.Weak,
+        read_options1=read_options1,
+    )
+
+    def test_overlap_count(self):
+        assert len(self.result_tsv) == 16
+
+    def test_overlap_schema_rows(self):
+        result_tsv = self.result_tsv.sort_values(
+            by=list(self.result_tsv.columns)
+        ).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result_tsv, PD_DF_OVERLAP)
+
+
+class TestOverlapNativeSink:
+    def _overlap(self, sink, write_options=None):
+        return pb.overlap(
+            DF_OVER_PATH1,
+            DF_OVER_PATH2,
+            cols1=("contig", "pos_start", "pos_end"),
+            cols2=("contig", "pos_start", "pos_end"),
+            overlap_filter=FilterOp.Weak,
+            sink=sink,
+            write_options=write_options,
+        )
+
+    def test_sink_parquet(self, tmp_path):
+        path = f"{tmp_path}/overlap.parquet"
+        assert self._overlap(path) is None
+        result = pd.read_parquet(path)
+        result = result.sort_values(by=list(result.columns)).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, PD_DF_OVERLAP)
+
+    def test_sink_sorted_parquet(self, tmp_path):
+        path = f"{tmp_path}/overlap_sorted.parquet"
+        self._overlap(
+            path,
+            pb.WriteOptions(
+                row_group_size=4, compression="zstd(3)", sort_by=["pos_start_1"]
+            ),
+        )
+        parquet_file = pq.ParquetFile(path)
+        metadata = parquet_file.metadata
+        assert metadata.num_rows == 16
+        assert metadata.num_row_groups == 4
+        sorting_columns = metadata.row_group(0).sorting_columns
+        assert sorting_columns[0].column_index == (
+            parquet_file.schema_arrow.get_field_index("pos_start_1")
+        )
+        assert pd.read_parquet(path)["pos_start_1"].is_monotonic_increasing
+
+    def test_sink_bed(self, tmp_path):
+        path = f"{tmp_path}/overlap.bed.gz"
+        self._overlap(path)
+        assert len(pd.read_csv(path, sep="\t", header=None)) == 16
+
+
+class TestOverlapNativeTableCache:
+    def _overlap(self, path):
+        return pb.overlap(
+            path,
+            DF_OVER_PATH2,
+            cols1=("contig", "pos_start", "pos_end"),
+            cols2=("contig", "pos_start", "pos_end"),
+            output_type="pandas.DataFrame",
+            overlap_filter=FilterOp.Weak,
+        )
+
+    def test_repeated_overlap(self):
+        assert len(self._overlap(DF_OVER_PATH1)) == 16
+        assert len(self._overlap(DF_OVER_PATH1)) == 16
+
+    def test_modified_file(self, tmp_path):
+        path = f"{tmp_path}/reads.csv"
+        shutil.copy(DF_OVER_PATH1, path)
+        assert len(self._overlap(path)) == 16
+        with open(DF_OVER_PATH1) as f:
+            lines = f.readlines()
+        with open(path, "w") as f:
+            f.writelines(lines[:2])
+        assert len(self._overlap(path)) < 16
+
+
+class TestOverlapNativeConcurrent:
+    def _overlap(self, _):
+        return pb.overlap(
+            DF_OVER_PATH1,
+            DF_OVER_PATH2,
+            cols1=("contig", "pos_start", "pos_end"),
+            cols2=("contig", "pos_start", "pos_end"),
+            output_type="pandas.DataFrame",
+            overlap_filter=FilterOp.Weak,
+        )
+
+    def _count_overlaps(self, _):
+        return pb.count_overlaps(
+            DF_COUNT_OVERLAPS_PATH1,
+            DF_COUNT_OVERLAPS_PATH2,
+            cols1=("contig", "pos_start", "pos_end"),
+            cols2=("contig", "pos_start", "pos_end"),
+            output_type="pandas.DataFrame",
+            overlap_filter=FilterOp.Weak,
+            naive_query=True,
+        )
+
+    def test_concurrent_operations(self):
+        # checks that operations started from several threads on the shared session
+        # keep their own input tables; they only overlap in time where the native
+        # calls release the GIL
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            overlaps = list(executor.map(self._overlap, range(8)))
+            counts = list(executor.map(self._count_overlaps, range(8)))
+        assert all(len(r) == 16 for r in overlaps)
+        assert all(len(r) == len(PD_DF_COUNT_OVERLAPS) for r in counts)
+
+
+class TestOverlapNativeAsync:
+    kwargs = dict(
+        cols1=("contig", "pos_start", "pos_end"),
+        cols2=("contig", "pos_start", "pos_end"),
+        overlap_filter=FilterOp.Weak,
+    )
+
+    def test_overlap_async(self):
+        async def _overlaps():
+            return await asyncio.gather(
+                *[
+                    pb.overlap_async(DF_OVER_PATH1, DF_OVER_PATH2, **self.kwargs)
+                    for _ in range(4)
+                ]
+            )
+
+        assert all(len(r) == 16 for r in asyncio.run(_overlaps()))
+
+    def test_iter_batches_async(self):
+        async def _count():
+            df = await pb.overlap_async(
+                DF_OVER_PATH1,
+                DF_OVER_PATH2,
+                output_type="datafusion.DataFrame",
+                **self.kwargs,
+            )
+            return sum([len(batch) async for batch in pb.iter_batches_async(df)])
+
+        assert asyncio.run(_count()) == 16
+
+    def test_sql_async(self):
+        pb.register_view("v_async", "SELECT 1 AS a UNION ALL SELECT 2 AS a")
+        df = asyncio.run(pb.sql_async("SELECT a FROM v_async WHERE a > 1"))
+        assert df["a"].to_list() == [2]
+
+
 class TestNearestNative:
     result = pb.nearest(
         DF_NEAREST_PATH1,
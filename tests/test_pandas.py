@@ -38,6 +38,29 @@ class TestOverlapPandas:
         pd.testing.assert_frame_equal(result, expected)
 
 
+class TestOverlapPandasContigDtypes:
+    columns = ("contig", "pos_start", "pos_end")
+
+    @staticmethod
+    def _overlap(dtype):
+        return pb.overlap(
+            PD_OVERLAP_DF1.astype({"contig": dtype}),
+            PD_OVERLAP_DF2.astype({"contig": dtype}),
+            cols1=TestOverlapPandasContigDtypes.columns,
+            cols2=TestOverlapPandasContigDtypes.columns,
+            output_type="pandas.DataFrame",
+            overlap_filter=FilterOp.Weak,
+        )
+
+    def test_overlap_categorical_contig(self):
+        result = self._overlap("category")
+        assert len(result) == len(PD_DF_OVERLAP)
+        assert isinstance(result["contig_1"].dtype, pd.CategoricalDtype)
+
+    def test_overlap_pyarrow_string_contig(self):
+        assert len(self._overlap("string[pyarrow]")) == len(PD_DF_OVERLAP)
+
+
 class TestNearestPandas:
     result = pb.nearest(
         PD_NEAREST_DF1,
@@ -1,4 +1,11 @@
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+import pytest
 from _expected import (
+    PD_OVERLAP_DF1,
+    PD_OVERLAP_DF2,
     PL_COUNT_OVERLAPS_DF1,
     PL_COUNT_OVERLAPS_DF2,
     PL_DF1,
@@ -13,7 +20,9 @@ from _expected import (
 )
 
 import polars_bio as pb
+from polars_bio.constants import DEFAULT_OUTPUT_BATCH_SIZE
 from polars_bio.polars_bio import FilterOp
+from polars_bio.range_op_io import _coalesce_batches
 
 
 class TestOverlapPolars:
@@ -48,6 +57,276 @@ class TestOverlapPolars:
         assert self.expected.equals(result)
 
 
+class TestOverlapPolarsNative:
+    columns = ("contig", "pos_start", "pos_end")
+    result_native = pb.overlap(
+        PL_DF1,
+        PL_DF2,
+        output_type="polars.DataFrame",
+        cols1=columns,
+        cols2=columns,
+    )
+    result_datafusion = pl.from_pandas(
+        pb.overlap(
+            PD_OVERLAP_DF1,
+            PD_OVERLAP_DF2,
+            output_type="pandas.DataFrame",
+            cols1=columns,
+            cols2=columns,
+        )
+    )
+
+    def test_overlap_native_categorical_contig(self):
+        categorical = pl.col("contig").cast(pl.Categorical)
+        result = pb.overlap(
+            PL_DF1.with_columns(categorical),
+            PL_DF2.with_columns(categorical),
+            output_type="polars.DataFrame",
+            cols1=self.columns,
+            cols2=self.columns,
+        )
+        assert result["contig_1"].dtype == pl.Categorical
+        assert len(result) == len(self.result_native)
+
+    def test_overlap_native_strict(self):
+        assert len(self.result_native) == 14
+        result = self.result_native.sort(by=self.result_native.columns)
+        expected = self.result_datafusion.sort(by=self.result_datafusion.columns)
+        assert expected.equals(result)
+
+    def test_overlap_native_extra_columns(self):
+        df1 = PL_DF1.with_row_index("id").with_columns(pl.col("id").cast(pl.Int64))
+        df2 = PL_DF2.with_columns(name=pl.format("iv{}", pl.col("pos_start")))
+        result = pb.overlap(
+            df1,
+            df2,
+            output_type="polars.DataFrame",
+            cols1=self.columns,
+            cols2=self.columns,
+        )
+        expected = pl.from_pandas(
+            pb.overlap(
+                df1.to_pandas(),
+                df2.to_pandas(),
+                output_type="pandas.DataFrame",
+                cols1=self.columns,
+                cols2=self.columns,
+            )
+        )
+        assert result.columns == [
+            "contig_1",
+            "pos_start_1",
+            "pos_end_1",
+            "contig_2",
+            "pos_start_2",
+            "pos_end_2",
+            "id_1",
+            "name_2",
+        ]
+        assert result.columns == expected.columns
+        assert expected.sort(by=expected.columns).equals(result.sort(by=result.columns))
+
+
+class TestOverlapPolarsLazyInput:
+    columns = ("contig", "pos_start", "pos_end")
+    result_frame = pb.overlap(
+        PL_DF1.lazy(),
+        PL_DF2.lazy(),
+        output_type="polars.DataFrame",
+        overlap_filter=FilterOp.Weak,
+        cols1=columns,
+        cols2=columns,
+    )
+    result_lazy = pb.overlap(
+        PL_DF1.lazy().filter(pl.col("pos_start") >= 0),
+        PL_DF2.lazy(),
+        output_type="polars.LazyFrame",
+        overlap_filter=FilterOp.Weak,
+        cols1=columns,
+        cols2=columns,
+    ).collect()
+    expected = PL_DF_OVERLAP
+
+    def test_overlap_count(self):
+        assert len(self.result_frame) == len(PL_DF_OVERLAP)
+        assert len(self.result_lazy) == len(PL_DF_OVERLAP)
+
+    def test_overlap_schema_rows(self):
+        result = self.result_frame.sort(by=self.result_frame.columns)
+        assert self.expected.equals(result)
+
+    def test_overlap_schema_rows_lazy(self):
+        result = self.result_lazy.sort(by=self.result_lazy.columns)
+        assert self.expected.equals(result)
+
+    def test_tmp_files_removed(self):
+        catalog = Path(pb.ctx.catalog_dir)
+        files = set(catalog.glob("*.parquet"))
+        pb.overlap(
+            PL_DF1.lazy(),
+            PL_DF2.lazy(),
+            output_type="polars.LazyFrame",
+            cols1=self.columns,
+            cols2=self.columns,
+        ).collect()
+        assert set(catalog.glob("*.parquet")) == files
+
+
+class TestOverlapPolarsSpill:
+    columns = ("contig", "pos_start", "pos_end")
+
+    def test_spill_files_removed(self):
+        # frames larger than the in-memory limit (1M rows) are spilled to Parquet
+        n = 1_100_000
+        df1 = pl.DataFrame(
+            {"contig": ["chr1"] * n, "pos_start": range(n), "pos_end": range(1, n + 1)}
+        )
+        df2 = pl.DataFrame({"contig": ["chr1"], "pos_start": [10], "pos_end": [20]})
+        catalog = Path(pb.ctx.catalog_dir)
+        files = set(catalog.glob("*.parquet"))
+        result = pb.overlap(
+            df1,
+            df2,
+            output_type="polars.DataFrame",
+            cols1=self.columns,
+            cols2=self.columns,
+            algorithm="IntervalTree",
+        )
+        assert len(result) > 0
+        assert set(catalog.glob("*.parquet")) == files
+
+
+class TestOverlapPolarsBatchSize:
+    columns = ("contig", "pos_start", "pos_end")
+
+    def overlap(self, batch_size):
+        # IntervalTree bypasses the in-process overlap of small DataFrames
+        return pb.overlap(
+            PL_DF1,
+            PL_DF2,
+            output_type="polars.LazyFrame",
+            overlap_filter=FilterOp.Weak,
+            cols1=self.columns,
+            cols2=self.columns,
+            algorithm="IntervalTree",
+            batch_size=batch_size,
+        ).collect()
+
+    def test_overlap_batch_size(self):
+        for batch_size in [1, 3, None]:
+            result = self.overlap(batch_size)
+            result = result.sort(by=result.columns)
+            assert PL_DF_OVERLAP.equals(result)
+
+    @staticmethod
+    def batches(sizes):
+        start = 0
+        for size in sizes:
+            yield pa.record_batch(
+                {"a": pa.array(range(start, start + size), pa.int64())}
+            )
+            start += size
+
+    def test_coalesce_batches_rows(self):
+        tables = list(_coalesce_batches(self.batches([3, 5, 1, 7]), 4, 1 << 30))
+        assert [t.num_rows for t in tables] == [4, 4, 4, 4]
+        assert pa.concat_tables(tables)["a"].to_pylist() == list(range(16))
+
+    def test_default_output_batch_size(self):
+        # documented in the batch_size parameter of the range operations
+        assert DEFAULT_OUTPUT_BATCH_SIZE == 65536
+
+    def test_coalesce_batches_bytes(self):
+        # 10 int64 rows are 80 bytes, a table is emitted once it reaches 150 bytes
+        tables = list(_coalesce_batches(self.batches([10, 10, 10]), 100, 150))
+        assert [t.num_rows for t in tables] == [20, 10]
+
+
+class TestOverlapPolarsContigEnum:
+    columns = ("contig", "pos_start", "pos_end")
+    result = pb.overlap(
+        PL_DF1,
+        PL_DF2,
+        output_type="polars.DataFrame",
+        overlap_filter=FilterOp.Weak,
+        cols1=columns,
+        cols2=columns,
+        contig_dtype="enum",
+    )
+
+    def test_overlap_contig_enum(self):
+        assert isinstance(self.result.schema["contig_1"], pl.Enum)
+        assert isinstance(self.result.schema["contig_2"], pl.Enum)
+        assert len(self.result) == len(PL_DF_OVERLAP)
+
+    def test_contig_enum_natural_order(self):
+        dtype = pb.contig_enum(["chr10", "chrX", "chr2", "chr1", "chrM"])
+        assert dtype.categories.to_list() == ["chr1", "chr2", "chr10", "chrX", "chrM"]
+
+    def test_contig_enum_chromsizes_order(self):
+        dtype = pb.contig_enum(chromsizes={"chr2": 10, "chr1": 20})
+        assert dtype.categories.to_list() == ["chr2", "chr1"]
+
+    def test_contig_enum_unknown_contigs(self):
+        chromsizes = {"chr1": 100}
+        with pytest.raises(pl.exceptions.InvalidOperationError):
+            pb.overlap(
+                PL_DF1,
+                PL_DF2,
+                output_type="polars.DataFrame",
+                cols1=self.columns,
+                cols2=self.columns,
+                contig_dtype="enum",
+                chromsizes=chromsizes,
+            )
+        with pytest.raises(ValueError):
+            pb.overlap(
+                PD_OVERLAP_DF1,
+                PD_OVERLAP_DF2,
+                output_type="pandas.DataFrame",
+                cols1=self.columns,
+                cols2=self.columns,
+                contig_dtype="enum",
+                chromsizes=chromsizes,
+            )
+
+    def test_contig_enum_lazy_input(self):
+        # contigs of LazyFrames are not detected, as it would run their pipeline
+        with pytest.raises(ValueError):
+            pb.overlap(
+                PL_DF1.lazy(),
+                PL_DF2.lazy(),
+                cols1=self.columns,
+                cols2=self.columns,
+                contig_dtype="enum",
+            )
+
+    def test_contig_enum_validated_before_run(self):
+        def fail(s):
+            raise RuntimeError("the input pipeline must not run")
+
+        lazy = PL_DF1.lazy().with_columns(pl.col("pos_start").map_batches(fail))
+        with pytest.raises(ValueError, match="chromsizes"):
+            pb.overlap(
+                lazy,
+                lazy,
+                output_type="polars.DataFrame",
+                cols1=self.columns,
+                cols2=self.columns,
+                contig_dtype="enum",
+            )
+        with pytest.raises(ValueError, match="contig_dtype"):
+            pb.overlap(
+                lazy,
+                lazy,
+                output_type="polars.DataFrame",
+                cols1=self.columns,
+                cols2=self.columns,
+                contig_dtype="categorical",
+                chromsizes={"chr1": 100},
+            )
+
+
 class TestNearestPolars:
     result_frame = pb.nearest(
         PL_NEAREST_DF1,
@@ -1,6 +1,7 @@
 import bioframe as bf
 import pandas as pd
 import polars as pl
+import pyarrow.parquet as pq
 from _expected import DATA_DIR
 
 import polars_bio as pb
@@ -19,6 +20,52 @@ class TestPolarsExt:
         assert df_1.equals(df_2)
         assert not df_1_unsorted.to_pandas().equals(df_2)
 
+    def test_sort_bedframe_natural(self):
+        df = (
+            pb.read_table(self.file, schema="bed9").collect().sample(1000, shuffle=True)
+        )
+        result = df.lazy().pb.sort(natural=True).collect()
+        contigs = result.get_column("chrom").unique(maintain_order=True).to_list()
+        assert contigs == pb.contig_enum(contigs).categories.to_list()
+        assert (
+            result.group_by("chrom")
+            .agg((pl.col("start").diff() >= 0).all().alias("sorted"))["sorted"]
+            .all()
+        )
+
+    def test_sink_sorted_parquet(self, tmp_path):
+        path = f"{tmp_path}/sorted.parquet"
+        df = (
+            pb.read_table(self.file, schema="bed9").collect().sample(1000, shuffle=True)
+        )
+        df.lazy().pb.sink_sorted_parquet(path)
+        metadata = pq.ParquetFile(path).metadata.row_group(0)
+        assert len(metadata.sorting_columns) == 3
+        expected = df.lazy().pb.sort().collect()
+        assert pl.read_parquet(path).equals(expected)
+
+    def test_sink_sorted_parquet_nulls_last(self, tmp_path):
+        path = f"{tmp_path}/sorted.parquet"
+        df = pl.DataFrame(
+            {"chrom": ["chr2", None, "chr1", "chr1"], "start": [5, 1, None, 3]}
+        ).with_columns(end=pl.col("start") + 1)
+        df.lazy().pb.sink_sorted_parquet(path)
+        expected = df.lazy().pb.sort().collect()
+        assert expected["chrom"].to_list() == ["chr1", "chr1", "chr2", None]
+        assert expected["start"].to_list() == [3, None, 5, 1]
+        assert pl.read_parquet(path).equals(expected)
+
+    def test_sink_sorted_parquet_natural(self, tmp_path):
+        path = f"{tmp_path}/sorted.parquet"
+        df = (
+            pb.read_table(self.file, schema="bed9").collect().sample(1000, shuffle=True)
+        )
+        df.lazy().pb.sink_sorted_parquet(path, natural=True)
+        metadata = pq.ParquetFile(path).metadata.row_group(0)
+        assert len(metadata.sorting_columns) == 0
+        expected = df.lazy().pb.sort(natural=True).collect()
+        assert pl.read_parquet(path).equals(expected)
+
     def test_expand_pad(self):
         df_1 = pb.read_table(self.file, schema="bed9").collect()
         df_2 = bf.expand(df_1.to_pandas(), pad=1000)
@@ -31,6 +78,27 @@ class TestPolarsExt:
         df_3 = df_1.lazy().pb.expand(scale=1.5).collect().to_pandas()
         assert df_2.equals(df_3)
 
+    def test_expand_pad_negative(self):
+        df_1 = pb.read_table(self.file, schema="bed9").collect()
+        df_2 = bf.expand(df_1.to_pandas(), pad=-200)
+        df_3 = df_1.lazy().pb.expand(pad=-200).collect().to_pandas()
+        assert df_2.equals(df_3)
+
+    def test_expand_chromsizes(self):
+        df_1 = pb.read_table(self.file, schema="bed9").collect()
+        sizes = df_1.group_by("chrom").agg(pl.col("end").max().alias("size"))
+        df_2 = (
+            df_1.lazy()
+            .pb.expand(pad=10_000_000, chromsizes=dict(sizes.iter_rows()))
+            .collect()
+        )
+        assert df_2.get_column("start").min() == 0
+        assert (
+            df_2.join(sizes, on="chrom")
+            .filter(pl.col("end") > pl.col("size"))
+            .is_empty()
+        )
+
     def test_overlap(self):
         cols = ("chrom", "start", "end")
         df_1 = (
@@ -34,3 +34,16 @@ class TestStreaming:
         expected = pl.read_csv(file)
         expected.equals(PL_DF_OVERLAP)
         file_path.unlink(missing_ok=True)
+
+
+class TestStreamingStrings:
+    def test_string_types(self):
+        contigs = ["chr1", "chr2", None]
+        pb.from_polars("streaming_contigs", pl.DataFrame({"contig": contigs}))
+        df = pb.sql(
+            "SELECT arrow_cast(contig, 'LargeUtf8') AS large, arrow_cast(contig, 'Utf8View') AS view FROM streaming_contigs",
+            streaming=True,
+        ).collect(streaming=True)
+        assert df.schema == pl.Schema({"large": pl.String, "view": pl.String})
+        assert df["large"].to_list() == contigs
+        assert df["view"].to_list() == contigs